@@ -0,0 +1,113 @@
+"""p99 latency of /api/health while heavy analysis jobs run.
+
+Runs the app in-process over httpx's ASGI transport. It first samples
+/api/health on an idle loop. It then samples again while Monte Carlo jobs
+run back to back through the real /api/analysis/monte-carlo route, which
+offloads to the worker pool. The "inline" row repeats the loaded run with
+the simulation called directly on the event loop, as the routes did
+before offloading, for comparison.
+
+    python backend/benchmarks/health_latency.py --workers 2 --draws 50000
+"""
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import time
+
+import numpy as np
+
+
+async def sample_health(client, seconds: float, interval: float = 0.005) -> np.ndarray:
+    """Open-loop sampling: latency runs from each request's scheduled send time,
+    so time spent waiting on a blocked event loop is counted."""
+    latencies = []
+    start = time.perf_counter()
+    scheduled = start
+    while time.perf_counter() < start + seconds:
+        await asyncio.sleep(max(0.0, scheduled - time.perf_counter()))
+        response = await client.get("/api/health")
+        latencies.append(time.perf_counter() - scheduled)
+        response.raise_for_status()
+        scheduled += interval
+    return np.array(latencies) * 1000
+
+
+async def heavy_load(server, client, payload, mode: str, stop: asyncio.Event) -> int:
+    jobs = 0
+    while not stop.is_set():
+        if mode == "inline":
+            server.run_monte_carlo(server.MonteCarloRequest(**payload))
+            await asyncio.sleep(0.01)  # let queued I/O through between blocking jobs
+        else:
+            response = await client.post("/api/analysis/monte-carlo", json=payload)
+            response.raise_for_status()
+        jobs += 1
+    return jobs
+
+
+async def measure(server, mode: str, seconds: float, concurrency: int, payload) -> dict:
+    import httpx
+
+    transport = httpx.ASGITransport(app=server.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        if mode == "idle":
+            latencies = await sample_health(client, seconds)
+            jobs = 0
+        else:
+            if mode == "offloaded":
+                # Start the workers before sampling so spawn time is not measured
+                await client.post("/api/analysis/monte-carlo", json={**payload, "draws": 100})
+            stop = asyncio.Event()
+            load = [asyncio.create_task(heavy_load(server, client, payload, mode, stop)) for _ in range(concurrency)]
+            latencies = await sample_health(client, seconds)
+            stop.set()
+            jobs = sum(await asyncio.gather(*load))
+    return {
+        "mode": mode,
+        "requests": len(latencies),
+        "p50_ms": float(np.percentile(latencies, 50)),
+        "p99_ms": float(np.percentile(latencies, 99)),
+        "max_ms": float(latencies.max()),
+        "heavy_jobs": jobs,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=2, help="ANALYSIS_WORKERS for the offloaded run")
+    parser.add_argument("--draws", type=int, default=50000, help="Monte Carlo draws per heavy job")
+    parser.add_argument("--concurrency", type=int, default=2, help="heavy jobs in flight")
+    parser.add_argument("--seconds", type=float, default=5.0, help="sampling window per mode")
+    args = parser.parse_args()
+
+    os.environ.setdefault("SKIP_DB", "1")
+    os.environ["ANALYSIS_WORKERS"] = str(args.workers)
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+    import server
+
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    payload = {
+        "uncertain": [
+            {"field": "user_growth.artists_y5", "distribution": "lognormal", "std": 0.3},
+            {"field": "artist_monetization.premium_price", "distribution": "normal", "std": 40},
+        ],
+        "draws": args.draws,
+        "seed": 7,
+    }
+    print(f"{'mode':<10} {'requests':>8} {'p50 ms':>8} {'p99 ms':>8} {'max ms':>8} {'heavy jobs':>10}")
+    for mode in ("idle", "offloaded", "inline"):
+        row = asyncio.run(measure(server, mode, args.seconds, args.concurrency, payload))
+        print(
+            f"{row['mode']:<10} {row['requests']:>8} {row['p50_ms']:>8.2f} {row['p99_ms']:>8.2f} "
+            f"{row['max_ms']:>8.2f} {row['heavy_jobs']:>10}"
+        )
+    if server.analysis_executor is not None:
+        server.analysis_executor.shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,75 @@
+"""Cost of a projection as the horizon grows from 5 to 20 years.
+
+For each horizon it times three things:
+
+- a cold single-plan /calculate build through the stage graph;
+- a batch of plans run through calculate_projections_batch;
+- a Monte Carlo run.
+
+It also reports the per-year cost and the JSON response size. Time and size
+should grow roughly linearly with the number of years.
+
+    python backend/benchmarks/horizon_scaling.py --plans 200 --draws 20000
+"""
+import argparse
+import os
+import sys
+import time
+
+
+def best_of(repeats: int, fn) -> float:
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--horizons", default="5,10,20", help="comma-separated projection_years")
+    parser.add_argument("--plans", type=int, default=200, help="plans per batch run")
+    parser.add_argument("--draws", type=int, default=20000, help="Monte Carlo draws")
+    parser.add_argument("--repeats", type=int, default=5, help="best-of repeats per measurement")
+    args = parser.parse_args()
+
+    os.environ.setdefault("SKIP_DB", "1")
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+    import server
+
+    print(
+        f"{'years':>5} {'single ms':>10} {'ms/year':>8} {'batch ms':>9} {'ms/plan':>8} "
+        f"{'mc ms':>8} {'json KB':>8}"
+    )
+    for years in (int(h) for h in args.horizons.split(",")):
+        inputs = server.FinancialInputs()
+        inputs.timeline.projection_years = years
+
+        def single():
+            server.stage_cache.clear()
+            return server.build_projections(inputs)
+
+        plans = [inputs.model_copy(deep=True) for _ in range(args.plans)]
+        for i, plan in enumerate(plans):
+            plan.user_growth.artists_y5 += i * 1000
+        request = server.MonteCarloRequest(
+            inputs=inputs,
+            uncertain=[{"field": "user_growth.artists_y5", "distribution": "lognormal", "std": 0.3}],
+            draws=args.draws,
+            seed=1,
+        )
+
+        single_s = best_of(args.repeats, single)
+        batch_s = best_of(max(args.repeats // 2, 1), lambda: server.calculate_projections_batch(plans))
+        mc_s = best_of(max(args.repeats // 2, 1), lambda: server.run_monte_carlo(request))
+        size_kb = len(server.encode_json(single())) / 1024
+        print(
+            f"{years:>5} {single_s * 1e3:>10.2f} {single_s * 1e3 / years:>8.2f} {batch_s * 1e3:>9.1f} "
+            f"{batch_s * 1e3 / args.plans:>8.2f} {mc_s * 1e3:>8.1f} {size_kb:>8.1f}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,47 @@
+"""Provision and inspect the MongoDB indexes declared in server.INDEX_SPECS.
+
+Connects with the same MONGO_URL / DB_NAME settings as the app.
+
+    python backend/indexes.py ensure              # create any missing indexes
+    python backend/indexes.py report --slow 20    # usage per index, slowest query shapes
+    python backend/indexes.py profile --slowms 50 # record operations slower than 50 ms
+    python backend/indexes.py profile --off       # stop profiling
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+
+
+async def run(server, args) -> dict:
+    if args.command == "ensure":
+        return await server.ensure_indexes(server.db)
+    if args.command == "profile":
+        return await server.set_profiling(server.db, None if args.off else args.slowms)
+    return await server.index_report(server.db, args.slow)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("ensure", help="create missing indexes")
+    report = commands.add_parser("report", help="index usage and slow queries")
+    report.add_argument("--slow", type=int, default=20, help="slowest query shapes to list")
+    profile = commands.add_parser("profile", help="configure the slow-operation profiler")
+    profile.add_argument("--slowms", type=int, default=100, help="threshold in milliseconds")
+    profile.add_argument("--off", action="store_true", help="turn profiling off")
+    args = parser.parse_args()
+
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    import server
+
+    if server.db is None:
+        print("Database not configured (SKIP_DB is set)", file=sys.stderr)
+        return 1
+    print(json.dumps(asyncio.run(run(server, args)), indent=2, default=str))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
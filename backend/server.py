@@ -1,13 +1,33 @@
-from fastapi import FastAPI, APIRouter, HTTPException
+from fastapi import FastAPI, APIRouter, HTTPException, Header, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo.errors import BulkWriteError
 import os
+import sys
+import math
 import logging
 from pathlib import Path
-from pydantic import BaseModel, Field, ConfigDict
-from typing import List, Optional, Dict, Any
+from pydantic import BaseModel, Field, ConfigDict, ValidationError
+from typing import List, Optional, Dict, Any, Annotated, Tuple, Iterable, AsyncIterator, Callable, Awaitable
+import numpy as np
 import uuid
+import json
+import queue
+import base64
+import codecs
+import csv
+import functools
+import io
+import zipfile
+import hashlib
+import time
+import asyncio
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from collections import OrderedDict, deque
 from datetime import datetime, timezone
 
 ROOT_DIR = Path(__file__).parent
@@ -46,11 +66,36 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Calculation engine: "vectorized" (NumPy, default) or "python" (reference loops)
+CALC_ENGINE = os.environ.get("CALC_ENGINE", "vectorized").lower()
+MAX_BATCH_PLANS = int(os.environ.get("MAX_BATCH_PLANS", "1000"))
+MAX_PROJECTION_YEARS = 20
+MC_MAX_DRAWS = int(os.environ.get("MC_MAX_DRAWS", "100000"))
+MC_CHUNK_SIZE = int(os.environ.get("MC_CHUNK_SIZE", "5000"))
+OPTIMIZER_MAX_ROUNDS = int(os.environ.get("OPTIMIZER_MAX_ROUNDS", "20"))
+RESULT_CACHE_MAX_BYTES = int(os.environ.get("RESULT_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+STAGE_CACHE_MAX_BYTES = int(os.environ.get("STAGE_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+SESSION_TTL_SECONDS = float(os.environ.get("SESSION_TTL_SECONDS", "1800"))
+MAX_SESSIONS = int(os.environ.get("MAX_SESSIONS", "1000"))
+LIVE_SETTLE_SECONDS = float(os.environ.get("LIVE_SETTLE_SECONDS", "0.15"))
+# Worker processes for heavy analysis routes; 0 runs them on a thread instead
+ANALYSIS_WORKERS = int(os.environ.get("ANALYSIS_WORKERS", "2"))
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = int(os.environ.get("MAX_PAGE_SIZE", "500"))
+NDJSON_BATCH_SIZE = 500
+IMPORT_BATCH_SIZE = int(os.environ.get("IMPORT_BATCH_SIZE", "200"))
+MAX_IMPORT_RECORD_BYTES = int(os.environ.get("MAX_IMPORT_RECORD_BYTES", str(1024 * 1024)))
+MAX_IMPORT_ERRORS = 1000
+EXPORT_BATCH_SIZE = int(os.environ.get("EXPORT_BATCH_SIZE", "50"))
+# Bump whenever a change alters projection output; stored projections from
+# other versions are recomputed the next time they are read
+ENGINE_VERSION = "2026.10.3"
+
 # ============ MODELS ============
 
 class TimelineInputs(BaseModel):
     revenue_start_month: int = 7
-    projection_years: int = 5
+    projection_years: int = Field(default=5, ge=1, le=MAX_PROJECTION_YEARS)
     inflation_rate: float = 6.0
     scenario: str = "base"
 
@@ -65,6 +110,9 @@ class UserGrowthInputs(BaseModel):
     cds_y3: int = 2000
     cds_y4: int = 5000
     cds_y5: int = 12000
+    # Year-by-year targets for any horizon; when set they replace the y1..y5 fields
+    artists_by_year: Optional[List[int]] = None
+    cds_by_year: Optional[List[int]] = None
 
 class ArtistMonetization(BaseModel):
     premium_price: float = 299.0
@@ -117,13 +165,22 @@ class UnitCostInputs(BaseModel):
     ad_serving_cost_pct: float = 10.0
 
 # Dynamic Team Member
+class SalaryRevision(BaseModel):
+    year: int = 2
+    month: int = 1  # 1-12
+    monthly_salary: float = 0.0  # per head, from this month on
+
 class TeamMember(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     name: str = "Team Member"
     role: str = "employee"  # founder, intern, employee, other
-    monthly_salary: float = 0.0
+    monthly_salary: float = 0.0  # per head
     start_month: int = 1  # 1-12
     start_year: int = 1   # 1-5
+    count: int = Field(default=1, ge=0)  # heads on this line, e.g. "hire 20 engineers in Y3"
+    end_month: int = 12  # last month employed, used with end_year
+    end_year: Optional[int] = None  # employed to the end of the horizon when unset
+    salary_revisions: List[SalaryRevision] = Field(default_factory=list)
 
 class TeamCosts(BaseModel):
     members: List[TeamMember] = Field(default_factory=lambda: [
@@ -296,6 +353,73 @@ class FinancialInputsCreate(BaseModel):
     tax_inputs: Optional[TaxInputs] = None
     funding: Optional[FundingInputs] = None
 
+# Analysis requests
+class UncertainInput(BaseModel):
+    field: str  # "section.field", e.g. "artist_monetization.conversion_rate"
+    distribution: str = "normal"  # normal, lognormal, uniform, triangular
+    mean: Optional[float] = None  # normal mean / lognormal median; defaults to the input value
+    std: Optional[float] = None  # normal std / lognormal sigma of log(value)
+    low: Optional[float] = None  # uniform/triangular lower bound; clip floor for normal/lognormal
+    high: Optional[float] = None  # uniform/triangular upper bound; clip ceiling for normal/lognormal
+    mode: Optional[float] = None  # triangular peak; defaults to the input value
+
+class MonteCarloRequest(BaseModel):
+    inputs: FinancialInputs = Field(default_factory=FinancialInputs)
+    uncertain: List[UncertainInput]
+    draws: int = 10000
+    seed: Optional[int] = None
+    percentiles: List[float] = Field(default_factory=lambda: [5.0, 50.0, 95.0])
+
+class SensitivityRequest(BaseModel):
+    inputs: FinancialInputs = Field(default_factory=FinancialInputs)
+    delta_pct: float = 10.0
+    fields: Optional[List[str]] = None  # "section.field" names; defaults to every numeric input
+    outputs: List[str] = Field(default_factory=lambda: ["y5_revenue", "break_even_month", "runway_months"])
+
+class GoalSeekRequest(BaseModel):
+    inputs: FinancialInputs = Field(default_factory=FinancialInputs)
+    field: str  # "section.field", or an item field such as "funding.rounds.0.amount"
+    metric: str  # any sensitivity output, e.g. "break_even_month" or "min_monthly_cash"
+    target: float
+    goal: str = "at_least"  # at_least, at_most, equal
+    low: Optional[float] = None  # search bracket; defaults to 0
+    high: Optional[float] = None  # defaults to ten times the current value (at least 1)
+    tolerance: Optional[float] = None  # bracket width to stop at; defaults to 1e-6 of the initial width
+
+class BudgetAllocation(BaseModel):
+    field: str  # a monthly spend input, e.g. "marketing_costs.paid", or "team_costs.new_hires"
+    min: float = 0.0
+    max: Optional[float] = None
+
+class OptimizeRequest(BaseModel):
+    inputs: FinancialInputs = Field(default_factory=FinancialInputs)
+    budget: Optional[float] = None  # monthly spend to split; defaults to the current spend on the allocations
+    allocations: List[BudgetAllocation] = Field(default_factory=lambda: [
+        BudgetAllocation(field=field) for field in (
+            "marketing_costs.organic", "marketing_costs.paid", "marketing_costs.influencer",
+            "team_costs.new_hires", "digital_infra.hosting", "digital_infra.storage", "digital_infra.saas_tools",
+        )
+    ])
+    objective: str = "y5_ebitda"  # any sensitivity output
+    maximize: bool = True
+    min_runway_months: Optional[float] = None  # floor on the lowest monthly runway
+    max_burn_multiple: Optional[float] = None  # ceiling on the worst yearly burn multiple
+    hire_start_year: int = 1  # when the team_costs.new_hires salary budget starts
+    hire_start_month: int = 1
+    candidates: int = Field(2000, ge=1, le=MC_MAX_DRAWS)  # per round
+    rounds: int = Field(4, ge=1, le=OPTIMIZER_MAX_ROUNDS)
+    seed: Optional[int] = None
+
+class ExportRequest(BaseModel):
+    plans: List[FinancialInputs] = []
+    input_ids: List[str] = []  # saved plans, exported in this order after `plans`
+    format: str = "xlsx"  # xlsx or csv
+
+class PatchOperation(BaseModel):
+    op: str  # add, remove, replace (RFC 6902)
+    path: str  # JSON Pointer, e.g. "/tax_inputs/corporate_tax_rate"
+    value: Any = None
+
 # ============ FINANCIAL CALCULATIONS ============
 
 def get_scenario_multiplier(scenario: str) -> Dict[str, float]:
@@ -308,14 +432,14 @@ def get_scenario_multiplier(scenario: str) -> Dict[str, float]:
     return multipliers.get(scenario, multipliers["base"])
 
 def build_monthly_cumulative(annual_targets: List[int]) -> List[int]:
-    """Build monthly cumulative totals across 5 years (60 months)."""
+    """Build monthly cumulative totals across the horizon (12 months per annual target)."""
     monthly = []
     # Year 1: exponential smoothing
     for month in range(1, 13):
         progress = month / 12
         monthly.append(int(annual_targets[0] * (progress ** 1.5)))
-    # Years 2-5: linear interpolation between year targets
-    for year in range(1, 5):
+    # Later years: linear interpolation between year targets
+    for year in range(1, len(annual_targets)):
         start = annual_targets[year - 1]
         end = annual_targets[year]
         for month in range(1, 13):
@@ -347,28 +471,33 @@ def calculate_premium_bases(
         premium_bases.append(premium_base)
     return premium_bases
 
+def growth_targets(user_growth: UserGrowthInputs, kind: str, years: int) -> List[int]:
+    """Annual user targets ("artists" or "cds") for each year of the horizon.
+
+    `{kind}_by_year` wins over the y1..y5 fields when given; years past the
+    last target hold it flat.
+    """
+    targets = getattr(user_growth, f"{kind}_by_year") or [getattr(user_growth, f"{kind}_y{y}") for y in range(1, 6)]
+    return [targets[min(year, len(targets) - 1)] for year in range(years)]
+
+def overridden_growth_fields(user_growth: UserGrowthInputs) -> Dict[str, str]:
+    """y1..y5 target fields that a `{kind}_by_year` list replaces, mapped to that list's field"""
+    return {
+        f"user_growth.{kind}_y{y}": f"user_growth.{kind}_by_year"
+        for kind in ("artists", "cds") if getattr(user_growth, f"{kind}_by_year")
+        for y in range(1, 6)
+    }
+
 def calculate_monthly_users(inputs: FinancialInputs) -> Dict[str, Any]:
-    """Calculate monthly user growth for Year 1 and annual for Years 1-5"""
+    """Calculate monthly and annual user growth over the projection horizon"""
     ug = inputs.user_growth
     scenario_mult = get_scenario_multiplier(inputs.timeline.scenario)
     growth_mult = scenario_mult["growth"]
+    years = inputs.timeline.projection_years
     
     # Annual targets with scenario adjustment
-    artist_targets = [
-        int(ug.artists_y1 * growth_mult),
-        int(ug.artists_y2 * growth_mult),
-        int(ug.artists_y3 * growth_mult),
-        int(ug.artists_y4 * growth_mult),
-        int(ug.artists_y5 * growth_mult)
-    ]
-    
-    cd_targets = [
-        int(ug.cds_y1 * growth_mult),
-        int(ug.cds_y2 * growth_mult),
-        int(ug.cds_y3 * growth_mult),
-        int(ug.cds_y4 * growth_mult),
-        int(ug.cds_y5 * growth_mult)
-    ]
+    artist_targets = [int(target * growth_mult) for target in growth_targets(ug, "artists", years)]
+    cd_targets = [int(target * growth_mult) for target in growth_targets(ug, "cds", years)]
     
     monthly_artists = build_monthly_cumulative(artist_targets)
     monthly_cds = build_monthly_cumulative(cd_targets)
@@ -378,8 +507,8 @@ def calculate_monthly_users(inputs: FinancialInputs) -> Dict[str, Any]:
         "monthly_cds": monthly_cds[:12],
         "annual_artists": artist_targets,
         "annual_cds": cd_targets,
-        "monthly_artists_60": monthly_artists,
-        "monthly_cds_60": monthly_cds
+        "artists_by_month": monthly_artists,
+        "cds_by_month": monthly_cds
     }
 
 def calculate_revenue(inputs: FinancialInputs, users: Dict[str, Any]) -> Dict[str, Any]:
@@ -394,8 +523,8 @@ def calculate_revenue(inputs: FinancialInputs, users: Dict[str, Any]) -> Dict[st
     conv_mult = scenario_mult["conversion"]
     
     revenue_start = inputs.timeline.revenue_start_month
-    monthly_artists = users.get("monthly_artists_60") or build_monthly_cumulative(users["annual_artists"])
-    monthly_cds = users.get("monthly_cds_60") or build_monthly_cumulative(users["annual_cds"])
+    monthly_artists = users.get("artists_by_month") or build_monthly_cumulative(users["annual_artists"])
+    monthly_cds = users.get("cds_by_month") or build_monthly_cumulative(users["annual_cds"])
 
     premium_artists = calculate_premium_bases(
         monthly_artists, am.conversion_rate, am.churn_rate, conv_mult, revenue_start
@@ -404,18 +533,8 @@ def calculate_revenue(inputs: FinancialInputs, users: Dict[str, Any]) -> Dict[st
         monthly_cds, cm.conversion_rate, cm.churn_rate, conv_mult, revenue_start
     )
 
-    other_income_monthly = []
-    for idx in range(60):
-        year = idx // 12 + 1
-        month = idx % 12 + 1
-        other_inc = 0
-        for item in oi.items:
-            if item.start_year < year or (item.start_year == year and month >= item.start_month):
-                if item.is_recurring:
-                    other_inc += item.amount
-                elif item.start_year == year and month == item.start_month:
-                    other_inc += item.amount
-        other_income_monthly.append(other_inc)
+    months = len(monthly_artists)
+    other_income_monthly = dated_item_schedule(oi.items, "amount", months).tolist()
 
     revenue_streams = {
         "artist_premium": [],
@@ -448,7 +567,7 @@ def calculate_revenue(inputs: FinancialInputs, users: Dict[str, Any]) -> Dict[st
         "ads_revenue": []
     }
 
-    for idx in range(60):
+    for idx in range(months):
         year_idx = idx // 12
         month_in_year = idx % 12 + 1
         total_artists = monthly_artists[idx]
@@ -537,49 +656,110 @@ def calculate_revenue(inputs: FinancialInputs, users: Dict[str, Any]) -> Dict[st
         return int(sum(series[start:end]))
 
     monthly_revenue = {k: v[:12] for k, v in revenue_streams.items()}
-    annual_revenue = {k: [sum_year(v, year) for year in range(5)] for k, v in revenue_streams.items()}
+    annual_revenue = {k: [sum_year(v, year) for year in range(months // 12)] for k, v in revenue_streams.items()}
 
     return {
         "monthly": monthly_revenue,
         "annual": annual_revenue,
+        "ledger": revenue_streams,
         "usage": usage
     }
 
-def calculate_team_costs_detailed(inputs: FinancialInputs, year: int, month: int = None) -> float:
-    """Calculate team costs for a specific year and optionally month"""
+def roster_salary_schedule(members: List[TeamMember], months: int) -> np.ndarray:
+    """Compile a roster into total salaries per month, before ESOP, inflation and scenario.
+
+    Each line adds its heads from its start month, steps at each salary
+    revision and drops out after its end month. The changes are marked in a
+    difference array and accumulated with one cumulative sum, so the cost is
+    O(lines + revisions + months) however many people the roster covers.
+    """
+    changes = [0.0] * (months + 1)
+    for member in members:
+        start = max((member.start_year - 1) * 12 + member.start_month - 1, 0)
+        end = months if member.end_year is None else (member.end_year - 1) * 12 + member.end_month
+        end = min(end, months)
+        if start >= end or member.count == 0:
+            continue
+        salary = member.monthly_salary
+        if not member.salary_revisions:
+            changes[start] += salary * member.count
+            changes[end] -= salary * member.count
+            continue
+        revisions = sorted(
+            ((r.year - 1) * 12 + r.month - 1, i, r.monthly_salary) for i, r in enumerate(member.salary_revisions)
+        )
+        for month, _, revised in revisions:
+            if month > start:
+                break
+            salary = revised
+        changes[start] += salary * member.count
+        for month, _, revised in revisions:
+            if start < month < end:
+                changes[month] += (revised - salary) * member.count
+                salary = revised
+        changes[end] -= salary * member.count
+    return np.cumsum(changes[:months])
+
+def calculate_team_costs(inputs: FinancialInputs, months: int) -> List[float]:
+    """Team cost per month (salaries plus ESOP, inflated and scenario-adjusted), compiled once"""
     tc = inputs.team_costs
-    scenario_mult = get_scenario_multiplier(inputs.timeline.scenario)
-    cost_mult = scenario_mult["cost"]
+    cost_mult = get_scenario_multiplier(inputs.timeline.scenario)["cost"]
     inflation = inputs.timeline.inflation_rate / 100
-    inflation_factor = (1 + inflation) ** (year - 1)
-    
-    total = 0
-    for member in tc.members:
-        member_start_abs_month = (member.start_year - 1) * 12 + member.start_month
-        
-        if month is not None:
-            # Monthly calculation
-            current_abs_month = month
-            if current_abs_month >= member_start_abs_month:
-                total += member.monthly_salary
+    salaries = roster_salary_schedule(tc.members, months)
+    inflation_factor = (1 + inflation) ** (np.arange(months) // 12)
+    return ((salaries + salaries * (tc.esop_percentage / 100)) * inflation_factor * cost_mult).tolist()
+
+def activation_schedule(entries: Iterable[Tuple[int, int, float, bool]], months: int) -> np.ndarray:
+    """Monthly totals for dated amounts given as (year, month, amount, recurring) entries.
+
+    Recurring amounts apply from their start month on; the others only in it.
+    Recurring starts are marked in a difference array and accumulated with one
+    cumulative sum, so the cost is O(entries + months) rather than a scan of
+    every entry per month.
+    """
+    starts = np.zeros(months + 1)
+    one_time = np.zeros(months + 1)
+    for year, month, amount, recurring in entries:
+        if recurring:
+            # A month past 12 starts the next January, as the year/month comparison did
+            idx = (year - 1) * 12 + min(max(month, 1), 13) - 1
+            starts[min(max(idx, 0), months)] += amount
         else:
-            # Annual calculation
-            year_start_abs = (year - 1) * 12 + 1
-            year_end_abs = year * 12
-            
-            if member_start_abs_month <= year_end_abs:
-                start = max(member_start_abs_month, year_start_abs)
-                active_months = year_end_abs - start + 1
-                total += member.monthly_salary * active_months
-    
-    # Add ESOP cost
-    esop_cost = total * (tc.esop_percentage / 100)
-    total += esop_cost
-    
-    return total * inflation_factor * cost_mult
+            # A month outside 1-12 is clamped into its year, which annual totals always credited
+            idx = (year - 1) * 12 + min(max(month, 1), 12) - 1
+            if 0 <= idx < months:
+                one_time[idx] += amount
+    return np.cumsum(starts[:months]) + one_time[:months]
+
+def dated_item_schedule(items: List[Any], amount_attr: str, months: int) -> np.ndarray:
+    """Monthly amounts for dated items (recurring from their start month, or one-time)"""
+    return activation_schedule(
+        ((item.start_year, item.start_month, getattr(item, amount_attr), item.is_recurring) for item in items),
+        months
+    )
+
+def hardware_schedule(items: List[HardwareItem], months: int) -> np.ndarray:
+    """Monthly one-time hardware purchase totals"""
+    return activation_schedule(
+        ((item.purchase_year, item.purchase_month, item.unit_cost * item.quantity, False) for item in items),
+        months
+    )
+
+def funding_schedule(rounds: List[FundingRound], months: int) -> np.ndarray:
+    """Funding received per month, each round landing in its own month"""
+    return activation_schedule(((r.year, r.month, r.amount, False) for r in rounds), months)
+
+def sum_by_year(series: List[Any]) -> List[Any]:
+    """Annual totals of a monthly ledger series"""
+    return [sum(series[start:start + 12]) for start in range(0, len(series), 12)]
+
+COST_LINES = [
+    "team", "digital_infra", "physical_infra", "hardware", "marketing",
+    "travel", "admin", "other", "platform_variable", "total"
+]
 
 def calculate_costs(inputs: FinancialInputs, revenue: Dict[str, Any]) -> Dict[str, Any]:
-    """Calculate costs breakdown monthly and annually"""
+    """Calculate a monthly cost ledger over the horizon; Year 1 months and annual totals derive from it"""
     di = inputs.digital_infra
     pi = inputs.physical_infra
     hw = inputs.hardware_costs
@@ -591,14 +771,16 @@ def calculate_costs(inputs: FinancialInputs, revenue: Dict[str, Any]) -> Dict[st
     usage = revenue.get("usage", {})
     scenario_mult = get_scenario_multiplier(inputs.timeline.scenario)
     cost_mult = scenario_mult["cost"]
+    inflation = inputs.timeline.inflation_rate / 100
 
+    years = inputs.timeline.projection_years
     usage_len = len(usage.get("paid_revenue", []))
     if usage_len == 0:
-        usage_len = 60
+        usage_len = years * 12
     def usage_series(name: str):
         return usage.get(name, [0] * usage_len)
 
-    platform_variable_60 = []
+    platform_variable_by_month = []
     paid_revenue_series = usage_series("paid_revenue")
     ads_revenue_series = usage_series("ads_revenue")
     premium_users_series = usage_series("premium_users")
@@ -613,319 +795,180 @@ def calculate_costs(inputs: FinancialInputs, revenue: Dict[str, Any]) -> Dict[st
         audition_video = total_auditions_series[idx] * uc.audition_video_cost_per_request
         notification_cost = notifications_series[idx] * uc.notification_cost_per_message
         ad_serving = ads_revenue_series[idx] * (uc.ad_serving_cost_pct / 100)
-        platform_variable_60.append(
+        platform_variable_by_month.append(
             payment_processing + ai_tagging + ai_search + audition_video + notification_cost + ad_serving
         )
     
-    # Monthly costs for Year 1
-    monthly_costs = {
-        "team": [],
-        "digital_infra": [],
-        "physical_infra": [],
-        "hardware": [],
-        "marketing": [],
-        "travel": [],
-        "admin": [],
-        "other": [],
-        "platform_variable": [],
-        "total": []
-    }
+    # Roster and dated line items expanded once for the whole horizon
+    team_monthly = calculate_team_costs(inputs, years * 12)
+    hardware_monthly = hardware_schedule(hw.items, years * 12).tolist()
+    travel_monthly = dated_item_schedule(tc.items, "estimated_monthly", years * 12).tolist()
+    other_monthly = dated_item_schedule(oe.items, "amount", years * 12).tolist()
+
+    # Monthly ledger for every month of the horizon
+    ledger = {line: [] for line in COST_LINES}
     
-    for month in range(1, 13):
+    for idx in range(years * 12):
+        year = idx // 12 + 1
+        month = idx % 12 + 1
+        inflation_factor = (1 + inflation) ** (year - 1)
+        
         # Team costs
-        team = calculate_team_costs_detailed(inputs, 1, month)
+        team = team_monthly[idx]
         
         # Digital Infrastructure
-        digital = (di.hosting + di.storage + di.saas_tools) * cost_mult
+        ai_cost = di.ai_compute_enabled if year >= di.ai_enabled_year else 0
+        digital = (di.hosting + di.storage + ai_cost + di.saas_tools) * inflation_factor * cost_mult
         
         # Physical Infrastructure (check if started)
-        if pi.office_start_year == 1 and month >= pi.office_start_month:
-            physical = (pi.office_rent + pi.electricity + pi.internet + pi.maintenance) * cost_mult
+        if pi.office_start_year < year or (pi.office_start_year == year and month >= pi.office_start_month):
+            physical = (pi.office_rent + pi.electricity + pi.internet + pi.maintenance) * inflation_factor * cost_mult
         else:
             physical = 0
         
         # Hardware (one-time purchases)
-        hardware = 0
-        for item in hw.items:
-            if item.purchase_year == 1 and item.purchase_month == month:
-                hardware += item.unit_cost * item.quantity
+        hardware = hardware_monthly[idx]
         
-        # Marketing
+        # Marketing: paid channels ramp up over Year 1, then the budget scales yearly
         ramp_months = max(mc.ramp_months_y1, 1)
-        marketing_ramp = min(1.0, month / ramp_months)
-        marketing = (mc.organic + mc.paid * marketing_ramp + mc.influencer * marketing_ramp) * cost_mult
+        marketing_ramp = min(1.0, month / ramp_months) if year == 1 else 1.0
+        marketing_scale = (1 + mc.annual_scale_pct / 100) ** (year - 1)
+        marketing = (
+            mc.organic + mc.paid * marketing_ramp + mc.influencer * marketing_ramp
+        ) * marketing_scale * inflation_factor * cost_mult
         
         # Travel
-        travel = 0
-        for item in tc.items:
-            if item.start_year == 1 and month >= item.start_month:
-                if item.is_recurring:
-                    travel += item.estimated_monthly
-                elif month == item.start_month:
-                    travel += item.estimated_monthly
-        travel *= cost_mult
+        travel = travel_monthly[idx] * inflation_factor * cost_mult
         
         # Admin
-        admin_base = (ac.legal + ac.compliance + ac.accounting) * cost_mult
+        admin_base = (ac.legal + ac.compliance + ac.accounting) * inflation_factor * cost_mult
         admin = admin_base * (1 + ac.misc_buffer_percentage / 100)
         
         # Other Expenses
-        other = 0
-        for item in oe.items:
-            if item.start_year == 1 and month >= item.start_month:
-                if item.is_recurring:
-                    other += item.amount
-                elif month == item.start_month:
-                    other += item.amount
-        other *= cost_mult
-
-        idx = month - 1
-        platform_variable = platform_variable_60[idx] if idx < len(platform_variable_60) else 0
-        
-        total = team + digital + physical + hardware + marketing + travel + admin + other + platform_variable
-        
-        monthly_costs["team"].append(int(team))
-        monthly_costs["digital_infra"].append(int(digital))
-        monthly_costs["physical_infra"].append(int(physical))
-        monthly_costs["hardware"].append(int(hardware))
-        monthly_costs["marketing"].append(int(marketing))
-        monthly_costs["travel"].append(int(travel))
-        monthly_costs["admin"].append(int(admin))
-        monthly_costs["other"].append(int(other))
-        monthly_costs["platform_variable"].append(int(platform_variable))
-        monthly_costs["total"].append(int(total))
-    
-    # Annual costs for Years 1-5
-    annual_costs = {
-        "team": [],
-        "digital_infra": [],
-        "physical_infra": [],
-        "hardware": [],
-        "marketing": [],
-        "travel": [],
-        "admin": [],
-        "other": [],
-        "platform_variable": [],
-        "total": []
-    }
-    
-    inflation = inputs.timeline.inflation_rate / 100
-    
-    for year in range(5):
-        inflation_factor = (1 + inflation) ** year
-        
-        # Team costs
-        team = calculate_team_costs_detailed(inputs, year + 1)
-        
-        # Digital Infrastructure
-        ai_cost = di.ai_compute_enabled if year + 1 >= di.ai_enabled_year else 0
-        digital = (di.hosting + di.storage + ai_cost + di.saas_tools) * 12 * inflation_factor * cost_mult
-        
-        # Physical Infrastructure
-        if year + 1 >= pi.office_start_year:
-            if year + 1 == pi.office_start_year:
-                active_months = 12 - pi.office_start_month + 1
-            else:
-                active_months = 12
-            physical = (pi.office_rent + pi.electricity + pi.internet + pi.maintenance) * active_months * inflation_factor * cost_mult
-        else:
-            physical = 0
-        
-        # Hardware
-        hardware = 0
-        for item in hw.items:
-            if item.purchase_year == year + 1:
-                hardware += item.unit_cost * item.quantity
-        
-        # Marketing
-        marketing_scale = (1 + mc.annual_scale_pct / 100) ** year
-        marketing = (mc.organic + mc.paid + mc.influencer) * 12 * marketing_scale * inflation_factor * cost_mult
-        
-        # Travel
-        travel = 0
-        for item in tc.items:
-            if item.start_year <= year + 1:
-                if item.is_recurring:
-                    if item.start_year == year + 1:
-                        travel += item.estimated_monthly * (12 - item.start_month + 1)
-                    else:
-                        travel += item.estimated_monthly * 12
-                elif item.start_year == year + 1:
-                    travel += item.estimated_monthly
-        travel *= inflation_factor * cost_mult
-        
-        # Admin
-        admin_base = (ac.legal + ac.compliance + ac.accounting) * 12 * inflation_factor * cost_mult
-        admin = admin_base * (1 + ac.misc_buffer_percentage / 100)
-        
-        # Other Expenses
-        other = 0
-        for item in oe.items:
-            if item.start_year <= year + 1:
-                if item.is_recurring:
-                    if item.start_year == year + 1:
-                        other += item.amount * (12 - item.start_month + 1)
-                    else:
-                        other += item.amount * 12
-                elif item.start_year == year + 1:
-                    other += item.amount
-        other *= inflation_factor * cost_mult
+        other = other_monthly[idx] * inflation_factor * cost_mult
 
-        start_idx = year * 12
-        end_idx = start_idx + 12
-        platform_variable = sum(platform_variable_60[start_idx:end_idx])
+        platform_variable = platform_variable_by_month[idx] if idx < len(platform_variable_by_month) else 0
         
-        total = team + digital + physical + hardware + marketing + travel + admin + other + platform_variable
-        
-        annual_costs["team"].append(int(team))
-        annual_costs["digital_infra"].append(int(digital))
-        annual_costs["physical_infra"].append(int(physical))
-        annual_costs["hardware"].append(int(hardware))
-        annual_costs["marketing"].append(int(marketing))
-        annual_costs["travel"].append(int(travel))
-        annual_costs["admin"].append(int(admin))
-        annual_costs["other"].append(int(other))
-        annual_costs["platform_variable"].append(int(platform_variable))
-        annual_costs["total"].append(int(total))
+        ledger["team"].append(int(team))
+        ledger["digital_infra"].append(int(digital))
+        ledger["physical_infra"].append(int(physical))
+        ledger["hardware"].append(int(hardware))
+        ledger["marketing"].append(int(marketing))
+        ledger["travel"].append(int(travel))
+        ledger["admin"].append(int(admin))
+        ledger["other"].append(int(other))
+        ledger["platform_variable"].append(int(platform_variable))
+        # The total is the sum of the whole-rupee lines so the ledger adds up exactly
+        ledger["total"].append(sum(ledger[line][-1] for line in COST_LINES[:-1]))
     
     return {
-        "monthly": monthly_costs,
-        "annual": annual_costs
+        "monthly": {k: v[:12] for k, v in ledger.items()},
+        "annual": {k: sum_by_year(v) for k, v in ledger.items()},
+        "ledger": ledger
     }
 
+PNL_LINES = ["revenue", "gross_profit", "operating_expenses", "ebitda", "depreciation", "ebit", "taxes", "net_profit"]
+
+def allocate_by_month(annual: List[int], weights: List[int]) -> List[int]:
+    """Split each year's whole-rupee total across its months in proportion to weights.
+
+    The last month of the year takes the truncation remainder, so the months
+    add back up to the annual figure exactly.
+    """
+    shares = []
+    for year, total in enumerate(annual):
+        year_weights = weights[year * 12:(year + 1) * 12]
+        weight_total = sum(year_weights)
+        months = [int(total * (w / weight_total)) if weight_total else 0 for w in year_weights]
+        months[-1] += total - sum(months)
+        shares.extend(months)
+    return shares
+
 def calculate_pnl(revenue: Dict, costs: Dict, inputs: FinancialInputs) -> Dict[str, Any]:
-    """Calculate Profit & Loss statement"""
+    """Calculate a monthly Profit & Loss ledger; Year 1 months and annual totals derive from it.
+
+    Depreciation and tax are assessed on each year's totals (depreciation_rate
+    is an annual rate on opex, and a loss month offsets profit in the same
+    year), then allocated back to that year's months.
+    """
     tax = inputs.tax_inputs
+    ledger = {line: [] for line in PNL_LINES}
+    ledger["revenue"] = revenue["ledger"]["total"]
     
-    # Monthly P&L for Year 1
-    monthly_pnl = {
-        "revenue": revenue["monthly"]["total"],
-        "gross_profit": [],
-        "operating_expenses": [],
-        "ebitda": [],
-        "depreciation": [],
-        "ebit": [],
-        "taxes": [],
-        "net_profit": []
-    }
-    
-    for month in range(12):
-        rev = revenue["monthly"]["total"][month]
-        total_cost = costs["monthly"]["total"][month]
-        cogs = costs["monthly"].get("platform_variable", [0] * 12)[month]
+    for idx, rev in enumerate(revenue["ledger"]["total"]):
+        total_cost = costs["ledger"]["total"][idx]
+        cogs = costs["ledger"]["platform_variable"][idx]
         operating_expenses = max(total_cost - cogs, 0)
         
         gross_profit = int(rev - cogs)
-        ebitda = gross_profit - operating_expenses
-        depreciation = int(operating_expenses * (tax.depreciation_rate / 100 / 12))
-        ebit = ebitda - depreciation
-        taxes = max(0, int(ebit * (tax.corporate_tax_rate / 100))) if ebit > 0 else 0
-        net_profit = ebit - taxes
-        
-        monthly_pnl["gross_profit"].append(gross_profit)
-        monthly_pnl["operating_expenses"].append(int(operating_expenses))
-        monthly_pnl["ebitda"].append(ebitda)
-        monthly_pnl["depreciation"].append(depreciation)
-        monthly_pnl["ebit"].append(ebit)
-        monthly_pnl["taxes"].append(taxes)
-        monthly_pnl["net_profit"].append(net_profit)
-    
-    # Annual P&L for Years 1-5
-    annual_pnl = {
-        "revenue": revenue["annual"]["total"],
-        "gross_profit": [],
-        "operating_expenses": [],
-        "ebitda": [],
-        "depreciation": [],
-        "ebit": [],
-        "taxes": [],
-        "net_profit": []
-    }
+        ledger["gross_profit"].append(gross_profit)
+        ledger["operating_expenses"].append(int(operating_expenses))
+        ledger["ebitda"].append(gross_profit - operating_expenses)
     
-    for year in range(5):
-        rev = revenue["annual"]["total"][year]
-        total_cost = costs["annual"]["total"][year]
-        cogs = costs["annual"].get("platform_variable", [0] * 5)[year]
-        operating_expenses = max(total_cost - cogs, 0)
-        
-        gross_profit = int(rev - cogs)
-        ebitda = gross_profit - operating_expenses
-        depreciation = int(operating_expenses * (tax.depreciation_rate / 100))
-        ebit = ebitda - depreciation
-        taxes = max(0, int(ebit * (tax.corporate_tax_rate / 100))) if ebit > 0 else 0
-        net_profit = ebit - taxes
-        
-        annual_pnl["gross_profit"].append(gross_profit)
-        annual_pnl["operating_expenses"].append(int(operating_expenses))
-        annual_pnl["ebitda"].append(ebitda)
-        annual_pnl["depreciation"].append(depreciation)
-        annual_pnl["ebit"].append(ebit)
-        annual_pnl["taxes"].append(taxes)
-        annual_pnl["net_profit"].append(net_profit)
+    annual_depreciation = [
+        int(opex * (tax.depreciation_rate / 100)) for opex in sum_by_year(ledger["operating_expenses"])
+    ]
+    ledger["depreciation"] = allocate_by_month(annual_depreciation, ledger["operating_expenses"])
+    ledger["ebit"] = [ebitda - dep for ebitda, dep in zip(ledger["ebitda"], ledger["depreciation"])]
+    annual_taxes = [
+        max(0, int(ebit * (tax.corporate_tax_rate / 100))) if ebit > 0 else 0
+        for ebit in sum_by_year(ledger["ebit"])
+    ]
+    ledger["taxes"] = allocate_by_month(annual_taxes, [max(ebit, 0) for ebit in ledger["ebit"]])
+    ledger["net_profit"] = [ebit - taxes for ebit, taxes in zip(ledger["ebit"], ledger["taxes"])]
     
     return {
-        "monthly": monthly_pnl,
-        "annual": annual_pnl
+        "monthly": {k: v[:12] for k, v in ledger.items()},
+        "annual": {k: sum_by_year(v) for k, v in ledger.items()},
+        "ledger": ledger
     }
 
 def calculate_cashflow(pnl: Dict, inputs: FinancialInputs) -> Dict[str, Any]:
-    """Calculate cash flow and runway"""
+    """Calculate a monthly cash ledger (funding lands in its round's month) and runway"""
     funding = inputs.funding
     
     # Calculate total initial funding (Year 1)
-    initial_cash = sum(r.amount for r in funding.rounds if r.year == 1)
+    initial_cash = sum((r.amount for r in funding.rounds if r.year == 1), 0.0)
     
-    # Monthly cash flow for Year 1
-    monthly_cashflow = {
+    ledger = {
         "operating_cash_flow": [],
         "net_burn": [],
+        "funding_received": [],
         "cumulative_cash": [],
         "runway_months": []
     }
     
-    cumulative = initial_cash
+    funding_monthly = funding_schedule(funding.rounds, len(pnl["ledger"]["ebitda"])).tolist()
+    cumulative = 0
     
-    for month in range(12):
-        ocf = pnl["monthly"]["ebitda"][month]
+    for idx, ocf in enumerate(pnl["ledger"]["ebitda"]):
+        funding_received = funding_monthly[idx]
         net_burn = -ocf if ocf < 0 else 0
-        cumulative += ocf
+        cumulative += ocf + funding_received
         
-        avg_burn = sum(monthly_cashflow["net_burn"][-3:] + [net_burn]) / min(month + 1, 4) if net_burn > 0 else net_burn
+        avg_burn = sum(ledger["net_burn"][-3:] + [net_burn]) / min(idx + 1, 4) if net_burn > 0 else net_burn
         runway = int(cumulative / avg_burn) if avg_burn > 0 else 999
         
-        monthly_cashflow["operating_cash_flow"].append(ocf)
-        monthly_cashflow["net_burn"].append(net_burn)
-        monthly_cashflow["cumulative_cash"].append(int(cumulative))
-        monthly_cashflow["runway_months"].append(min(runway, 999))
+        ledger["operating_cash_flow"].append(ocf)
+        ledger["net_burn"].append(net_burn)
+        ledger["funding_received"].append(funding_received)
+        ledger["cumulative_cash"].append(int(cumulative))
+        ledger["runway_months"].append(min(runway, 999))
     
-    # Annual cash flow for Years 1-5
-    annual_cashflow = {
-        "operating_cash_flow": [],
-        "net_burn": [],
-        "cumulative_cash": [],
-        "funding_received": []
-    }
-    
-    cumulative = 0
-    
-    for year in range(5):
-        ocf = pnl["annual"]["ebitda"][year]
-        
-        # Calculate funding for this year
-        funding_received = sum(r.amount for r in funding.rounds if r.year == year + 1)
-        
-        cumulative += ocf + funding_received
-        net_burn = -ocf if ocf < 0 else 0
-        
-        annual_cashflow["operating_cash_flow"].append(ocf)
-        annual_cashflow["net_burn"].append(net_burn)
-        annual_cashflow["cumulative_cash"].append(int(cumulative))
-        annual_cashflow["funding_received"].append(funding_received)
+    annual_ocf = sum_by_year(ledger["operating_cash_flow"])
+    cash_out_month = next((idx + 1 for idx, cash in enumerate(ledger["cumulative_cash"]) if cash < 0), 0)
     
     return {
-        "monthly": monthly_cashflow,
-        "annual": annual_cashflow,
-        "initial_funding": initial_cash
+        "monthly": {k: ledger[k][:12] for k in ("operating_cash_flow", "net_burn", "cumulative_cash", "runway_months")},
+        "annual": {
+            "operating_cash_flow": annual_ocf,
+            "net_burn": [-ocf if ocf < 0 else 0 for ocf in annual_ocf],
+            "cumulative_cash": ledger["cumulative_cash"][11::12],
+            "funding_received": sum_by_year(ledger["funding_received"])
+        },
+        "ledger": ledger,
+        "initial_funding": initial_cash,
+        "cash_out_month": cash_out_month
     }
 
 def calculate_unit_economics(revenue: Dict, users: Dict, costs: Dict, inputs: FinancialInputs) -> Dict[str, Any]:
@@ -945,18 +988,19 @@ def calculate_unit_economics(revenue: Dict, users: Dict, costs: Dict, inputs: Fi
         "break_even_year": 0
     }
     
-    for year in range(5):
+    years = len(revenue["annual"]["total"])
+    for year in range(years):
         artists = users["annual_artists"][year]
         cds = users["annual_cds"][year]
         total_users = artists + cds
         
         total_rev = revenue["annual"]["total"][year]
-        total_cogs = costs["annual"].get("platform_variable", [0] * 5)[year]
+        total_cogs = costs["annual"].get("platform_variable", [0] * years)[year]
         
         start_idx = year * 12
         end_idx = start_idx + 12
-        avg_premium_artists = sum(usage.get("premium_artists", [0] * 60)[start_idx:end_idx]) / 12
-        avg_premium_cds = sum(usage.get("premium_cds", [0] * 60)[start_idx:end_idx]) / 12
+        avg_premium_artists = sum(usage.get("premium_artists", [0] * years * 12)[start_idx:end_idx]) / 12
+        avg_premium_cds = sum(usage.get("premium_cds", [0] * years * 12)[start_idx:end_idx]) / 12
         
         arpu_artists = revenue["annual"]["artist_premium"][year] / max(avg_premium_artists, 1)
         arpu_cds = (
@@ -975,17 +1019,10 @@ def calculate_unit_economics(revenue: Dict, users: Dict, costs: Dict, inputs: Fi
         metrics["gross_margin_per_user"].append(int(gross_margin))
         metrics["contribution_margin"].append(int(contribution_margin))
     
-    # Find break-even point
+    # Find break-even point: first month with positive cumulative profit in the ledger
     cumulative_profit = 0
-    for month in range(60):
-        year_idx = month // 12
-        month_in_year = month % 12
-        
-        if year_idx == 0:
-            monthly_profit = revenue["monthly"]["total"][month_in_year] - costs["monthly"]["total"][month_in_year]
-        else:
-            monthly_profit = (revenue["annual"]["total"][year_idx] - costs["annual"]["total"][year_idx]) / 12
-        
+    for month in range(years * 12):
+        monthly_profit = revenue["ledger"]["total"][month] - costs["ledger"]["total"][month]
         cumulative_profit += monthly_profit
         
         if cumulative_profit > 0 and metrics["break_even_month"] == 0:
@@ -1007,18 +1044,21 @@ def calculate_key_metrics(revenue: Dict, costs: Dict, pnl: Dict, inputs: Financi
         "capital_efficiency": []
     }
     
+    # Growth rates are compounded from Year 1 to the final year of the horizon
+    years = len(revenue["annual"]["total"])
+    periods = max(years - 1, 1)
     rev_y1 = max(revenue["annual"]["total"][0], 1)
-    rev_y5 = max(revenue["annual"]["total"][4], 1)
-    metrics["revenue_cagr"] = round(((rev_y5 / rev_y1) ** (1/4) - 1) * 100, 1)
+    rev_final = max(revenue["annual"]["total"][-1], 1)
+    metrics["revenue_cagr"] = round(((rev_final / rev_y1) ** (1/periods) - 1) * 100, 1)
     
     cost_y1 = max(costs["annual"]["total"][0], 1)
-    cost_y5 = max(costs["annual"]["total"][4], 1)
-    metrics["cost_cagr"] = round(((cost_y5 / cost_y1) ** (1/4) - 1) * 100, 1)
+    cost_final = max(costs["annual"]["total"][-1], 1)
+    metrics["cost_cagr"] = round(((cost_final / cost_y1) ** (1/periods) - 1) * 100, 1)
     
     # Calculate total funding
     total_funding = sum(r.amount for r in inputs.funding.rounds)
     
-    for year in range(5):
+    for year in range(years):
         rev = max(revenue["annual"]["total"][year], 1)
         cost = costs["annual"]["total"][year]
         ebitda = pnl["annual"]["ebitda"][year]
@@ -1063,8 +1103,10 @@ def calculate_investor_summary(
     inputs: FinancialInputs
 ) -> Dict[str, Any]:
     """Calculate investor summary metrics"""
+    # "Y5" figures fall back to the final year on horizons shorter than five years
+    y5 = min(4, len(revenue["annual"]["total"]) - 1)
     y1_revenue = revenue["annual"]["total"][0]
-    y5_revenue = revenue["annual"]["total"][4]
+    y5_revenue = revenue["annual"]["total"][y5]
     y1_gross_profit = pnl["annual"]["gross_profit"][0]
     y1_ebitda = pnl["annual"]["ebitda"][0]
     y1_net = pnl["annual"]["net_profit"][0]
@@ -1078,7 +1120,7 @@ def calculate_investor_summary(
     arr_y5 = y5_revenue
 
     usage = revenue.get("usage", {})
-    premium_users_y1_avg = sum(usage.get("premium_users", [0] * 60)[:12]) / 12 or 0
+    premium_users_y1_avg = sum(usage.get("premium_users", [0] * 12)[:12]) / 12 or 0
     premium_users_y1_end = usage.get("premium_users", [0] * 12)[11] if usage.get("premium_users") else 0
     new_premium_y1 = max(premium_users_y1_end, 0)
 
@@ -1112,7 +1154,7 @@ def calculate_investor_summary(
         "net_margin_pct_y1": y1_net_margin,
         "revenue_cagr": key_metrics["revenue_cagr"],
         "burn_multiple_y1": key_metrics["burn_multiple"][0],
-        "rule_of_40_y5": key_metrics["rule_of_40"][4],
+        "rule_of_40_y5": key_metrics["rule_of_40"][y5],
         "runway_months": runway_months,
         "cac_y1": int(cac_y1),
         "payback_months": payback_months,
@@ -1120,17 +1162,24 @@ def calculate_investor_summary(
         "ltv_cd": int(cd_ltv),
     }
 
+SCENARIOS = ["conservative", "base", "aggressive"]
+
 def calculate_all_scenarios(base_inputs: FinancialInputs) -> Dict[str, Any]:
     """Calculate projections for all three scenarios"""
+    revenue_fn, costs_fn = get_engine()
+    if revenue_fn is not calculate_revenue:
+        return batch_scenarios(stack_inputs([base_inputs]))[0]
+
     scenarios = {}
-    
-    for scenario in ["conservative", "base", "aggressive"]:
-        scenario_inputs = base_inputs.model_copy(deep=True)
-        scenario_inputs.timeline.scenario = scenario
+    for scenario in SCENARIOS:
+        # The calculators only read inputs, so sharing every other section is safe
+        scenario_inputs = base_inputs.model_copy(
+            update={"timeline": base_inputs.timeline.model_copy(update={"scenario": scenario})}
+        )
         
         users = calculate_monthly_users(scenario_inputs)
-        revenue = calculate_revenue(scenario_inputs, users)
-        costs = calculate_costs(scenario_inputs, revenue)
+        revenue = revenue_fn(scenario_inputs, users)
+        costs = costs_fn(scenario_inputs, revenue)
         pnl = calculate_pnl(revenue, costs, scenario_inputs)
         cashflow = calculate_cashflow(pnl, scenario_inputs)
         
@@ -1143,6 +1192,2464 @@ def calculate_all_scenarios(base_inputs: FinancialInputs) -> Dict[str, Any]:
     
     return scenarios
 
+# ============ VECTORIZED ENGINE ============
+#
+# Plans are stacked along a leading plan axis: scalar inputs become (N, 1)
+# columns keyed by "section.field" and dated line items are expanded into
+# per-plan schedules, so every stage is whole-array arithmetic over
+# (plan, month) or (plan, year). Values are truncated at the same points
+# as the reference functions above, so results match them exactly.
+
+def scalar_input_fields() -> List[tuple]:
+    """(section, field) pairs for every numeric scalar in FinancialInputs"""
+    fields = []
+    for section, section_field in FinancialInputs.model_fields.items():
+        model = section_field.annotation
+        if isinstance(model, type) and issubclass(model, BaseModel):
+            for name, field in model.model_fields.items():
+                if field.annotation in (int, float):
+                    fields.append((section, name))
+    return fields
+
+SCALAR_INPUT_FIELDS = scalar_input_fields()
+SCALAR_INPUT_PATHS = {f"{section}.{name}" for section, name in SCALAR_INPUT_FIELDS}
+
+# Batches up to this many rows step the premium churn recurrence in plain Python
+PREMIUM_LOOP_MAX_ROWS = 16
+
+def month_grid(months: int) -> Dict[str, np.ndarray]:
+    """Index arrays (0-based month, 1-based year and month-in-year) for the projection axis"""
+    idx = np.arange(months)
+    return {"idx": idx, "year": idx // 12 + 1, "month": idx % 12 + 1}
+
+def stack_item_schedules(plans: List[FinancialInputs], months: int) -> Dict[str, np.ndarray]:
+    """Expand each plan's dated line items into monthly schedules along the plan axis"""
+    n = len(plans)
+    schedules = {
+        "other_income.monthly": np.zeros((n, months)),
+        "travel_costs.monthly": np.zeros((n, months)),
+        "other_expenses.monthly": np.zeros((n, months)),
+        "hardware_costs.monthly": np.zeros((n, months)),
+        "team_costs.monthly": np.zeros((n, months)),
+        "funding.monthly": np.zeros((n, months)),
+        "funding.initial": np.zeros((n, 1)),
+    }
+    for i, plan in enumerate(plans):
+        schedules["other_income.monthly"][i] = dated_item_schedule(plan.other_income.items, "amount", months)
+        schedules["travel_costs.monthly"][i] = dated_item_schedule(
+            plan.travel_costs.items, "estimated_monthly", months
+        )
+        schedules["other_expenses.monthly"][i] = dated_item_schedule(plan.other_expenses.items, "amount", months)
+        schedules["hardware_costs.monthly"][i] = hardware_schedule(plan.hardware_costs.items, months)
+        schedules["team_costs.monthly"][i] = roster_salary_schedule(plan.team_costs.members, months)
+
+        schedules["funding.monthly"][i] = funding_schedule(plan.funding.rounds, months)
+        schedules["funding.initial"][i] = sum(r.amount for r in plan.funding.rounds if r.year == 1)
+    return schedules
+
+def stack_inputs(plans: List[FinancialInputs]) -> Dict[str, np.ndarray]:
+    """Stack plans into column arrays keyed by "section.field" along a leading plan axis.
+
+    All plans must share one projection horizon; it sets the month axis.
+    """
+    horizons = {plan.timeline.projection_years for plan in plans}
+    if len(horizons) != 1:
+        raise ValueError("Plans stacked together must share projection_years")
+    years = horizons.pop()
+    params = {
+        f"{section}.{name}": np.array(
+            [[getattr(getattr(plan, section), name)] for plan in plans], dtype=float
+        )
+        for section, name in SCALAR_INPUT_FIELDS
+    }
+    multipliers = [get_scenario_multiplier(plan.timeline.scenario) for plan in plans]
+    for key in ("growth", "conversion", "cost"):
+        params[f"scenario.{key}"] = np.array([[m[key]] for m in multipliers])
+    for kind in ("artists", "cds"):
+        # NaN marks years that read the y1..y5 fields, so analyses can still vary them
+        params[f"user_growth.{kind}_by_year"] = np.array([
+            growth_targets(plan.user_growth, kind, years) if getattr(plan.user_growth, f"{kind}_by_year")
+            else [np.nan] * years
+            for plan in plans
+        ], dtype=float)
+    params.update(stack_item_schedules(plans, years * 12))
+    return params
+
+def scenario_axis(params: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    """Expand every plan row into one row per scenario (plan-major order).
+
+    Item schedules and scalars are built once per plan and repeated; only
+    the scenario multipliers differ between a plan's rows.
+    """
+    rows = len(params["scenario.cost"])
+    expanded = {k: np.repeat(v, len(SCENARIOS), axis=0) for k, v in params.items()}
+    multipliers = [get_scenario_multiplier(scenario) for scenario in SCENARIOS]
+    for key in ("growth", "conversion", "cost"):
+        expanded[f"scenario.{key}"] = np.tile([[m[key]] for m in multipliers], (rows, 1))
+    return expanded
+
+def to_int_list(values: np.ndarray) -> List[int]:
+    """Truncate toward zero like int() and return plain Python ints"""
+    return np.trunc(values).astype(np.int64).tolist()
+
+def annual_sums(values: np.ndarray) -> np.ndarray:
+    """Sum monthly series per year along the last axis, accumulating left to right like sum()"""
+    by_year = values.reshape(values.shape[:-1] + (-1, 12))
+    if np.issubdtype(by_year.dtype, np.integer):
+        return by_year.sum(axis=-1)
+    return np.cumsum(by_year, axis=-1)[..., -1]
+
+def build_monthly_cumulative_vectorized(annual_targets: np.ndarray) -> np.ndarray:
+    """Array version of build_monthly_cumulative for (N, years) targets"""
+    progress = np.arange(1, 13) / 12
+    first_year = np.trunc(annual_targets[:, :1] * (progress ** 1.5))
+    start = annual_targets[:, :-1, None]
+    end = annual_targets[:, 1:, None]
+    later_years = np.trunc(start + (end - start) * progress).reshape(len(annual_targets), -1)
+    return np.concatenate([first_year, later_years], axis=1)
+
+def calculate_premium_bases_vectorized(
+    monthly_users: np.ndarray,
+    conversion_rate: np.ndarray,
+    churn_rate: np.ndarray,
+    conversion_multiplier: np.ndarray,
+    live: np.ndarray
+) -> np.ndarray:
+    """Array version of calculate_premium_bases for (N, months) user series.
+
+    New premium signups are computed for all months at once; only the churn
+    recurrence itself steps month by month, across all rows together. Months
+    before revenue start are a leading run with no signups, so the base stays
+    at zero there without an explicit reset.
+    """
+    new_users = np.maximum(np.diff(monthly_users, prepend=0, axis=1), 0)
+    new_premium = np.where(live, new_users * (conversion_rate * conversion_multiplier / 100), 0.0)
+    retention = np.broadcast_to(1 - churn_rate / 100, (len(new_premium), 1))
+
+    if len(new_premium) <= PREMIUM_LOOP_MAX_ROWS:
+        # Few rows: plain floats are cheaper than a ufunc call per month
+        rows = []
+        for row_new, (row_retention,) in zip(new_premium.tolist(), retention.tolist()):
+            premium_base = 0.0
+            row = []
+            for new in row_new:
+                premium_base = max(0.0, premium_base * row_retention + new)
+                row.append(premium_base)
+            rows.append(row)
+        return np.asarray(rows)
+
+    new_by_month = np.ascontiguousarray(new_premium.T)
+    retention = retention[:, 0].copy()
+    premium_bases = np.empty_like(new_by_month)
+    premium_base = np.zeros(len(retention))
+    for idx in range(len(new_by_month)):
+        np.multiply(premium_base, retention, out=premium_base)
+        premium_base += new_by_month[idx]
+        np.maximum(premium_base, 0.0, out=premium_base)
+        premium_bases[idx] = premium_base
+    return premium_bases.T
+
+def stacked_growth_targets(params: Dict[str, np.ndarray], kind: str) -> np.ndarray:
+    """(N, years) annual targets: explicit per-year lists, else the y1..y5 fields held flat"""
+    by_year = params[f"user_growth.{kind}_by_year"]
+    year_fields = np.hstack([params[f"user_growth.{kind}_y{y}"] for y in range(1, 6)])
+    from_fields = year_fields[:, np.minimum(np.arange(by_year.shape[1]), 4)]
+    return np.where(np.isnan(by_year), from_fields, by_year)
+
+def batch_users(params: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    """Annual targets (N, years) and monthly cumulative users (N, months) for every plan"""
+    growth = params["scenario.growth"]
+    artist_targets = np.trunc(stacked_growth_targets(params, "artists") * growth)
+    cd_targets = np.trunc(stacked_growth_targets(params, "cds") * growth)
+    return {
+        "annual_artists": artist_targets,
+        "annual_cds": cd_targets,
+        "monthly_artists": build_monthly_cumulative_vectorized(artist_targets),
+        "monthly_cds": build_monthly_cumulative_vectorized(cd_targets),
+    }
+
+def batch_revenue(
+    params: Dict[str, np.ndarray],
+    monthly_artists: np.ndarray,
+    monthly_cds: np.ndarray
+) -> Dict[str, Any]:
+    """Revenue streams and usage drivers for (N, months) user series"""
+    p = params
+    grid = month_grid(monthly_artists.shape[1])
+    live = ~((grid["year"] == 1) & (grid["month"] < p["timeline.revenue_start_month"]))
+    conv_mult = p["scenario.conversion"]
+    plans = len(monthly_artists)
+
+    # Artists and CDs share one pass of the churn recurrence
+    def both(artist_values: np.ndarray, cd_values: np.ndarray) -> np.ndarray:
+        return np.concatenate([
+            np.broadcast_to(artist_values, (plans,) + np.shape(artist_values)[1:]),
+            np.broadcast_to(cd_values, (plans,) + np.shape(cd_values)[1:])
+        ])
+
+    premium = calculate_premium_bases_vectorized(
+        both(monthly_artists, monthly_cds),
+        both(p["artist_monetization.conversion_rate"], p["cd_monetization.conversion_rate"]),
+        both(p["artist_monetization.churn_rate"], p["cd_monetization.churn_rate"]),
+        both(conv_mult, conv_mult),
+        np.concatenate([np.broadcast_to(live, (plans, live.shape[-1]))] * 2)
+    )
+    prem_artists, prem_cds = premium[:plans], premium[plans:]
+    free_artists = np.maximum(monthly_artists - prem_artists, 0)
+    free_cds = np.maximum(monthly_cds - prem_cds, 0)
+
+    jobs = p["volume_assumptions.avg_jobs_per_cd_per_month"]
+    artist_premium_rev = np.where(live, prem_artists * p["artist_monetization.premium_price"], 0)
+    cd_premium_rev = np.where(live, prem_cds * p["cd_monetization.premium_price"], 0)
+
+    total_boosts = (free_cds * jobs * (p["volume_assumptions.boost_rate_free_pct"] / 100)) + (
+        prem_cds * jobs * (p["volume_assumptions.boost_rate_premium_pct"] / 100)
+    )
+    included_boosts = (free_cds * p["plan_limits.free_boosts_per_cd_per_month"]) + (
+        prem_cds * p["plan_limits.premium_boosts_per_cd_per_month"]
+    )
+    paid_boosts = np.where(live, np.maximum(total_boosts - included_boosts, 0), 0)
+    boost_revenue = paid_boosts * p["monetized_actions.boost_price"]
+
+    total_invites = (free_cds * p["volume_assumptions.direct_invites_free_per_cd_per_month"]) + (
+        prem_cds * p["volume_assumptions.direct_invites_premium_per_cd_per_month"]
+    )
+    included_invites = (free_cds * p["plan_limits.free_invites_per_cd_per_month"]) + (
+        prem_cds * p["plan_limits.premium_invites_per_cd_per_month"]
+    )
+    paid_invites = np.where(live, np.maximum(total_invites - included_invites, 0), 0)
+    invite_revenue = paid_invites * p["monetized_actions.invite_credit_price"]
+
+    total_auditions = (free_cds * p["volume_assumptions.auditions_free_per_cd_per_month"]) + (
+        prem_cds * p["volume_assumptions.auditions_premium_per_cd_per_month"]
+    )
+    included_auditions = (free_cds * p["plan_limits.free_auditions_per_cd_per_month"]) + (
+        prem_cds * p["plan_limits.premium_auditions_per_cd_per_month"]
+    )
+    paid_auditions = np.where(live, np.maximum(total_auditions - included_auditions, 0), 0)
+    audition_revenue = paid_auditions * p["monetized_actions.audition_credit_price"]
+
+    premium_users = prem_artists + prem_cds
+    free_users = free_artists + free_cds
+    ads_revenue = np.where(
+        live,
+        free_users * p["monetized_actions.ads_revenue_per_free_user_per_month"] +
+        premium_users * p["monetized_actions.ads_revenue_per_premium_user_per_month"],
+        0
+    )
+
+    other_income = np.broadcast_to(p["other_income.monthly"], monthly_artists.shape)
+    paid_revenue = artist_premium_rev + cd_premium_rev + boost_revenue + invite_revenue + audition_revenue
+    total = paid_revenue + ads_revenue + other_income
+
+    streams = {
+        "artist_premium": artist_premium_rev,
+        "cd_premium": cd_premium_rev,
+        "boosts": boost_revenue,
+        "direct_invites": invite_revenue,
+        "auditions": audition_revenue,
+        "ads": ads_revenue,
+        "other_income": other_income,
+        "total": total
+    }
+    series = {k: np.trunc(v).astype(np.int64) for k, v in streams.items()}
+
+    return {
+        "series": series,
+        "annual": {k: annual_sums(v) for k, v in series.items()},
+        "usage": {
+            "total_artists": monthly_artists,
+            "total_cds": monthly_cds,
+            "premium_artists": prem_artists,
+            "premium_cds": prem_cds,
+            "total_users": monthly_artists + monthly_cds,
+            "premium_users": premium_users,
+            "free_users": free_users,
+            "total_boosts": total_boosts,
+            "paid_boosts": paid_boosts,
+            "total_invites": total_invites,
+            "paid_invites": paid_invites,
+            "total_auditions": total_auditions,
+            "paid_auditions": paid_auditions,
+            "artist_uploads": monthly_artists * p["volume_assumptions.artist_uploads_per_month"],
+            "notifications": (monthly_artists + monthly_cds) * p["volume_assumptions.notifications_per_user_per_month"],
+            "paid_revenue": paid_revenue,
+            "ads_revenue": ads_revenue
+        }
+    }
+
+def batch_costs(params: Dict[str, np.ndarray], usage: Dict[str, np.ndarray]) -> Dict[str, Any]:
+    """Monthly cost ledger, truncated to ints, with Year 1 months and annual totals for every plan"""
+    p = params
+    cost_mult = p["scenario.cost"]
+    inflation = p["timeline.inflation_rate"] / 100
+
+    platform_variable_by_month = (
+        usage["paid_revenue"] * (p["unit_costs.payment_processing_pct"] / 100) +
+        usage["artist_uploads"] * p["unit_costs.ai_tagging_cost_per_upload"] +
+        usage["premium_users"] * p["unit_costs.ai_search_cost_per_premium_user_per_month"] +
+        usage["total_auditions"] * p["unit_costs.audition_video_cost_per_request"] +
+        usage["notifications"] * p["unit_costs.notification_cost_per_message"] +
+        usage["ads_revenue"] * (p["unit_costs.ad_serving_cost_pct"] / 100)
+    )
+    plans = platform_variable_by_month.shape[0]
+    esop = p["team_costs.esop_percentage"] / 100
+    office = (
+        p["physical_infra.office_rent"] + p["physical_infra.electricity"] +
+        p["physical_infra.internet"] + p["physical_infra.maintenance"]
+    )
+    admin_fixed = p["admin_costs.legal"] + p["admin_costs.compliance"] + p["admin_costs.accounting"]
+    admin_buffer = 1 + p["admin_costs.misc_buffer_percentage"] / 100
+
+    # Monthly ledger for every month of the horizon
+    grid = month_grid(platform_variable_by_month.shape[1])
+    year = grid["year"]
+    month = grid["month"]
+    inflation_factor = (1 + inflation) ** (year - 1)
+    team = p["team_costs.monthly"]
+    ai_cost = np.where(year >= p["digital_infra.ai_enabled_year"], p["digital_infra.ai_compute_enabled"], 0)
+    office_open = (p["physical_infra.office_start_year"] < year) | (
+        (p["physical_infra.office_start_year"] == year) & (month >= p["physical_infra.office_start_month"])
+    )
+    marketing_ramp = np.where(
+        year == 1, np.minimum(1.0, month / np.maximum(p["marketing_costs.ramp_months_y1"], 1)), 1.0
+    )
+    marketing_scale = (1 + p["marketing_costs.annual_scale_pct"] / 100) ** (year - 1)
+    ledger = {
+        "team": (team + team * esop) * inflation_factor * cost_mult,
+        "digital_infra": (
+            p["digital_infra.hosting"] + p["digital_infra.storage"] + ai_cost + p["digital_infra.saas_tools"]
+        ) * inflation_factor * cost_mult,
+        "physical_infra": np.where(office_open, office * inflation_factor * cost_mult, 0),
+        "hardware": p["hardware_costs.monthly"],
+        "marketing": (
+            p["marketing_costs.organic"] + p["marketing_costs.paid"] * marketing_ramp +
+            p["marketing_costs.influencer"] * marketing_ramp
+        ) * marketing_scale * inflation_factor * cost_mult,
+        "travel": p["travel_costs.monthly"] * inflation_factor * cost_mult,
+        "admin": admin_fixed * inflation_factor * cost_mult * admin_buffer,
+        "other": p["other_expenses.monthly"] * inflation_factor * cost_mult,
+        "platform_variable": platform_variable_by_month,
+    }
+    ledger = {k: np.trunc(np.broadcast_to(v, (plans, len(year)))).astype(np.int64) for k, v in ledger.items()}
+    ledger["total"] = sum(ledger.values())
+
+    return {
+        "monthly": {k: v[:, :12] for k, v in ledger.items()},
+        "annual": {k: annual_sums(v) for k, v in ledger.items()},
+        "ledger": ledger
+    }
+
+def allocate_months(annual: np.ndarray, weights: np.ndarray) -> np.ndarray:
+    """allocate_by_month for (plan, year) totals over (plan, month) weights"""
+    by_month = weights.reshape(weights.shape[:-1] + (-1, 12))
+    weight_total = by_month.sum(axis=-1, keepdims=True)
+    has_weight = weight_total != 0
+    shares = np.where(
+        has_weight, np.trunc(annual[..., None] * (by_month / np.where(has_weight, weight_total, 1))), 0
+    ).astype(np.int64)
+    shares[..., -1] += annual - shares.sum(axis=-1)
+    return shares.reshape(weights.shape)
+
+def batch_pnl(params: Dict[str, np.ndarray], revenue: Dict[str, Any], costs: Dict[str, Any]) -> Dict[str, Any]:
+    """Monthly P&L ledger, with Year 1 months and annual totals, for every plan.
+
+    As in calculate_pnl, depreciation and tax are assessed per year and
+    allocated back to the months.
+    """
+    total_revenue = revenue["series"]["total"]
+    cogs = costs["ledger"]["platform_variable"]
+    operating_expenses = np.maximum(costs["ledger"]["total"] - cogs, 0)
+    gross_profit = total_revenue - cogs
+    ebitda = gross_profit - operating_expenses
+    annual_depreciation = np.trunc(
+        annual_sums(operating_expenses) * (params["tax_inputs.depreciation_rate"] / 100)
+    ).astype(np.int64)
+    depreciation = allocate_months(annual_depreciation, operating_expenses)
+    ebit = ebitda - depreciation
+    annual_ebit = annual_sums(ebit)
+    annual_taxes = np.where(
+        annual_ebit > 0, np.trunc(annual_ebit * (params["tax_inputs.corporate_tax_rate"] / 100)), 0
+    ).astype(np.int64)
+    taxes = allocate_months(annual_taxes, np.maximum(ebit, 0))
+    ledger = {
+        "revenue": total_revenue,
+        "gross_profit": gross_profit,
+        "operating_expenses": operating_expenses,
+        "ebitda": ebitda,
+        "depreciation": depreciation,
+        "ebit": ebit,
+        "taxes": taxes,
+        "net_profit": ebit - taxes
+    }
+    return {
+        "monthly": {k: v[:, :12] for k, v in ledger.items()},
+        "annual": {k: annual_sums(v) for k, v in ledger.items()},
+        "ledger": ledger
+    }
+
+def batch_cashflow(params: Dict[str, np.ndarray], pnl: Dict[str, Any]) -> Dict[str, Any]:
+    """Monthly cash ledger and runway, with Year 1 months and annual totals, for every plan"""
+    funding = params["funding.monthly"]
+
+    ocf = pnl["ledger"]["ebitda"]
+    net_burn = np.where(ocf < 0, -ocf, 0)
+    cumulative = np.cumsum(ocf + funding, axis=1)
+    # Trailing burn over the current and up to three previous months
+    window = np.cumsum(net_burn, axis=1)
+    window[:, 4:] -= window[:, :-4].copy()
+    window_len = np.minimum(np.arange(1, ocf.shape[1] + 1), 4)
+    avg_burn = np.where(net_burn > 0, window / window_len, net_burn)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        runway = np.where(avg_burn > 0, np.trunc(cumulative / np.where(avg_burn > 0, avg_burn, 1)), 999)
+    runway = np.minimum(runway, 999).astype(np.int64)
+    cumulative_cash = np.trunc(cumulative).astype(np.int64)
+    cash_out = cumulative_cash < 0
+
+    annual_ocf = pnl["annual"]["ebitda"]
+    return {
+        "monthly": {
+            "operating_cash_flow": ocf[:, :12],
+            "net_burn": net_burn[:, :12],
+            "cumulative_cash": cumulative_cash[:, :12],
+            "runway_months": runway[:, :12]
+        },
+        "annual": {
+            "operating_cash_flow": annual_ocf,
+            "net_burn": np.where(annual_ocf < 0, -annual_ocf, 0),
+            "cumulative_cash": cumulative_cash[:, 11::12],
+            "funding_received": annual_sums(funding)
+        },
+        "ledger": {
+            "operating_cash_flow": ocf,
+            "net_burn": net_burn,
+            "funding_received": funding,
+            "cumulative_cash": cumulative_cash,
+            "runway_months": runway
+        },
+        "initial_funding": params["funding.initial"][:, 0],
+        "cash_out_month": np.where(cash_out.any(axis=1), cash_out.argmax(axis=1) + 1, 0)
+    }
+
+def batch_unit_economics(users: Dict[str, np.ndarray], revenue: Dict[str, Any], costs: Dict[str, Any]) -> Dict[str, Any]:
+    """ARPU, margins per user and break-even month for every plan"""
+    annual = revenue["annual"]
+    usage = revenue["usage"]
+    total_users = np.maximum(users["annual_artists"] + users["annual_cds"], 1)
+    avg_premium_artists = annual_sums(usage["premium_artists"]) / 12
+    avg_premium_cds = annual_sums(usage["premium_cds"]) / 12
+    cd_revenue = annual["cd_premium"] + annual["boosts"] + annual["direct_invites"] + annual["auditions"]
+    gross_margin = (annual["total"] - costs["annual"]["platform_variable"]) / total_users
+
+    # Break-even: first month with positive cumulative profit in the ledger
+    monthly_profit = revenue["series"]["total"] - costs["ledger"]["total"]
+    positive = np.cumsum(monthly_profit, axis=1) > 0
+    break_even_month = np.where(positive.any(axis=1), positive.argmax(axis=1) + 1, 0)
+
+    return {
+        "arpu_artists": annual["artist_premium"] / np.maximum(avg_premium_artists, 1),
+        "arpu_cds": cd_revenue / np.maximum(avg_premium_cds, 1),
+        "gross_margin_per_user": gross_margin,
+        "contribution_margin": gross_margin - costs["annual"]["marketing"] / total_users,
+        "break_even_month": break_even_month,
+        "break_even_year": np.where(break_even_month > 0, (break_even_month - 1) // 12 + 1, 0)
+    }
+
+PIPELINE_STAGES = ["users", "revenue", "costs", "pnl", "cashflow", "unit_economics"]
+
+def broadcast_rows(tree: Any, rows: int) -> Any:
+    """Broadcast every array in a nested stage result to the given number of plan rows"""
+    if isinstance(tree, dict):
+        return {k: broadcast_rows(v, rows) for k, v in tree.items()}
+    return np.broadcast_to(tree, (rows,) + tree.shape[1:])
+
+def run_batch(params: Dict[str, np.ndarray], reuse: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Run users → revenue → costs → P&L → cash flow → unit economics over the plan axis.
+
+    Stages passed in `reuse` (results of an earlier run whose inputs are
+    unchanged) are broadcast to the plan rows instead of being recomputed.
+    """
+    rows = len(params["scenario.cost"])
+    result = {k: broadcast_rows(v, rows) for k, v in (reuse or {}).items()}
+    if "users" not in result:
+        result["users"] = batch_users(params)
+    users = result["users"]
+    if "revenue" not in result:
+        result["revenue"] = batch_revenue(params, users["monthly_artists"], users["monthly_cds"])
+    if "costs" not in result:
+        result["costs"] = batch_costs(params, result["revenue"]["usage"])
+    if "pnl" not in result:
+        result["pnl"] = batch_pnl(params, result["revenue"], result["costs"])
+    if "cashflow" not in result:
+        result["cashflow"] = batch_cashflow(params, result["pnl"])
+    if "unit_economics" not in result:
+        result["unit_economics"] = batch_unit_economics(users, result["revenue"], result["costs"])
+    return {stage: result[stage] for stage in PIPELINE_STAGES}
+
+def batch_scenarios(params: Dict[str, np.ndarray]) -> List[Dict[str, Any]]:
+    """Scenario comparison for every plan in one pass along a scenario axis"""
+    scenario_params = scenario_axis(params)
+    users = batch_users(scenario_params)
+    revenue = batch_revenue(scenario_params, users["monthly_artists"], users["monthly_cds"])
+    costs = batch_costs(scenario_params, revenue["usage"])
+    pnl = batch_pnl(scenario_params, revenue, costs)
+    cashflow = batch_cashflow(scenario_params, pnl)
+    series = {
+        "revenue": revenue["annual"]["total"],
+        "costs": costs["annual"]["total"],
+        "ebitda": pnl["annual"]["ebitda"],
+        "cumulative_cash": cashflow["annual"]["cumulative_cash"]
+    }
+    rows = len(params["scenario.cost"])
+    grouped = {k: v.reshape(rows, len(SCENARIOS), -1).tolist() for k, v in series.items()}
+    return [
+        {scenario: {k: v[i][s] for k, v in grouped.items()} for s, scenario in enumerate(SCENARIOS)}
+        for i in range(rows)
+    ]
+
+USAGE_INT_SERIES = {"total_artists", "total_cds", "total_users"}
+
+def format_users(users: Dict[str, np.ndarray], i: int) -> Dict[str, Any]:
+    monthly_artists = to_int_list(users["monthly_artists"][i])
+    monthly_cds = to_int_list(users["monthly_cds"][i])
+    return {
+        "monthly_artists": monthly_artists[:12],
+        "monthly_cds": monthly_cds[:12],
+        "annual_artists": to_int_list(users["annual_artists"][i]),
+        "annual_cds": to_int_list(users["annual_cds"][i]),
+        "artists_by_month": monthly_artists,
+        "cds_by_month": monthly_cds
+    }
+
+def format_revenue(revenue: Dict[str, Any], i: int) -> Dict[str, Any]:
+    return {
+        "monthly": {k: v[i, :12].tolist() for k, v in revenue["series"].items()},
+        "annual": {k: v[i].tolist() for k, v in revenue["annual"].items()},
+        "ledger": {k: v[i].tolist() for k, v in revenue["series"].items()},
+        "usage": {
+            k: to_int_list(v[i]) if k in USAGE_INT_SERIES else v[i].tolist()
+            for k, v in revenue["usage"].items()
+        }
+    }
+
+def format_costs(costs: Dict[str, Any], i: int) -> Dict[str, Any]:
+    return {period: {k: v[i].tolist() for k, v in lines.items()} for period, lines in costs.items()}
+
+def format_cashflow(cashflow: Dict[str, Any], i: int) -> Dict[str, Any]:
+    return {
+        "monthly": {k: v[i].tolist() for k, v in cashflow["monthly"].items()},
+        "annual": {k: v[i].tolist() for k, v in cashflow["annual"].items()},
+        "ledger": {k: v[i].tolist() for k, v in cashflow["ledger"].items()},
+        "initial_funding": cashflow["initial_funding"][i].item(),
+        "cash_out_month": int(cashflow["cash_out_month"][i])
+    }
+
+def format_projection(batch: Dict[str, Any], i: int, inputs: FinancialInputs) -> Dict[str, Any]:
+    """Build the /calculate response for plan i of a batch run (without scenarios)"""
+    users = format_users(batch["users"], i)
+    revenue = format_revenue(batch["revenue"], i)
+    costs = format_costs(batch["costs"], i)
+    pnl = {period: {k: v[i].tolist() for k, v in lines.items()} for period, lines in batch["pnl"].items()}
+    pnl["monthly"]["revenue"] = revenue["monthly"]["total"]
+    pnl["annual"]["revenue"] = revenue["annual"]["total"]
+    pnl["ledger"]["revenue"] = revenue["ledger"]["total"]
+    cashflow = format_cashflow(batch["cashflow"], i)
+    ue = batch["unit_economics"]
+    unit_economics = {
+        "arpu_artists": to_int_list(ue["arpu_artists"][i]),
+        "arpu_cds": to_int_list(ue["arpu_cds"][i]),
+        "gross_margin_per_user": to_int_list(ue["gross_margin_per_user"][i]),
+        "contribution_margin": to_int_list(ue["contribution_margin"][i]),
+        "break_even_month": int(ue["break_even_month"][i]),
+        "break_even_year": int(ue["break_even_year"][i])
+    }
+    key_metrics = calculate_key_metrics(revenue, costs, pnl, inputs)
+    investor_summary = calculate_investor_summary(
+        revenue, costs, pnl, cashflow, users, unit_economics, key_metrics, inputs
+    )
+    return {
+        "users": users,
+        "revenue": revenue,
+        "costs": costs,
+        "pnl": pnl,
+        "cashflow": cashflow,
+        "unit_economics": unit_economics,
+        "key_metrics": key_metrics,
+        "investor_summary": investor_summary
+    }
+
+def calculate_projections_batch(plans: List[FinancialInputs], scenarios: bool = True) -> List[Dict[str, Any]]:
+    """Full projections (including scenarios unless disabled) for many plans, one vectorized pass per horizon"""
+    by_horizon = {}
+    for i, plan in enumerate(plans):
+        by_horizon.setdefault(plan.timeline.projection_years, []).append(i)
+    results = [None] * len(plans)
+    for indices in by_horizon.values():
+        group = [plans[i] for i in indices]
+        params = stack_inputs(group)
+        batch = run_batch(params)
+        scenario_results = batch_scenarios(params) if scenarios else None
+        for j, (i, plan) in enumerate(zip(indices, group)):
+            projection = format_projection(batch, j, plan)
+            if scenarios:
+                projection["scenarios"] = scenario_results[j]
+            results[i] = projection
+    return results
+
+def calculate_revenue_vectorized(inputs: FinancialInputs, users: Dict[str, Any]) -> Dict[str, Any]:
+    """Same as calculate_revenue, computed by the vectorized engine"""
+    monthly_artists = users.get("artists_by_month") or build_monthly_cumulative(users["annual_artists"])
+    monthly_cds = users.get("cds_by_month") or build_monthly_cumulative(users["annual_cds"])
+    revenue = batch_revenue(
+        stack_inputs([inputs]),
+        np.asarray([monthly_artists], dtype=float),
+        np.asarray([monthly_cds], dtype=float)
+    )
+    return format_revenue(revenue, 0)
+
+def calculate_costs_vectorized(inputs: FinancialInputs, revenue: Dict[str, Any]) -> Dict[str, Any]:
+    """Same as calculate_costs, computed by the vectorized engine"""
+    usage = revenue.get("usage", {})
+    usage_len = len(usage.get("paid_revenue", [])) or inputs.timeline.projection_years * 12
+    usage_arrays = {
+        name: np.asarray([usage.get(name, [0] * usage_len)], dtype=float)
+        for name in ("paid_revenue", "artist_uploads", "premium_users", "total_auditions", "notifications", "ads_revenue")
+    }
+    return format_costs(batch_costs(stack_inputs([inputs]), usage_arrays), 0)
+
+def get_engine(name: Optional[str] = None):
+    """Return the (revenue, costs) calculators for the named or configured engine"""
+    if (name or CALC_ENGINE) == "python":
+        return calculate_revenue, calculate_costs
+    return calculate_revenue_vectorized, calculate_costs_vectorized
+
+# ============ ANALYSIS ============
+
+def broadcast_params(params: Dict[str, np.ndarray], rows: int) -> Dict[str, np.ndarray]:
+    """Read-only views of params with the plan axis stretched to the given number of rows"""
+    return {k: np.broadcast_to(v, (rows,) + v.shape[1:]) for k, v in params.items()}
+
+def sample_uncertain_input(
+    spec: UncertainInput,
+    base_value: float,
+    rng: np.random.Generator,
+    size: int
+) -> np.ndarray:
+    """Draw values for one uncertain input; raises ValueError for malformed specs"""
+    kind = spec.distribution.lower()
+    center = base_value if spec.mean is None else spec.mean
+    if kind == "normal":
+        if spec.std is None or spec.std < 0:
+            raise ValueError(f"{spec.field}: normal distribution needs std >= 0")
+        values = rng.normal(center, spec.std, size)
+    elif kind == "lognormal":
+        if spec.std is None or spec.std < 0 or center <= 0:
+            raise ValueError(f"{spec.field}: lognormal distribution needs a positive median and std >= 0")
+        values = center * np.exp(rng.normal(0.0, spec.std, size))
+    elif kind == "uniform":
+        if spec.low is None or spec.high is None or spec.low > spec.high:
+            raise ValueError(f"{spec.field}: uniform distribution needs low <= high")
+        return rng.uniform(spec.low, spec.high, size)
+    elif kind == "triangular":
+        mode = base_value if spec.mode is None else spec.mode
+        if spec.low is None or spec.high is None or not spec.low <= mode <= spec.high or spec.low == spec.high:
+            raise ValueError(f"{spec.field}: triangular distribution needs low <= mode <= high and low < high")
+        return rng.triangular(spec.low, mode, spec.high, size)
+    else:
+        raise ValueError(f"{spec.field}: unknown distribution '{spec.distribution}'")
+    if spec.low is not None or spec.high is not None:
+        values = np.clip(values, spec.low, spec.high)
+    return values
+
+def monte_carlo_chunks(request: MonteCarloRequest):
+    """Yield (draws_done, chunk_outputs) while running the simulation chunk by chunk.
+
+    Each chunk overrides the uncertain fields with (chunk, 1) columns of draws
+    on top of the stacked base plan, so memory stays bounded by MC_CHUNK_SIZE.
+    """
+    base = stack_inputs([request.inputs])
+    overridden = overridden_growth_fields(request.inputs.user_growth)
+    for spec in request.uncertain:
+        if spec.field not in SCALAR_INPUT_PATHS or spec.field == "timeline.projection_years":
+            raise ValueError(f"Unknown or non-numeric input field '{spec.field}'")
+        if spec.field in overridden:
+            raise ValueError(f"'{spec.field}' has no effect while {overridden[spec.field]} is set")
+    draws = min(max(request.draws, 1), MC_MAX_DRAWS)
+    rng = np.random.default_rng(request.seed)
+
+    done = 0
+    while done < draws:
+        size = min(MC_CHUNK_SIZE, draws - done)
+        params = broadcast_params(base, size)
+        for spec in request.uncertain:
+            params[spec.field] = sample_uncertain_input(spec, float(base[spec.field][0, 0]), rng, size)[:, None]
+        batch = run_batch(params)
+        done += size
+        yield done, {
+            "revenue": batch["revenue"]["annual"]["total"],
+            "ebitda": batch["pnl"]["annual"]["ebitda"],
+            "cumulative_cash": batch["cashflow"]["annual"]["cumulative_cash"],
+            "break_even_month": batch["unit_economics"]["break_even_month"],
+        }
+
+def summarize_monte_carlo(outputs: Dict[str, np.ndarray], percentiles: List[float]) -> Dict[str, Any]:
+    """Percentile bands per year plus headline probabilities for simulated outputs"""
+    summary = {"draws": int(len(outputs["revenue"])), "percentiles": percentiles}
+    for metric in ("revenue", "ebitda", "cumulative_cash"):
+        bands = np.percentile(outputs[metric], percentiles, axis=0)
+        summary[metric] = {f"p{q:g}": to_int_list(band) for q, band in zip(percentiles, bands)}
+    break_even = outputs["break_even_month"]
+    reached = break_even[break_even > 0]
+    summary["probability_cash_negative"] = round(float((outputs["cumulative_cash"] < 0).any(axis=1).mean()), 4)
+    summary["probability_break_even"] = round(float(len(reached) / max(len(break_even), 1)), 4)
+    summary["break_even_month"] = {
+        f"p{q:g}": int(v) for q, v in zip(percentiles, np.percentile(reached, percentiles))
+    } if len(reached) else {}
+    return summary
+
+def check_monte_carlo_request(request: MonteCarloRequest):
+    if not request.uncertain:
+        raise ValueError("At least one uncertain input is required")
+    if any(not 0 <= q <= 100 for q in request.percentiles):
+        raise ValueError("Percentiles must be between 0 and 100")
+
+def run_monte_carlo(request: MonteCarloRequest) -> Dict[str, Any]:
+    """Run a full Monte Carlo simulation and summarize it"""
+    check_monte_carlo_request(request)
+    chunks = [outputs for _, outputs in monte_carlo_chunks(request)]
+    outputs = {k: np.concatenate([chunk[k] for chunk in chunks]) for k in chunks[0]}
+    return summarize_monte_carlo(outputs, request.percentiles)
+
+def monte_carlo_progress(request: MonteCarloRequest) -> Iterable[Tuple[float, Dict[str, Any]]]:
+    """Yield (fraction done, summary of the draws so far) after each chunk; the last summary is run_monte_carlo's"""
+    check_monte_carlo_request(request)
+    draws = min(max(request.draws, 1), MC_MAX_DRAWS)
+    chunks = []
+    for done, outputs in monte_carlo_chunks(request):
+        chunks.append(outputs)
+        so_far = {k: np.concatenate([chunk[k] for chunk in chunks]) for k in outputs}
+        yield done / draws, summarize_monte_carlo(so_far, request.percentiles)
+
+# First pipeline stage that reads each input section (or individual field)
+SECTION_STAGES = {
+    "user_growth": "users",
+    "artist_monetization": "revenue",
+    "cd_monetization": "revenue",
+    "monetized_actions": "revenue",
+    "plan_limits": "revenue",
+    "volume_assumptions": "revenue",
+    "unit_costs": "costs",
+    "team_costs": "costs",
+    "physical_infra": "costs",
+    "digital_infra": "costs",
+    "marketing_costs": "costs",
+    "admin_costs": "costs",
+    "tax_inputs": "pnl",
+    "other_income": "revenue",
+    "hardware_costs": "costs",
+    "travel_costs": "costs",
+    "other_expenses": "costs",
+    "funding": "cashflow",
+}
+FIELD_STAGES = {
+    "timeline.revenue_start_month": "revenue",
+    "timeline.inflation_rate": "costs",
+}
+
+def input_stage(field: str) -> Optional[str]:
+    """First pipeline stage affected by a "section.field" input, or None if no stage reads it"""
+    return FIELD_STAGES.get(field) or SECTION_STAGES.get(field.split(".", 1)[0])
+
+# Scalar outputs per plan row; break-even beyond the horizon counts as horizon + 1
+SENSITIVITY_METRICS = {
+    "y1_revenue": lambda batch: batch["revenue"]["annual"]["total"][:, 0],
+    "y5_revenue": lambda batch: batch["revenue"]["annual"]["total"][:, :5][:, -1],
+    "y5_ebitda": lambda batch: batch["pnl"]["annual"]["ebitda"][:, :5][:, -1],
+    "y5_cumulative_cash": lambda batch: batch["cashflow"]["annual"]["cumulative_cash"][:, :5][:, -1],
+    "min_cumulative_cash": lambda batch: batch["cashflow"]["annual"]["cumulative_cash"].min(axis=1),
+    "break_even_month": lambda batch: np.where(
+        batch["unit_economics"]["break_even_month"] > 0,
+        batch["unit_economics"]["break_even_month"],
+        batch["revenue"]["series"]["total"].shape[1] + 1
+    ),
+    "runway_months": lambda batch: batch["cashflow"]["monthly"]["runway_months"][:, -1],
+    "min_monthly_cash": lambda batch: batch["cashflow"]["ledger"]["cumulative_cash"].min(axis=1),
+    "min_runway_months": lambda batch: batch["cashflow"]["ledger"]["runway_months"].min(axis=1),
+    "peak_burn_multiple": lambda batch: batch_burn_multiple(batch).max(axis=1),
+}
+
+def batch_burn_multiple(batch: Dict[str, Any]) -> np.ndarray:
+    """Yearly burn multiple as in calculate_key_metrics (unrounded): burn over new revenue,
+    or over revenue in Year 1"""
+    revenue = batch["revenue"]["annual"]["total"]
+    burn = np.maximum(-batch["pnl"]["annual"]["ebitda"], 0)
+    new_revenue = np.concatenate([revenue[:, :1], np.diff(revenue, axis=1)], axis=1)
+    return burn / np.maximum(new_revenue, 1)
+
+INTEGER_INPUT_FIELDS = {
+    f"{section}.{name}" for section, name in SCALAR_INPUT_FIELDS
+    if FinancialInputs.model_fields[section].annotation.model_fields[name].annotation is int
+}
+
+def reusable_stages(base: Dict[str, Any], stage: str) -> Dict[str, Any]:
+    """Stages of a base run that stay valid when inputs first read by `stage` change"""
+    reuse = {s: base[s] for s in PIPELINE_STAGES[:PIPELINE_STAGES.index(stage)]}
+    if stage in ("pnl", "cashflow"):
+        reuse["unit_economics"] = base["unit_economics"]
+    return reuse
+
+def run_sensitivity(request: SensitivityRequest) -> Dict[str, Any]:
+    """One-at-a-time ±delta_pct sensitivity of selected outputs to numeric inputs.
+
+    Fields are grouped by the first stage they affect; each group runs as one
+    batch (two rows per field) that reuses the base run's upstream stages.
+    """
+    unknown = [name for name in request.outputs if name not in SENSITIVITY_METRICS]
+    if unknown:
+        raise ValueError(f"Unknown outputs {unknown}; choose from {sorted(SENSITIVITY_METRICS)}")
+    if request.delta_pct <= 0:
+        raise ValueError("delta_pct must be positive")
+    fields = request.fields or [f"{section}.{name}" for section, name in SCALAR_INPUT_FIELDS]
+    unknown = [field for field in fields if field not in SCALAR_INPUT_PATHS]
+    if unknown:
+        raise ValueError(f"Unknown or non-numeric input fields {unknown}")
+
+    base_params = stack_inputs([request.inputs])
+    base = run_batch(base_params)
+    base_metrics = {name: SENSITIVITY_METRICS[name](base)[0].item() for name in request.outputs}
+    delta = request.delta_pct / 100
+
+    bars = {name: [] for name in request.outputs}
+    for stage in PIPELINE_STAGES:
+        group = [field for field in fields if input_stage(field) == stage]
+        if not group:
+            continue
+        rows = 2 * len(group)
+        params = broadcast_params(base_params, rows)
+        moved = {}
+        for j, field in enumerate(group):
+            base_value = base_params[field][0, 0]
+            low, high = base_value * (1 - delta), base_value * (1 + delta)
+            if field in INTEGER_INPUT_FIELDS:
+                low, high = round(low), round(high)
+            column = np.full((rows, 1), base_value)
+            column[2 * j, 0], column[2 * j + 1, 0] = low, high
+            params[field] = column
+            moved[field] = (float(low), float(high))
+
+        batch = run_batch(params, reusable_stages(base, stage))
+        for name in request.outputs:
+            values = SENSITIVITY_METRICS[name](batch)
+            for j, field in enumerate(group):
+                low_out, high_out = values[2 * j].item(), values[2 * j + 1].item()
+                bars[name].append({
+                    "field": field,
+                    "input_low": moved[field][0],
+                    "input_high": moved[field][1],
+                    "low": low_out,
+                    "high": high_out,
+                    "swing": abs(high_out - low_out)
+                })
+
+    for name in bars:
+        bars[name].sort(key=lambda bar: bar["swing"], reverse=True)
+    return {
+        "delta_pct": request.delta_pct,
+        "fields_evaluated": sum(input_stage(field) is not None for field in fields),
+        "base": base_metrics,
+        "tornado": bars
+    }
+
+GOAL_SEEK_POINTS = 17  # candidates per batched evaluation; each round narrows the bracket 16x
+GOAL_SEEK_MAX_ROUNDS = 12
+
+def goal_seek_candidates(request: GoalSeekRequest) -> Tuple[float, bool, Any]:
+    """Validate the sought field; return its current value, whether it is an integer, and a
+    function mapping candidate values to stacked params"""
+    inputs = request.inputs
+    field = request.field
+    base_params = stack_inputs([inputs])
+    if field in SCALAR_INPUT_PATHS and field != "timeline.projection_years":
+        overridden = overridden_growth_fields(inputs.user_growth)
+        if field in overridden:
+            raise ValueError(f"'{field}' has no effect while {overridden[field]} is set")
+        if input_stage(field) is None:
+            raise ValueError(f"No projection stage reads '{field}'")
+        def scalar_params(values: np.ndarray) -> Dict[str, np.ndarray]:
+            params = broadcast_params(base_params, len(values))
+            params[field] = values[:, None]
+            return params
+        return float(base_params[field][0, 0]), field in INTEGER_INPUT_FIELDS, scalar_params
+
+    # Item fields (e.g. a funding round's amount) change the stacked schedules, so
+    # each candidate is patched into its own copy of the plan
+    tokens = field.split(".")
+    current: Any = inputs.model_dump()
+    try:
+        for token in tokens:
+            current = current[int(token)] if isinstance(current, list) else current[token]
+    except (KeyError, IndexError, ValueError, TypeError):
+        raise ValueError(f"Unknown input field '{field}'")
+    if len(tokens) < 3 or isinstance(current, bool) or not isinstance(current, (int, float)) or input_stage(field) is None:
+        raise ValueError(f"'{field}' is not a numeric input")
+    pointer = "/" + "/".join(tokens)
+    is_integer = isinstance(current, int)
+    def item_params(values: np.ndarray) -> Dict[str, np.ndarray]:
+        return stack_inputs([
+            apply_inputs_patch(inputs, [PatchOperation(op="replace", path=pointer, value=int(v) if is_integer else float(v))])
+            for v in values
+        ])
+    return float(current), is_integer, item_params
+
+def run_goal_seek(request: GoalSeekRequest) -> Dict[str, Any]:
+    """Find the value of one input at which a metric reaches a target.
+
+    The bracket [low, high] is searched GOAL_SEEK_POINTS candidates at a time:
+    each round evaluates an evenly spaced grid as one batch (reusing the base
+    run's stages upstream of the field), keeps the first sub-interval where the
+    goal flips, and stops once it is narrower than the tolerance. For at_least
+    and at_most the answer is the satisfying edge of that interval; for equal
+    it is the edge whose metric lands closest to the target. The metric is
+    assumed monotonic in the field; otherwise the flip nearest `low` is found.
+    """
+    if request.metric not in SENSITIVITY_METRICS:
+        raise ValueError(f"Unknown metric '{request.metric}'; choose from {sorted(SENSITIVITY_METRICS)}")
+    if request.goal not in ("at_least", "at_most", "equal"):
+        raise ValueError("goal must be at_least, at_most or equal")
+    current, is_integer, candidate_params = goal_seek_candidates(request)
+    low = 0.0 if request.low is None else request.low
+    high = max(abs(current) * 10, 1.0) if request.high is None else request.high
+    if not low < high:
+        raise ValueError("low must be below high")
+    tolerance = (high - low) * 1e-6 if request.tolerance is None else request.tolerance
+    if is_integer:
+        low, high, tolerance = math.ceil(low), math.floor(high), max(tolerance, 1)
+        if low >= high:
+            raise ValueError("The bracket holds fewer than two integer values")
+
+    metric = SENSITIVITY_METRICS[request.metric]
+    stage = input_stage(request.field)
+    base = run_batch(stack_inputs([request.inputs]))
+    reuse = reusable_stages(base, stage)
+    target = request.target
+    evaluations = 0
+
+    def evaluate(values: np.ndarray) -> np.ndarray:
+        nonlocal evaluations
+        evaluations += len(values)
+        return metric(run_batch(candidate_params(values), reuse)).astype(float)
+
+    def grid(lo: float, hi: float) -> np.ndarray:
+        values = np.linspace(lo, hi, GOAL_SEEK_POINTS)
+        return np.unique(np.round(values)) if is_integer else values
+
+    values = grid(low, high)
+    outputs = evaluate(values)
+    if request.goal == "at_least":
+        satisfied = lambda out: out >= target
+    elif request.goal == "at_most":
+        satisfied = lambda out: out <= target
+    elif outputs[0] <= target:
+        satisfied = lambda out: out >= target
+    else:
+        satisfied = lambda out: out <= target
+
+    met = satisfied(outputs)
+    rounds = 1
+    if met.all() or not met.any():
+        best = int(np.argmin(np.abs(outputs - target))) if not met.any() else 0
+        return {
+            "field": request.field,
+            "metric": request.metric,
+            "goal": request.goal,
+            "target": target,
+            "status": "always_met" if met.any() else "unreachable",
+            "value": values[best].item(),
+            "metric_value": outputs[best].item(),
+            "current_value": current,
+            "bracket": [values[0].item(), values[-1].item()],
+            "rounds": rounds,
+            "evaluations": evaluations
+        }
+
+    while True:
+        flip = int(np.argmax(met != met[0]))
+        lo, hi = values[flip - 1], values[flip]
+        lo_out, hi_out = outputs[flip - 1], outputs[flip]
+        lo_met = bool(met[flip - 1])
+        if hi - lo <= tolerance or rounds >= GOAL_SEEK_MAX_ROUNDS:
+            break
+        inner = grid(lo, hi)[1:-1]
+        if len(inner) == 0:
+            break
+        inner_out = evaluate(inner)
+        values = np.concatenate([[lo], inner, [hi]])
+        outputs = np.concatenate([[lo_out], inner_out, [hi_out]])
+        met = np.concatenate([[lo_met], satisfied(inner_out), [not lo_met]])
+        rounds += 1
+
+    if request.goal == "equal":
+        pick_lo = abs(lo_out - target) <= abs(hi_out - target)
+    else:
+        pick_lo = lo_met
+    value, metric_value = (lo, lo_out) if pick_lo else (hi, hi_out)
+    return {
+        "field": request.field,
+        "metric": request.metric,
+        "goal": request.goal,
+        "target": target,
+        "status": "solved",
+        "value": value.item(),
+        "metric_value": metric_value.item(),
+        "current_value": current,
+        "bracket": [lo.item(), hi.item()],
+        "rounds": rounds,
+        "evaluations": evaluations
+    }
+
+# Monthly spend inputs the optimizer can allocate; all are first read by the costs stage.
+# team_costs.new_hires is a salary budget for hires from hire_start_year/month.
+ALLOCATABLE_FIELDS = (
+    "marketing_costs.organic", "marketing_costs.paid", "marketing_costs.influencer",
+    "digital_infra.hosting", "digital_infra.storage", "digital_infra.saas_tools",
+    "digital_infra.ai_compute_enabled", "team_costs.new_hires",
+)
+
+def split_budget(weights: np.ndarray, lower: np.ndarray, upper: np.ndarray, budget: float) -> np.ndarray:
+    """Allocations within [lower, upper] that sum to budget, spreading the slack by weight.
+
+    Weight rows are (candidates, fields); any share over its upper bound is capped
+    and the excess re-spread over the uncapped fields.
+    """
+    allocation = np.broadcast_to(lower, weights.shape).copy()
+    free = np.ones(weights.shape, dtype=bool)
+    remaining = np.full(len(weights), budget - lower.sum())
+    for _ in range(weights.shape[1]):
+        share = np.where(free, weights, 0)
+        total = share.sum(axis=1, keepdims=True)
+        # Rows whose uncapped weights are all zero spread the rest evenly
+        share = np.where(total > 0, share / np.where(total > 0, total, 1), free / np.maximum(free.sum(axis=1, keepdims=True), 1))
+        proposal = allocation + share * remaining[:, None]
+        capped = free & (proposal > upper)
+        if not capped.any():
+            return proposal
+        allocation = np.where(capped, upper, allocation)
+        free &= ~capped
+        remaining = budget - allocation.sum(axis=1)
+    return allocation
+
+def run_optimizer(request: OptimizeRequest) -> Dict[str, Any]:
+    """Best split found after all rounds of optimizer_progress"""
+    for _, result in optimizer_progress(request):
+        pass
+    return result
+
+def optimizer_progress(request: OptimizeRequest) -> Iterable[Tuple[float, Dict[str, Any]]]:
+    """Split a monthly spend budget across cost inputs to optimize one metric under constraints.
+
+    Candidate splits are drawn from a Dirichlet distribution over the budget
+    slack (above each allocation's minimum). Each round evaluates its
+    candidates as batches that reuse the base run's users and revenue, then
+    the next round samples more tightly around the best feasible split so far.
+    A split is feasible when it meets min_runway_months and max_burn_multiple;
+    if none is, the split with the smallest constraint violation is returned.
+    Yields (fraction of rounds done, result for the best split so far).
+    """
+    if request.objective not in SENSITIVITY_METRICS:
+        raise ValueError(f"Unknown objective '{request.objective}'; choose from {sorted(SENSITIVITY_METRICS)}")
+    fields = [allocation.field for allocation in request.allocations]
+    unknown = [field for field in fields if field not in ALLOCATABLE_FIELDS]
+    if unknown or not fields or len(set(fields)) != len(fields):
+        raise ValueError(f"Allocations must be distinct fields from {list(ALLOCATABLE_FIELDS)}; got {fields}")
+    if not 1 <= request.hire_start_month <= 12 or request.hire_start_year < 1:
+        raise ValueError("hire_start_month must be 1-12 and hire_start_year at least 1")
+
+    base_params = stack_inputs([request.inputs])
+    current = np.array([
+        0.0 if field == "team_costs.new_hires" else float(base_params[field][0, 0]) for field in fields
+    ])
+    budget = float(current.sum()) if request.budget is None else request.budget
+    lower = np.array([allocation.min for allocation in request.allocations], dtype=float)
+    upper = np.array([np.inf if allocation.max is None else allocation.max for allocation in request.allocations])
+    if (lower < 0).any() or (upper < lower).any():
+        raise ValueError("Allocation bounds need 0 <= min <= max")
+    if not lower.sum() <= budget <= upper.sum():
+        raise ValueError(f"Budget {budget:g} is outside the allocation bounds [{lower.sum():g}, {upper.sum():g}]")
+
+    months = base_params["team_costs.monthly"].shape[1]
+    hire_start = (request.hire_start_year - 1) * 12 + request.hire_start_month
+    hired = (np.arange(1, months + 1) >= hire_start).astype(float)
+    base = run_batch(base_params)
+    reuse = reusable_stages(base, "costs")
+    objective = SENSITIVITY_METRICS[request.objective]
+    sign = 1.0 if request.maximize else -1.0
+
+    def evaluate(allocation: np.ndarray) -> Dict[str, np.ndarray]:
+        scores, violations, runway, burn = [], [], [], []
+        for start in range(0, len(allocation), MC_CHUNK_SIZE):
+            chunk = allocation[start:start + MC_CHUNK_SIZE]
+            params = broadcast_params(base_params, len(chunk))
+            for j, field in enumerate(fields):
+                if field == "team_costs.new_hires":
+                    params["team_costs.monthly"] = base_params["team_costs.monthly"] + chunk[:, j:j + 1] * hired
+                else:
+                    params[field] = chunk[:, j:j + 1]
+            batch = run_batch(params, reuse)
+            chunk_runway = SENSITIVITY_METRICS["min_runway_months"](batch).astype(float)
+            chunk_burn = SENSITIVITY_METRICS["peak_burn_multiple"](batch)
+            violation = np.zeros(len(chunk))
+            if request.min_runway_months is not None:
+                violation += np.maximum(request.min_runway_months - chunk_runway, 0) / max(abs(request.min_runway_months), 1)
+            if request.max_burn_multiple is not None:
+                violation += np.maximum(chunk_burn - request.max_burn_multiple, 0) / max(abs(request.max_burn_multiple), 1)
+            scores.append(objective(batch).astype(float))
+            violations.append(violation)
+            runway.append(chunk_runway)
+            burn.append(chunk_burn)
+        return {
+            "score": np.concatenate(scores), "violation": np.concatenate(violations),
+            "runway": np.concatenate(runway), "burn": np.concatenate(burn)
+        }
+
+    current_result = evaluate(np.clip(current, 0, None)[None, :])
+    current_summary = {
+        "allocation": {field: float(v) for field, v in zip(fields, current)},
+        "objective_value": current_result["score"][0].item(),
+        "min_runway_months": int(current_result["runway"][0]),
+        "peak_burn_multiple": round(float(current_result["burn"][0]), 2)
+    }
+    rng = np.random.default_rng(request.seed)
+    candidates = request.candidates
+    fixed = np.clip(current, lower, upper)
+    starting = [split_budget(fixed[None, :], lower, upper, budget)[0]] if fixed.sum() > 0 else []
+    best = None
+    evaluations = 0
+    feasible_count = 0
+    concentration = 1.0
+    rounds = request.rounds
+    for round_number in range(1, rounds + 1):
+        if best is None:
+            weights = rng.dirichlet(np.ones(len(fields)), candidates)
+        else:
+            slack = np.maximum(best["allocation"] - lower, 0)
+            center = slack / slack.sum() if slack.sum() > 0 else np.full(len(fields), 1 / len(fields))
+            weights = rng.dirichlet(center * concentration * len(fields) + 0.05, candidates)
+        allocation = split_budget(weights, lower, upper, budget)
+        if best is None:
+            allocation = np.vstack([allocation] + [row[None, :] for row in starting])
+        else:
+            allocation = np.vstack([allocation, best["allocation"][None, :]])
+        result = evaluate(allocation)
+        evaluations += len(allocation)
+        feasible = result["violation"] == 0
+        feasible_count += int(feasible.sum())
+        # Feasible splits rank by objective; otherwise by the smallest violation
+        rank = np.where(feasible, sign * result["score"], -np.inf)
+        pick = int(np.argmax(rank)) if feasible.any() else int(np.argmin(result["violation"]))
+        candidate = {k: v[pick] for k, v in result.items()}
+        candidate["allocation"] = allocation[pick]
+        if best is None or (candidate["violation"], -sign * candidate["score"]) < (best["violation"], -sign * best["score"]):
+            best = candidate
+        concentration *= 4
+
+        yield round_number / rounds, {
+            "status": "optimal" if best["violation"] == 0 else "infeasible",
+            "objective": request.objective,
+            "maximize": request.maximize,
+            "budget": budget,
+            "allocation": {field: float(v) for field, v in zip(fields, best["allocation"])},
+            "objective_value": best["score"].item(),
+            "min_runway_months": int(best["runway"]),
+            "peak_burn_multiple": round(float(best["burn"]), 2),
+            "current": current_summary,
+            "evaluations": evaluations,
+            "feasible_candidates": feasible_count
+        }
+
+# ============ CACHING ============
+
+HASH_EXCLUDED_KEYS = {"id", "created_at", "updated_at"}
+
+def strip_identity(value: Any) -> Any:
+    """Drop ids and timestamps at every depth; item ids are generated per request when omitted"""
+    if isinstance(value, dict):
+        return {k: strip_identity(v) for k, v in value.items() if k not in HASH_EXCLUDED_KEYS}
+    if isinstance(value, list):
+        return [strip_identity(v) for v in value]
+    return value
+
+def inputs_fingerprint(inputs: FinancialInputs) -> str:
+    """SHA-256 of the canonical JSON of everything in the inputs that affects projections"""
+    canonical = json.dumps(strip_identity(inputs.model_dump()), sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+def encode_json(content: Any) -> bytes:
+    """Serialize a response body the same way JSONResponse does"""
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode("utf-8")
+
+def estimated_size(value: Any) -> int:
+    """Approximate memory footprint of a stage output (nested dicts, lists, arrays and scalars)"""
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(estimated_size(k) + estimated_size(v) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        if all(isinstance(item, (int, float)) for item in value):
+            return sys.getsizeof(value) + 32 * len(value)  # boxed number plus its slot
+        return sys.getsizeof(value) + sum(estimated_size(item) for item in value)
+    return sys.getsizeof(value)
+
+class ResultCache:
+    """In-process LRU bounded by the total size of its entries.
+
+    Sizes default to len() of the payload (bytes of a serialized response);
+    pass sizeof=estimated_size for in-memory objects.
+    """
+
+    def __init__(self, max_bytes: int, sizeof=len):
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        self.entries: "OrderedDict[str, Any]" = OrderedDict()
+        self.sizes: Dict[str, int] = {}
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.lock = threading.Lock()  # calculations run on worker threads too
+
+    def get(self, key: str) -> Optional[Any]:
+        with self.lock:
+            payload = self.entries.get(key)
+            if payload is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return payload
+
+    def put(self, key: str, payload: Any) -> None:
+        size = self.sizeof(payload)
+        if size > self.max_bytes:
+            return
+        with self.lock:
+            if self.entries.pop(key, None) is not None:
+                self.size -= self.sizes.pop(key)
+            self.entries[key] = payload
+            self.sizes[key] = size
+            self.size += size
+            while self.size > self.max_bytes:
+                evicted, _ = self.entries.popitem(last=False)
+                self.size -= self.sizes.pop(evicted)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self.lock:
+            self.entries.clear()
+            self.sizes.clear()
+            self.size = 0
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self.entries),
+            "bytes": self.size,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0
+        }
+
+class SingleFlight:
+    """Coalesces concurrent calls with the same key into one run.
+
+    The first caller starts the work as its own task; callers that arrive
+    while it is running await the same task. A caller going away does not
+    cancel the work for the others.
+    """
+
+    def __init__(self):
+        self.calls: Dict[str, "asyncio.Task"] = {}
+        self.runs = 0
+        self.shared = 0
+
+    def do(self, key: str, work: Callable[[], Awaitable[Any]]) -> Tuple[Awaitable[Any], bool]:
+        """(awaitable result, whether an in-flight run was joined)"""
+        task = self.calls.get(key)
+        joined = task is not None
+        if joined:
+            self.shared += 1
+        else:
+            task = asyncio.ensure_future(work())
+            self.calls[key] = task
+            task.add_done_callback(lambda done: self.finish(key, done))
+            self.runs += 1
+        return asyncio.shield(task), joined
+
+    def finish(self, key: str, task: "asyncio.Task") -> None:
+        if self.calls.get(key) is task:
+            del self.calls[key]
+        if not task.cancelled():
+            task.exception()  # retrieved here in case every caller went away
+
+    def stats(self) -> Dict[str, Any]:
+        return {"in_flight": len(self.calls), "runs": self.runs, "shared": self.shared}
+
+result_cache = ResultCache(RESULT_CACHE_MAX_BYTES)
+stage_cache = ResultCache(STAGE_CACHE_MAX_BYTES, sizeof=estimated_size)
+calculation_flights = SingleFlight()
+
+async def cached_calculation(key: str, compute: Callable[[], bytes]) -> Tuple[bytes, str]:
+    """Encoded result for a result-cache key and how it was served: HIT, MISS, or SHARED.
+
+    On a miss, compute runs on a worker thread; concurrent misses for the same
+    key (same inputs_fingerprint, so ids and timestamps do not matter) share
+    that one run instead of each recomputing it.
+    """
+    payload = result_cache.get(key)
+    if payload is not None:
+        return payload, "HIT"
+
+    async def run() -> bytes:
+        payload = await asyncio.to_thread(compute)
+        result_cache.put(key, payload)
+        return payload
+
+    result, joined = calculation_flights.do(key, run)
+    return await result, "SHARED" if joined else "MISS"
+
+# ============ COLUMNAR ENCODING ============
+#
+# Binary alternative to JSON for clients that send
+# Accept: application/vnd.ck.columnar. Every numeric series in the response
+# is packed into little-endian arrays, and everything else stays in a small
+# JSON header:
+#
+#   b"CKC1" | uint32 header length | header JSON | pad to 8 bytes | data
+#
+# header["columns"] lists [path, dtype, length] in storage order: float64
+# columns first, then integer series that fit in int32. Offsets are implied
+# by that order. For batches, a column holds the series of every plan in
+# turn, and its length is a list when the plans' series differ in size.
+
+COLUMNAR_MEDIA_TYPE = "application/vnd.ck.columnar"
+COLUMNAR_MAGIC = b"CKC1"
+COLUMNAR_DTYPES = ("<f8", "<i4")
+INT32_MIN, INT32_MAX = -2**31, 2**31 - 1
+
+def wants_columnar(accept: Optional[str]) -> bool:
+    """Whether an Accept header asks for the columnar encoding"""
+    return bool(accept) and COLUMNAR_MEDIA_TYPE in accept
+
+def is_numeric_series(value: Any) -> bool:
+    return isinstance(value, list) and bool(value) and all(type(v) in (int, float) for v in value)
+
+def split_series(tree: Dict[str, Any], series: Dict[str, list], prefix: str = "") -> Dict[str, Any]:
+    """Move numeric series out of tree into series[path] and return what is left"""
+    rest = {}
+    for key, value in tree.items():
+        path = f"{prefix}.{key}" if prefix else key
+        if is_numeric_series(value):
+            series[path] = value
+        elif isinstance(value, dict) and value:
+            remaining = split_series(value, series, path)
+            if remaining:
+                rest[key] = remaining
+        else:
+            rest[key] = value
+    return rest
+
+def encode_columnar(results: List[Dict[str, Any]], batched: bool = True) -> bytes:
+    """Encode one projection (batched=False) or a list of them in the columnar format"""
+    rests = []
+    per_plan = []
+    for result in results:
+        series = {}
+        rests.append(split_series(result, series))
+        per_plan.append(series)
+
+    columns = {dtype: [] for dtype in COLUMNAR_DTYPES}
+    values = {dtype: [] for dtype in COLUMNAR_DTYPES}
+    for path in dict.fromkeys(path for series in per_plan for path in series):
+        plan_series = [series.get(path, []) for series in per_plan]
+        flat = [v for s in plan_series for v in s]
+        fits_int32 = all(type(v) is int for v in flat) and INT32_MIN <= min(flat) and max(flat) <= INT32_MAX
+        dtype = "<i4" if fits_int32 else "<f8"
+        lengths = [len(s) for s in plan_series]
+        columns[dtype].append([path, dtype, lengths[0] if len(set(lengths)) == 1 else lengths])
+        values[dtype].extend(flat)
+
+    header = encode_json({
+        "version": 1,
+        "plans": len(results) if batched else None,
+        "columns": [column for dtype in COLUMNAR_DTYPES for column in columns[dtype]],
+        "rest": rests if batched else rests[0],
+    })
+    padding = -(len(COLUMNAR_MAGIC) + 4 + len(header)) % 8
+    return b"".join(
+        [COLUMNAR_MAGIC, len(header).to_bytes(4, "little"), header, b" " * padding]
+        + [np.asarray(values[dtype], dtype=dtype).tobytes() for dtype in COLUMNAR_DTYPES]
+    )
+
+def decode_columnar(payload: bytes) -> Any:
+    """Rebuild the JSON structure from a columnar payload (reference decoder)"""
+    if payload[:4] != COLUMNAR_MAGIC:
+        raise ValueError("Not a columnar payload")
+    header_length = int.from_bytes(payload[4:8], "little")
+    header = json.loads(payload[8:8 + header_length])
+    offset = 8 + header_length
+    offset += -offset % 8
+
+    batched = header["plans"] is not None
+    results = header["rest"] if batched else [header["rest"]]
+    for path, dtype, length in header["columns"]:
+        lengths = length if isinstance(length, list) else [length] * len(results)
+        data = np.frombuffer(payload, dtype=dtype, count=sum(lengths), offset=offset)
+        offset += data.nbytes
+        *parents, leaf = path.split(".")
+        start = 0
+        for result, n in zip(results, lengths):
+            if n:
+                node = result
+                for part in parents:
+                    node = node.setdefault(part, {})
+                node[leaf] = data[start:start + n].tolist()
+            start += n
+    return results if batched else results[0]
+
+# ============ STAGE GRAPH ============
+#
+# /calculate as a DAG of stages. Each stage records the input sections it
+# reads and the stages it consumes; its output is cached under a key made of
+# those section hashes and its dependencies' keys. An edit to one section
+# only reruns the stages downstream of it (e.g. tax_inputs → pnl onwards,
+# funding → cashflow and the metrics).
+
+SCENARIO_SECTIONS = (
+    "timeline", "user_growth", "artist_monetization", "cd_monetization", "monetized_actions",
+    "plan_limits", "volume_assumptions", "other_income", "unit_costs", "team_costs",
+    "physical_infra", "digital_infra", "hardware_costs", "marketing_costs", "admin_costs",
+    "travel_costs", "other_expenses", "funding",
+)
+
+PIPELINE_DAG = {
+    "users": {
+        "sections": ("timeline", "user_growth"),
+        "deps": (),
+        "compute": lambda inputs, up: calculate_monthly_users(inputs),
+    },
+    "revenue": {
+        "sections": (
+            "timeline", "artist_monetization", "cd_monetization", "monetized_actions",
+            "plan_limits", "volume_assumptions", "other_income",
+        ),
+        "deps": ("users",),
+        "compute": lambda inputs, up: get_engine()[0](inputs, up["users"]),
+    },
+    "costs": {
+        "sections": (
+            "timeline", "unit_costs", "team_costs", "physical_infra", "digital_infra", "hardware_costs",
+            "marketing_costs", "admin_costs", "travel_costs", "other_expenses",
+        ),
+        "deps": ("revenue",),
+        "compute": lambda inputs, up: get_engine()[1](inputs, up["revenue"]),
+    },
+    "pnl": {
+        "sections": ("tax_inputs",),
+        "deps": ("revenue", "costs"),
+        "compute": lambda inputs, up: calculate_pnl(up["revenue"], up["costs"], inputs),
+    },
+    "cashflow": {
+        "sections": ("funding",),
+        "deps": ("pnl",),
+        "compute": lambda inputs, up: calculate_cashflow(up["pnl"], inputs),
+    },
+    "unit_economics": {
+        "sections": (),
+        "deps": ("revenue", "users", "costs"),
+        "compute": lambda inputs, up: calculate_unit_economics(up["revenue"], up["users"], up["costs"], inputs),
+    },
+    "key_metrics": {
+        "sections": ("funding",),
+        "deps": ("revenue", "costs", "pnl"),
+        "compute": lambda inputs, up: calculate_key_metrics(up["revenue"], up["costs"], up["pnl"], inputs),
+    },
+    "investor_summary": {
+        "sections": ("artist_monetization", "cd_monetization"),
+        "deps": ("revenue", "costs", "pnl", "cashflow", "users", "unit_economics", "key_metrics"),
+        "compute": lambda inputs, up: calculate_investor_summary(
+            up["revenue"], up["costs"], up["pnl"], up["cashflow"], up["users"],
+            up["unit_economics"], up["key_metrics"], inputs
+        ),
+    },
+    "scenarios": {
+        "sections": SCENARIO_SECTIONS,
+        "deps": (),
+        "compute": lambda inputs, up: calculate_all_scenarios(inputs),
+    },
+}
+
+stage_stats = {name: {"hits": 0, "misses": 0} for name in PIPELINE_DAG}
+
+def section_fingerprints(inputs: FinancialInputs) -> Dict[str, str]:
+    """SHA-256 of each input section's canonical JSON (ids and timestamps excluded)"""
+    dumped = strip_identity(inputs.model_dump())
+    return {
+        section: hashlib.sha256(json.dumps(value, sort_keys=True, separators=(",", ":")).encode()).hexdigest()
+        for section, value in dumped.items()
+        if isinstance(value, dict)
+    }
+
+def run_stages(inputs: FinancialInputs, targets: Optional[List[str]] = None) -> Dict[str, Any]:
+    """Evaluate the target stages (default: all) and their dependencies, reusing cached outputs"""
+    sections = section_fingerprints(inputs)
+    keys = {}
+    outputs = {}
+
+    def evaluate(name: str) -> None:
+        if name in outputs:
+            return
+        spec = PIPELINE_DAG[name]
+        for dep in spec["deps"]:
+            evaluate(dep)
+        key_parts = [name] + [sections[s] for s in spec["sections"]] + [keys[d] for d in spec["deps"]]
+        keys[name] = hashlib.sha256("|".join(key_parts).encode()).hexdigest()
+        output = stage_cache.get(keys[name])
+        if output is None:
+            stage_stats[name]["misses"] += 1
+            output = spec["compute"](inputs, outputs)
+            stage_cache.put(keys[name], output)
+        else:
+            stage_stats[name]["hits"] += 1
+        outputs[name] = output
+
+    for name in targets or PIPELINE_DAG:
+        evaluate(name)
+    return outputs
+
+def build_projections(inputs: FinancialInputs) -> Dict[str, Any]:
+    """Every stage's output for one plan, evaluated through the stage graph (ledgers included)"""
+    outputs = run_stages(inputs)
+    return {name: outputs[name] for name in PIPELINE_DAG}
+
+def public_output(output: Any) -> Any:
+    """A stage output as responses carry it: the full-horizon monthly ledger stays internal"""
+    if isinstance(output, dict) and "ledger" in output:
+        return {k: v for k, v in output.items() if k != "ledger"}
+    return output
+
+def public_projection(projection: Dict[str, Any]) -> Dict[str, Any]:
+    """The /calculate response for a projection; ledgers are only returned when named in fields="""
+    return {stage: public_output(output) for stage, output in projection.items()}
+
+def parse_field_selector(fields: str) -> Dict[str, Any]:
+    """Parse "pnl.annual,cashflow.monthly.runway_months" into a selection tree.
+
+    Leaves are None (the whole subtree is selected); a path under an already
+    selected ancestor is absorbed by it.
+    """
+    selection = {}
+    for path in filter(None, (f.strip() for f in fields.split(","))):
+        *parents, leaf = path.split(".")
+        node = selection
+        for part in parents:
+            node = node.setdefault(part, {})
+            if node is None:
+                break
+        else:
+            node[leaf] = None
+    if not selection:
+        raise ValueError("fields selects nothing")
+    unknown = [stage for stage in selection if stage not in PIPELINE_DAG]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+    return selection
+
+def project_fields(tree: Dict[str, Any], selection: Dict[str, Any], prefix: str = "") -> Dict[str, Any]:
+    """Copy only the selected subtrees of a projection; a ledger is copied only when named"""
+    projected = {}
+    for key, sub in selection.items():
+        path = f"{prefix}{key}"
+        if not isinstance(tree, dict) or key not in tree:
+            raise ValueError(f"Unknown field '{path}'")
+        projected[key] = public_output(tree[key]) if sub is None else project_fields(tree[key], sub, f"{path}.")
+    return projected
+
+def build_selected_projections(inputs: FinancialInputs, selection: Dict[str, Any]) -> Dict[str, Any]:
+    """Evaluate only the stages a field selection needs and keep only the selected fields"""
+    return project_fields(run_stages(inputs, list(selection)), selection)
+
+# ============ SESSIONS ============
+#
+# A session keeps the client's current inputs and last projection server-side.
+# Clients send RFC 6902 patches; only the sections they touch are re-validated,
+# the stage graph reruns what those sections feed, and only output series whose
+# values changed are sent back.
+
+def parse_pointer(path: str) -> List[str]:
+    """Split a JSON Pointer into unescaped tokens"""
+    if not path.startswith("/"):
+        raise ValueError(f"Invalid JSON pointer '{path}'")
+    return [token.replace("~1", "/").replace("~0", "~") for token in path[1:].split("/")]
+
+def apply_patch_operation(doc: Any, tokens: List[str], op: str, value: Any) -> None:
+    """Apply one add/remove/replace operation in place below doc"""
+    parent = doc
+    for token in tokens[:-1]:
+        parent = parent[int(token)] if isinstance(parent, list) else parent[token]
+    last = tokens[-1]
+    if isinstance(parent, list):
+        if op == "add":
+            parent.insert(len(parent) if last == "-" else int(last), value)
+        elif op == "remove":
+            del parent[int(last)]
+        else:
+            parent[int(last)] = value
+    else:
+        if op != "add" and last not in parent:
+            raise ValueError(f"Path member '{last}' does not exist")
+        if op == "remove":
+            del parent[last]
+        else:
+            parent[last] = value
+
+def apply_inputs_patch(inputs: FinancialInputs, operations: List[PatchOperation]) -> FinancialInputs:
+    """Return inputs with the patch applied, re-validating only the touched sections"""
+    touched = {}
+    scalars = {}
+    for operation in operations:
+        if operation.op not in ("add", "remove", "replace"):
+            raise ValueError(f"Unsupported patch op '{operation.op}'")
+        tokens = parse_pointer(operation.path)
+        section = tokens[0]
+        if section not in FinancialInputs.model_fields or section in HASH_EXCLUDED_KEYS:
+            raise ValueError(f"Cannot patch '{operation.path}'")
+        if len(tokens) == 1:
+            if operation.op == "remove":
+                raise ValueError(f"Cannot remove '{operation.path}'")
+            scalars[section] = operation.value
+            touched.pop(section, None)
+            continue
+        if section not in touched:
+            current = scalars.pop(section, None) if section in scalars else getattr(inputs, section)
+            touched[section] = current.model_dump() if isinstance(current, BaseModel) else current
+        try:
+            apply_patch_operation(touched[section], tokens[1:], operation.op, operation.value)
+        except (KeyError, IndexError, TypeError) as e:
+            raise ValueError(f"Cannot apply {operation.op} at '{operation.path}': {e}")
+
+    update = {}
+    for section, value in {**scalars, **touched}.items():
+        annotation = FinancialInputs.model_fields[section].annotation
+        if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+            update[section] = annotation.model_validate(value)
+        else:
+            update[section] = FinancialInputs.model_validate({section: value}).__dict__[section]
+    update["updated_at"] = datetime.now(timezone.utc).isoformat()
+    return inputs.model_copy(update=update)
+
+def flatten_outputs(tree: Any, prefix: str = "") -> Dict[str, Any]:
+    """Map dotted paths to the leaf series and scalars of a projection response"""
+    if isinstance(tree, dict):
+        flat = {}
+        for key, value in tree.items():
+            flat.update(flatten_outputs(value, f"{prefix}.{key}" if prefix else key))
+        return flat
+    return {prefix: tree}
+
+def diff_projections(previous: Dict[str, Any], current: Dict[str, Any]) -> Dict[str, Any]:
+    """Series whose values differ; stages served from the stage cache are skipped by identity"""
+    changed = {}
+    for stage, output in current.items():
+        if previous.get(stage) is output:
+            continue
+        before = flatten_outputs(public_output(previous.get(stage, {})), stage)
+        for path, value in flatten_outputs(public_output(output), stage).items():
+            if before.get(path) != value:
+                changed[path] = value
+    return changed
+
+class SessionStore:
+    """Bounded in-process session store with TTL eviction (least recently used goes first when full)"""
+
+    def __init__(self, max_sessions: int, ttl_seconds: float):
+        self.max_sessions = max_sessions
+        self.ttl_seconds = ttl_seconds
+        self.sessions: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+
+    def evict_expired(self) -> None:
+        now = time.monotonic()
+        while self.sessions:
+            session_id, session = next(iter(self.sessions.items()))
+            if session["expires_at"] > now:
+                break
+            del self.sessions[session_id]
+
+    def create(self, inputs: FinancialInputs, projections: Dict[str, Any]) -> str:
+        self.evict_expired()
+        while len(self.sessions) >= self.max_sessions:
+            self.sessions.popitem(last=False)
+        session_id = str(uuid.uuid4())
+        # Patches compute off the event loop; the lock applies them to a session one at a time
+        self.sessions[session_id] = {"inputs": inputs, "projections": projections, "lock": asyncio.Lock()}
+        self.touch(session_id)
+        return session_id
+
+    def get(self, session_id: str) -> Optional[Dict[str, Any]]:
+        self.evict_expired()
+        session = self.sessions.get(session_id)
+        if session is not None:
+            self.touch(session_id)
+        return session
+
+    def touch(self, session_id: str) -> None:
+        self.sessions[session_id]["expires_at"] = time.monotonic() + self.ttl_seconds
+        self.sessions.move_to_end(session_id)
+
+    def delete(self, session_id: str) -> bool:
+        return self.sessions.pop(session_id, None) is not None
+
+session_store = SessionStore(MAX_SESSIONS, SESSION_TTL_SECONDS)
+
+# ============ LIVE RECALCULATION ============
+#
+# Editors stream edits over a WebSocket (/api/live) instead of posting the
+# whole plan on every keystroke. Edits are applied as they arrive, but the
+# projection is only computed once no edit has come in for
+# LIVE_SETTLE_SECONDS, and a result is dropped if another edit landed while it
+# was computed. The client only ever receives the projection for its latest
+# edit, tagged with that edit's seq. Edits keep being read while a projection
+# is computed on a worker thread.
+
+class LiveEditor:
+    """Latest inputs of one live socket and the edit that produced them"""
+
+    def __init__(self):
+        self.inputs: Optional[FinancialInputs] = None
+        self.seq: Any = None  # client's tag for the latest edit, echoed back
+        self.edits = 0
+        self.edited = asyncio.Event()
+
+    def apply(self, message: Dict[str, Any]) -> None:
+        """Apply an {"type": "inputs"} or {"type": "patch"} message; raises ValueError if it is invalid"""
+        kind = message.get("type")
+        if kind == "inputs":
+            inputs = FinancialInputs.model_validate(message.get("inputs") or {})
+        elif kind == "patch":
+            if self.inputs is None:
+                raise ValueError("Send inputs before patching them")
+            operations = [PatchOperation.model_validate(op) for op in message.get("operations") or []]
+            inputs = apply_inputs_patch(self.inputs, operations)
+        else:
+            raise ValueError(f"Unknown message type '{kind}'")
+        self.inputs = inputs
+        self.seq = message.get("seq")
+        self.edits += 1
+        self.edited.set()
+
+    async def settled(self) -> Tuple[int, Any, FinancialInputs]:
+        """Wait for an edit, then for LIVE_SETTLE_SECONDS without another one"""
+        await self.edited.wait()
+        while True:
+            self.edited.clear()
+            try:
+                await asyncio.wait_for(self.edited.wait(), LIVE_SETTLE_SECONDS)
+            except asyncio.TimeoutError:
+                return self.edits, self.seq, self.inputs
+
+async def projection_body(inputs: FinancialInputs) -> bytes:
+    """Encoded /calculate response, shared with /calculate's cache and in-flight runs"""
+    key = f"{inputs_fingerprint(inputs)}|application/json"
+    body, _ = await cached_calculation(key, lambda: encode_json(public_projection(build_projections(inputs))))
+    return body
+
+# ============ SAVED INPUTS ============
+#
+# Listing pages through financial_inputs newest first with a keyset on
+# (created_at, id) rather than skip/limit, so every page costs the same
+# however deep the library goes. Cursors are opaque url-safe tokens.
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+INPUT_LIST_SORT = [("created_at", -1), ("id", -1)]
+INPUT_SUMMARY_PROJECTION = {"_id": 0, "id": 1, "name": 1, "timeline.scenario": 1, "created_at": 1, "updated_at": 1}
+
+def wants_ndjson(accept: Optional[str]) -> bool:
+    return bool(accept) and NDJSON_MEDIA_TYPE in accept
+
+def encode_keyset_cursor(doc: Dict[str, Any]) -> str:
+    """Opaque cursor pointing just past the given document"""
+    return base64.urlsafe_b64encode(encode_json([doc["created_at"], doc["id"]])).decode("ascii")
+
+def keyset_filter(cursor: Optional[str]) -> Dict[str, Any]:
+    """Mongo filter for the documents after a cursor in INPUT_LIST_SORT order"""
+    if not cursor:
+        return {}
+    try:
+        created_at, input_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        if not isinstance(created_at, str) or not isinstance(input_id, str):
+            raise TypeError
+    except (ValueError, TypeError, UnicodeEncodeError):
+        raise ValueError("Invalid cursor")
+    return {"$or": [
+        {"created_at": {"$lt": created_at}},
+        {"created_at": created_at, "id": {"$lt": input_id}},
+    ]}
+
+def summarize_input(doc: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "id": doc.get("id"),
+        "name": doc.get("name"),
+        "scenario": doc.get("timeline", {}).get("scenario"),
+        "created_at": doc.get("created_at"),
+        "updated_at": doc.get("updated_at"),
+    }
+
+def plan_from_create(data: FinancialInputsCreate) -> FinancialInputs:
+    """New saved plan from a create payload; omitted sections take their defaults"""
+    sections = {
+        field: value for field in FinancialInputsCreate.model_fields
+        if field != "name" and (value := getattr(data, field)) is not None
+    }
+    return FinancialInputs(name=data.name or "CK Financial Plan", **sections)
+
+# ============ MATERIALIZED PROJECTIONS ============
+#
+# Saving a plan also stores its /calculate response in `projections`, keyed
+# by input_id and tagged with the input hash and ENGINE_VERSION. The body is
+# kept as encoded JSON bytes so it is served without re-serializing; a few
+# headline metrics sit beside it for sorting and filtering saved plans.
+
+def projection_metrics(projection: Dict[str, Any]) -> Dict[str, Any]:
+    """Headline figures stored with a materialized projection"""
+    revenue = projection["revenue"]["annual"]["total"]
+    y5 = min(4, len(revenue) - 1)
+    return {
+        "y5_revenue": revenue[y5],
+        "y5_ebitda": projection["pnl"]["annual"]["ebitda"][y5],
+        "break_even_month": projection["unit_economics"]["break_even_month"],
+        "min_monthly_cash": min(projection["cashflow"]["ledger"]["cumulative_cash"]),
+    }
+
+def materialize_projection(inputs: FinancialInputs, input_hash: str) -> Dict[str, Any]:
+    """Compute the projection document stored for a saved plan.
+
+    The encoded body also seeds the result cache, so /calculate with the same
+    inputs is served without recomputing.
+    """
+    document = projection_document(inputs, input_hash, build_projections(inputs))
+    result_cache.put(f"{input_hash}|application/json", document["body"])
+    return document
+
+def projection_document(inputs: FinancialInputs, input_hash: str, projection: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "input_id": inputs.id,
+        "input_hash": input_hash,
+        "engine_version": ENGINE_VERSION,
+        "computed_at": datetime.now(timezone.utc).isoformat(),
+        "metrics": projection_metrics(projection),
+        "body": encode_json(public_projection(projection)),
+    }
+
+def materialize_projections_batch(plans: List[FinancialInputs]) -> List[Dict[str, Any]]:
+    """Projection documents for many plans from one vectorized run.
+
+    Unlike materialize_projection this leaves the result cache alone: a bulk
+    import would only evict entries that are actually being requested.
+    """
+    projections = calculate_projections_batch(plans)
+    return [
+        projection_document(plan, inputs_fingerprint(plan), projection)
+        for plan, projection in zip(plans, projections)
+    ]
+
+async def store_projection(database, inputs: FinancialInputs, input_hash: str) -> Dict[str, Any]:
+    document = await asyncio.to_thread(materialize_projection, inputs, input_hash)
+    await database.projections.replace_one({"input_id": inputs.id}, document, upsert=True)
+    return document
+
+# ============ BULK IMPORT ============
+#
+# POST /api/inputs/import reads an NDJSON or JSON array upload as it streams
+# in and writes plans IMPORT_BATCH_SIZE at a time with insert_many, so memory
+# holds one batch however large the upload. Records that fail to parse or
+# validate are reported by position and skipped; the rest are imported.
+
+async def ndjson_records(buffer: bytes, chunks: AsyncIterator[bytes]) -> AsyncIterator[Tuple[Any, Optional[str]]]:
+    """One record per line. A line over MAX_IMPORT_RECORD_BYTES is reported and
+    skipped up to its newline without being held in memory."""
+    too_large = f"Record is larger than {MAX_IMPORT_RECORD_BYTES} bytes"
+    more, skipping = True, False
+    while more:
+        try:
+            chunk = await chunks.__anext__()
+        except StopAsyncIteration:
+            more, chunk = False, b"\n"
+        if skipping:
+            end = chunk.find(b"\n")
+            if end < 0:
+                continue
+            chunk, skipping = chunk[end + 1:], False
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            if not line.strip():
+                continue
+            if len(line) > MAX_IMPORT_RECORD_BYTES:
+                yield None, too_large
+                continue
+            try:
+                yield json.loads(line), None
+            except ValueError as e:
+                yield None, f"Invalid JSON: {e}"
+        if len(buffer) > MAX_IMPORT_RECORD_BYTES:
+            yield None, too_large
+            buffer, skipping = b"", True
+
+async def json_array_records(buffer: bytes, chunks: AsyncIterator[bytes]) -> AsyncIterator[Tuple[Any, Optional[str]]]:
+    """Elements of a top-level JSON array, decoded one at a time.
+
+    A syntax error ends the import at that element: there is no reliable
+    place to resume inside a malformed array.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    parse = json.JSONDecoder().raw_decode
+    try:
+        text = decoder.decode(buffer)
+    except UnicodeDecodeError as e:
+        yield None, f"Invalid UTF-8: {e}"
+        return
+    pos = text.index("[") + 1
+    first, expect_value, more = True, True, True
+    while True:
+        while True:
+            while pos < len(text) and text[pos] in " \t\r\n":
+                pos += 1
+            if pos == len(text):
+                break
+            if text[pos] == "]" and (first or not expect_value):
+                return
+            if text[pos] == "," and not expect_value:
+                pos, expect_value = pos + 1, True
+                continue
+            if not expect_value:
+                yield None, "Invalid JSON: expected ',' or ']' between records"
+                return
+            try:
+                record, pos = parse(text, pos)
+            except json.JSONDecodeError as e:
+                if more and len(text) - pos <= MAX_IMPORT_RECORD_BYTES:
+                    break  # most likely cut off at the chunk boundary
+                yield None, f"Invalid JSON: {e.msg}"
+                return
+            yield record, None
+            first, expect_value = False, False
+        if not more:
+            yield None, "Invalid JSON: array is not closed"
+            return
+        text, pos = text[pos:], 0
+        try:
+            text += decoder.decode(await chunks.__anext__())
+        except StopAsyncIteration:
+            more = False
+            text += decoder.decode(b"", final=True)
+        except UnicodeDecodeError as e:
+            yield None, f"Invalid UTF-8: {e}"
+            return
+
+async def import_records(chunks: AsyncIterator[bytes]) -> AsyncIterator[Tuple[Any, Optional[str]]]:
+    """(record, error) for each record of an upload; a leading '[' means a JSON array, anything else NDJSON"""
+    chunks = chunks.__aiter__()
+    head = b""
+    async for chunk in chunks:
+        head += chunk
+        if head.strip():
+            break
+    if not head.strip():
+        return
+    records = json_array_records if head.lstrip()[:1] == b"[" else ndjson_records
+    async for item in records(head, chunks):
+        yield item
+
+def describe_validation_error(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in detail['loc']) or 'record'}: {detail['msg']}"
+        for detail in error.errors()
+    )
+
+async def import_plans(database, chunks: AsyncIterator[bytes]) -> Dict[str, Any]:
+    """Validate and insert every plan in an upload, reporting failures by record index.
+
+    Each batch is materialized in one vectorized run on the worker pool and
+    written with unordered insert_many calls, so one bad document does not
+    stop the rest of its batch. Batches are written in upload order.
+    """
+    report = {"received": 0, "inserted": 0, "failed": 0, "errors": []}
+
+    def fail(index: int, error: str):
+        report["failed"] += 1
+        if len(report["errors"]) < MAX_IMPORT_ERRORS:
+            report["errors"].append({"index": index, "error": error})
+
+    async def write(batch: List[Tuple[int, FinancialInputs]], materializing: "asyncio.Future") -> None:
+        projections = await materializing
+        docs = [
+            {**plan.model_dump(), "input_hash": projection["input_hash"]}
+            for (_, plan), projection in zip(batch, projections)
+        ]
+        rejected = {}
+        try:
+            await database.financial_inputs.insert_many(docs, ordered=False)
+        except BulkWriteError as e:
+            rejected = {error["index"]: error["errmsg"] for error in e.details.get("writeErrors", [])}
+        for position, (index, _) in enumerate(batch):
+            if position in rejected:
+                fail(index, rejected[position])
+        stored = [projection for position, projection in enumerate(projections) if position not in rejected]
+        if stored:
+            await database.projections.insert_many(stored, ordered=False)
+        report["inserted"] += len(stored)
+
+    # Up to one batch per worker is materializing while earlier ones are written
+    in_flight = deque()
+    batch = []
+    try:
+        async for record, error in import_records(chunks):
+            index = report["received"]
+            report["received"] += 1
+            if error is not None:
+                fail(index, error)
+                continue
+            try:
+                batch.append((index, plan_from_create(FinancialInputsCreate.model_validate(record))))
+            except ValidationError as e:
+                fail(index, describe_validation_error(e))
+                continue
+            if len(batch) >= IMPORT_BATCH_SIZE:
+                plans = [plan for _, plan in batch]
+                in_flight.append((batch, asyncio.ensure_future(offload(materialize_projections_batch, plans))))
+                batch = []
+                if len(in_flight) >= max(ANALYSIS_WORKERS, 1):
+                    await write(*in_flight.popleft())
+        if batch:
+            plans = [plan for _, plan in batch]
+            in_flight.append((batch, asyncio.ensure_future(offload(materialize_projections_batch, plans))))
+        while in_flight:
+            await write(*in_flight.popleft())
+    finally:
+        for _, materializing in in_flight:
+            materializing.cancel()
+    return report
+
+# ============ EXPORT ============
+#
+# POST /api/export streams projections for one or many plans as CSV or XLSX.
+# Plans are computed EXPORT_BATCH_SIZE at a time and each plan's rows are
+# written and flushed before the next is read, so memory does not grow with
+# the number of plans. CSV is long format (one value per row, every plan in
+# one table); XLSX has one worksheet per plan with months or years across.
+# The XLSX package is written by hand: inline strings, no styles, and the
+# workbook part last, once the sheet names are known.
+
+EXPORT_MEDIA_TYPES = {
+    "csv": "text/csv",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+EXPORT_SECTIONS = ("revenue", "costs", "pnl", "cashflow")
+EXPORT_CSV_HEADER = ["plan_id", "plan", "period", "section", "line", "index", "value"]
+
+def export_series(projection: Dict[str, Any]) -> Iterable[Tuple[str, str, str, List[Any]]]:
+    """(period, section, line, values) for every exported series: monthly over the full horizon, then annual"""
+    for section in EXPORT_SECTIONS:
+        for line, values in projection[section]["ledger"].items():
+            yield "monthly", section, line, values
+    for line, values in projection["revenue"]["usage"].items():
+        yield "monthly", "usage", line, values
+    for section in EXPORT_SECTIONS:
+        for line, values in projection[section]["annual"].items():
+            yield "annual", section, line, values
+
+class ExportBuffer:
+    """Write-only sink that hands back whatever was written since the last drain"""
+
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data) -> int:
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self.chunks)
+        self.chunks.clear()
+        return data
+
+class CsvExport:
+    media_type = EXPORT_MEDIA_TYPES["csv"]
+
+    def __init__(self):
+        self.text = io.StringIO()
+        self.writer = csv.writer(self.text, lineterminator="\n")
+        self.writer.writerow(EXPORT_CSV_HEADER)
+
+    def add_plan(self, plan: FinancialInputs, projection: Dict[str, Any]):
+        for period, section, line, values in export_series(projection):
+            self.writer.writerows(
+                (plan.id, plan.name, period, section, line, index, value)
+                for index, value in enumerate(values, 1)
+            )
+
+    def drain(self) -> bytes:
+        data = self.text.getvalue().encode("utf-8")
+        self.text.seek(0)
+        self.text.truncate()
+        return data
+
+    def close(self) -> bytes:
+        return self.drain()
+
+XLSX_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+    '<Override PartName="/xl/workbook.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '</Types>'
+)
+XLSX_ROOT_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" Target="xl/workbook.xml" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument"/>'
+    '</Relationships>'
+)
+XLSX_SHEET_START = (
+    b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    b'<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+)
+XLSX_SHEET_END = b"</sheetData></worksheet>"
+XLSX_SHEET_NAME_MAX = 31
+
+@functools.lru_cache(maxsize=None)
+def xlsx_column(index: int) -> str:
+    """Spreadsheet column letters for a 0-based index (0 -> A, 26 -> AA)"""
+    letters = ""
+    index += 1
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        letters = chr(65 + remainder) + letters
+    return letters
+
+def xml_escape(text: str) -> str:
+    return text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;").replace('"', "&quot;")
+
+def xlsx_row(number: int, cells: List[Any]) -> bytes:
+    parts = [f'<row r="{number}">']
+    for column, value in enumerate(cells):
+        ref = f"{xlsx_column(column)}{number}"
+        if isinstance(value, str):
+            parts.append(f'<c r="{ref}" t="inlineStr"><is><t xml:space="preserve">{xml_escape(value)}</t></is></c>')
+        elif value is not None and math.isfinite(value):
+            parts.append(f'<c r="{ref}"><v>{value}</v></c>')
+    parts.append("</row>")
+    return "".join(parts).encode("utf-8")
+
+def xlsx_sheet_name(position: int, name: str) -> str:
+    """Unique, valid worksheet name: position first so truncation keeps it unique"""
+    cleaned = "".join(" " if ch in '[]:*?/\\' else ch for ch in name).strip("' ")
+    return f"{position} {cleaned}"[:XLSX_SHEET_NAME_MAX].rstrip()
+
+class XlsxExport:
+    media_type = EXPORT_MEDIA_TYPES["xlsx"]
+
+    def __init__(self):
+        self.buffer = ExportBuffer()
+        self.archive = zipfile.ZipFile(self.buffer, "w", compression=zipfile.ZIP_DEFLATED)
+        self.archive.writestr("[Content_Types].xml", XLSX_CONTENT_TYPES)
+        self.archive.writestr("_rels/.rels", XLSX_ROOT_RELS)
+        self.sheets = []
+
+    def add_plan(self, plan: FinancialInputs, projection: Dict[str, Any]):
+        self.sheets.append(xlsx_sheet_name(len(self.sheets) + 1, plan.name))
+        with self.archive.open(f"xl/worksheets/sheet{len(self.sheets)}.xml", "w") as sheet:
+            sheet.write(XLSX_SHEET_START)
+            for number, cells in enumerate(self.plan_rows(plan, projection), 1):
+                sheet.write(xlsx_row(number, cells))
+            sheet.write(XLSX_SHEET_END)
+
+    @staticmethod
+    def plan_rows(plan: FinancialInputs, projection: Dict[str, Any]) -> Iterable[List[Any]]:
+        yield ["Plan", plan.name]
+        yield ["Plan id", plan.id]
+        current = None
+        for period, section, line, values in export_series(projection):
+            if period != current:
+                current = period
+                prefix = "M" if period == "monthly" else "Y"
+                yield []
+                yield [period.capitalize(), "Line", *(f"{prefix}{i}" for i in range(1, len(values) + 1))]
+            yield [section, line, *values]
+
+    def drain(self) -> bytes:
+        return self.buffer.drain()
+
+    def close(self) -> bytes:
+        sheets = "".join(
+            f'<sheet name="{xml_escape(name)}" sheetId="{i}" r:id="rId{i}"/>'
+            for i, name in enumerate(self.sheets, 1)
+        )
+        self.archive.writestr("xl/workbook.xml", (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+            '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+            'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+            f'<sheets>{sheets}</sheets></workbook>'
+        ))
+        relationships = "".join(
+            f'<Relationship Id="rId{i}" Target="worksheets/sheet{i}.xml" '
+            'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet"/>'
+            for i in range(1, len(self.sheets) + 1)
+        )
+        self.archive.writestr("xl/_rels/workbook.xml.rels", (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+            '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+            f'{relationships}</Relationships>'
+        ))
+        self.archive.close()
+        return self.buffer.drain()
+
+def export_batch_job(plans: List[FinancialInputs]) -> List[Dict[str, Any]]:
+    return calculate_projections_batch(plans, scenarios=False)
+
+# ============ DATABASE INDEXES ============
+#
+# Indexes each collection needs, ensured at startup: create_index is a no-op
+# when an identical index already exists. index_report() compares them with
+# the database, adding per-index usage from $indexStats and slow operations
+# recorded by the profiler (system.profile). It backs GET /api/admin/indexes
+# and backend/indexes.py.
+
+INDEX_SPECS = {
+    "financial_inputs": [
+        {"name": "id_unique", "keys": [("id", 1)], "unique": True},
+        {"name": "created_at_id", "keys": [("created_at", -1), ("id", -1)]},
+        {"name": "name", "keys": [("name", 1)]},
+    ],
+    "projections": [
+        {"name": "input_id_unique", "keys": [("input_id", 1)], "unique": True},
+        {"name": "engine_version", "keys": [("engine_version", 1)]},
+        {"name": "metrics_y5_revenue", "keys": [("metrics.y5_revenue", -1)]},
+        {"name": "metrics_break_even_month", "keys": [("metrics.break_even_month", 1)]},
+    ],
+}
+# Most recent profiler entries summarized by the report
+PROFILE_SAMPLE_SIZE = 1000
+
+async def ensure_indexes(database) -> Dict[str, List[str]]:
+    """Create every declared index that is missing; returns index names per collection"""
+    ensured = {}
+    for collection, specs in INDEX_SPECS.items():
+        ensured[collection] = [
+            await database[collection].create_index(spec["keys"], name=spec["name"], unique=spec.get("unique", False))
+            for spec in specs
+        ]
+    return ensured
+
+async def set_profiling(database, slowms: Optional[int]) -> Dict[str, Any]:
+    """Record operations slower than slowms in system.profile (None turns the profiler off)"""
+    if slowms is None:
+        await database.command({"profile": 0})
+    else:
+        await database.command({"profile": 1, "slowms": slowms})
+    status = await database.command({"profile": -1})
+    return {"level": status.get("was"), "slowms": status.get("slowms")}
+
+async def index_report(database, slow_limit: int = 20) -> Dict[str, Any]:
+    """Declared vs present indexes with usage counts, plus the slowest recent query shapes"""
+    collections = {}
+    for collection, specs in INDEX_SPECS.items():
+        stats = [entry async for entry in database[collection].aggregate([{"$indexStats": {}}])]
+        indexes = [
+            {
+                "name": entry["name"],
+                "key": dict(entry["key"]),
+                "ops": int(entry["accesses"]["ops"]),
+                "since": str(entry["accesses"]["since"]),
+            }
+            for entry in stats
+        ]
+        present = {index["name"] for index in indexes}
+        collections[collection] = {
+            "indexes": sorted(indexes, key=lambda index: index["name"]),
+            "missing": [spec["name"] for spec in specs if spec["name"] not in present],
+            "unused": sorted(index["name"] for index in indexes if index["ops"] == 0 and index["name"] != "_id_"),
+        }
+
+    status = await database.command({"profile": -1})
+    namespaces = [f"{database.name}.{collection}" for collection in INDEX_SPECS]
+    recent = await database["system.profile"].find(
+        {"ns": {"$in": namespaces}}, {"_id": 0, "ns": 1, "op": 1, "millis": 1, "planSummary": 1, "docsExamined": 1, "nreturned": 1}
+    ).sort([("ts", -1)]).limit(PROFILE_SAMPLE_SIZE).to_list(PROFILE_SAMPLE_SIZE)
+    shapes = {}
+    for entry in recent:
+        key = (entry.get("ns"), entry.get("op"), entry.get("planSummary", ""))
+        shape = shapes.setdefault(key, {"count": 0, "total_ms": 0, "max_ms": 0, "docs_examined": 0, "returned": 0})
+        shape["count"] += 1
+        shape["total_ms"] += entry.get("millis", 0)
+        shape["max_ms"] = max(shape["max_ms"], entry.get("millis", 0))
+        shape["docs_examined"] += entry.get("docsExamined", 0)
+        shape["returned"] += entry.get("nreturned", 0)
+    slow_queries = sorted(
+        (
+            {
+                "ns": ns,
+                "op": op,
+                "plan": plan,
+                "collection_scan": plan.startswith("COLLSCAN"),
+                "count": shape["count"],
+                "avg_ms": round(shape["total_ms"] / shape["count"], 1),
+                "max_ms": shape["max_ms"],
+                "docs_examined_per_returned": round(shape["docs_examined"] / max(shape["returned"], 1), 1),
+            }
+            for (ns, op, plan), shape in shapes.items()
+        ),
+        key=lambda query: query["max_ms"],
+        reverse=True,
+    )[:slow_limit]
+    return {
+        "collections": collections,
+        "profiler": {"level": status.get("was"), "slowms": status.get("slowms")},
+        "slow_queries": slow_queries,
+    }
+
+# ============ PROGRESS STREAMS ============
+#
+# Long analyses can also be streamed as Server-Sent Events. A progress
+# generator yields (fraction done, result so far); its last result is exactly
+# what the blocking route returns. The whole generator runs as one job in the
+# analysis worker pool, like the blocking routes, and sends each step's
+# encoded event back over a progress channel. The job checks a cancel flag
+# between steps (a Monte Carlo chunk, an optimizer round), so closing the
+# stream cancels the analysis.
+
+SSE_MEDIA_TYPE = "text/event-stream"
+
+def sse_event(event: str, data: Any) -> bytes:
+    return b"event: " + event.encode("ascii") + b"\ndata: " + encode_json(data) + b"\n\n"
+
+def progress_event(fraction: float, result: Dict[str, Any]) -> bytes:
+    if fraction >= 1:
+        return sse_event("result", result)
+    return sse_event("progress", {"percent": round(fraction * 100, 1), "partial": result})
+
+def progress_job(progress: Callable[[Any], Iterable[Tuple[float, Dict[str, Any]]]], request: Any,
+                 channel: Any, cancelled: Any) -> None:
+    """Run progress(request) step by step, putting ("event", bytes) on the channel after each step.
+
+    A failure is sent as ("invalid", detail) for a ValueError or ("failed", None)
+    otherwise, and None marks the end. Stops at the next step once cancelled is set.
+    """
+    events = progress(request)
+    try:
+        for step in events:
+            channel.put(("event", progress_event(*step)))
+            if cancelled.is_set():
+                break
+    except ValueError as e:
+        channel.put(("invalid", str(e)))
+    except Exception:
+        logger.exception("Progress stream failed")
+        channel.put(("failed", None))
+    finally:
+        events.close()
+        channel.put(None)
+
+async def progress_stream(first: bytes, channel: Any, cancelled: Any, job: Awaitable[None]) -> AsyncIterator[bytes]:
+    try:
+        yield first
+        while (message := await asyncio.to_thread(channel.get)) is not None:
+            kind, payload = message
+            if kind == "event":
+                yield payload
+            else:
+                yield sse_event("error", {"detail": payload if kind == "invalid" else "Analysis failed"})
+    finally:
+        cancelled.set()
+        await job
+
+async def stream_analysis(progress: Callable[[Any], Iterable[Tuple[float, Dict[str, Any]]]], request: Any) -> StreamingResponse:
+    """Start progress(request) in the worker pool; its first step, where requests are
+    validated, finishes before any response is sent"""
+    channel, cancelled = progress_channel()
+    job = asyncio.ensure_future(offload(progress_job, progress, request, channel, cancelled))
+    message = await asyncio.to_thread(channel.get)
+    if message is None or message[0] != "event":
+        await job
+        if message is not None and message[0] == "invalid":
+            raise HTTPException(status_code=400, detail=message[1])
+        raise HTTPException(status_code=500, detail="Analysis failed")
+    return StreamingResponse(progress_stream(message[1], channel, cancelled, job), media_type=SSE_MEDIA_TYPE, headers={
+        "Cache-Control": "no-cache", "X-Accel-Buffering": "no"
+    })
+
+# ============ WORKER POOL ============
+#
+# Batch runs, sweeps and simulations are CPU-bound, so they run in a process
+# pool and the event loop stays free for I/O and cheap routes. Jobs are
+# module-level functions: inputs go to the worker as pickled models, and the
+# result comes back as the encoded JSON body, so it crosses the process
+# boundary once as bytes rather than as a tree of Python objects.
+
+analysis_executor: Optional[ProcessPoolExecutor] = None
+
+def get_analysis_executor() -> Optional[ProcessPoolExecutor]:
+    """Lazily started process pool (None when ANALYSIS_WORKERS is 0)"""
+    global analysis_executor
+    if analysis_executor is None and ANALYSIS_WORKERS > 0:
+        # spawn: forked children would inherit the Mongo client and event loop threads
+        analysis_executor = ProcessPoolExecutor(
+            max_workers=ANALYSIS_WORKERS, mp_context=multiprocessing.get_context("spawn")
+        )
+    return analysis_executor
+
+progress_manager: Optional[Any] = None
+
+def progress_channel() -> Tuple[Any, Any]:
+    """(queue, cancel event) a progress job shares with the event loop.
+
+    Pool workers get Manager proxies, which pickle across the process
+    boundary; without a pool the job runs on a thread and plain ones do.
+    """
+    global progress_manager
+    if get_analysis_executor() is None:
+        return queue.Queue(), threading.Event()
+    if progress_manager is None:
+        progress_manager = multiprocessing.get_context("spawn").Manager()
+    return progress_manager.Queue(), progress_manager.Event()
+
+async def offload(job, *args) -> Any:
+    """Run a CPU-heavy job off the event loop"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_analysis_executor(), job, *args)
+
+def batch_job(plans: List[FinancialInputs], columnar: bool = False) -> bytes:
+    results = [public_projection(projection) for projection in calculate_projections_batch(plans)]
+    return encode_columnar(results) if columnar else encode_json({"results": results})
+
+def monte_carlo_job(request: MonteCarloRequest) -> bytes:
+    return encode_json(run_monte_carlo(request))
+
+def sensitivity_job(request: SensitivityRequest) -> bytes:
+    return encode_json(run_sensitivity(request))
+
+def goal_seek_job(request: GoalSeekRequest) -> bytes:
+    return encode_json(run_goal_seek(request))
+
+def optimizer_job(request: OptimizeRequest) -> bytes:
+    return encode_json(run_optimizer(request))
+
 # ============ API ROUTES ============
 
 @api_router.get("/")
@@ -1153,6 +3660,14 @@ async def root():
 async def health_check():
     return {"status": "healthy"}
 
+@api_router.get("/cache/stats")
+async def cache_stats():
+    """Hit/miss counters and size of the /calculate result and stage caches, and single-flight sharing"""
+    return {
+        **result_cache.stats(), "stage_cache": stage_cache.stats(), "stages": stage_stats,
+        "single_flight": calculation_flights.stats()
+    }
+
 @api_router.get("/inputs/default", response_model=FinancialInputs)
 async def get_default_inputs():
     """Get default financial inputs"""
@@ -1163,42 +3678,64 @@ async def save_inputs(inputs: FinancialInputsCreate):
     """Save financial inputs to database"""
     if db is None:
         raise HTTPException(status_code=503, detail="Database not configured")
-    input_obj = FinancialInputs(
-        name=inputs.name or "CK Financial Plan",
-        timeline=inputs.timeline or TimelineInputs(),
-        user_growth=inputs.user_growth or UserGrowthInputs(),
-        artist_monetization=inputs.artist_monetization or ArtistMonetization(),
-        cd_monetization=inputs.cd_monetization or CDMonetization(),
-        transactional=inputs.transactional or TransactionalInputs(),
-        plan_limits=inputs.plan_limits or PlanLimitsInputs(),
-        monetized_actions=inputs.monetized_actions or MonetizedActionsInputs(),
-        volume_assumptions=inputs.volume_assumptions or VolumeAssumptionsInputs(),
-        unit_costs=inputs.unit_costs or UnitCostInputs(),
-        team_costs=inputs.team_costs or TeamCosts(),
-        physical_infra=inputs.physical_infra or PhysicalInfraCosts(),
-        digital_infra=inputs.digital_infra or DigitalInfraCosts(),
-        hardware_costs=inputs.hardware_costs or HardwareCosts(),
-        marketing_costs=inputs.marketing_costs or MarketingCosts(),
-        admin_costs=inputs.admin_costs or AdminCosts(),
-        travel_costs=inputs.travel_costs or TravelCosts(),
-        other_expenses=inputs.other_expenses or OtherExpenses(),
-        other_income=inputs.other_income or OtherIncome(),
-        tax_inputs=inputs.tax_inputs or TaxInputs(),
-        funding=inputs.funding or FundingInputs()
-    )
-    
+    input_obj = plan_from_create(inputs)
+    input_hash = inputs_fingerprint(input_obj)
     doc = input_obj.model_dump()
+    doc["input_hash"] = input_hash
     await db.financial_inputs.insert_one(doc)
+    await store_projection(db, input_obj, input_hash)
     
     return input_obj
 
-@api_router.get("/inputs", response_model=List[FinancialInputs])
-async def get_all_inputs():
-    """Get all saved financial inputs"""
+@api_router.post("/inputs/import")
+async def import_inputs(request: Request):
+    """Bulk-save plans from an NDJSON or JSON array body, read as it streams in.
+
+    Each record takes the same fields as POST /inputs. Returns counts and the
+    index and reason of each record that was skipped.
+    """
+    if db is None:
+        raise HTTPException(status_code=503, detail="Database not configured")
+    report = await import_plans(db, request.stream())
+    return Response(content=encode_json(report), media_type="application/json")
+
+@api_router.get("/inputs")
+async def get_all_inputs(
+    limit: int = DEFAULT_PAGE_SIZE,
+    cursor: Optional[str] = None,
+    view: str = "full",
+    accept: Annotated[Optional[str], Header()] = None,
+):
+    """List saved financial inputs, newest first, one keyset page at a time.
+
+    Returns {"items": [...], "next_cursor": ...}; pass next_cursor back as
+    `cursor` for the following page. view=summary returns only id, name,
+    scenario and timestamps. Accept: application/x-ndjson streams every
+    remaining document (from `cursor` on) as one JSON object per line.
+    """
     if db is None:
         raise HTTPException(status_code=503, detail="Database not configured")
-    inputs = await db.financial_inputs.find({}, {"_id": 0}).to_list(100)
-    return inputs
+    if view not in ("full", "summary"):
+        raise HTTPException(status_code=400, detail="view must be full or summary")
+    try:
+        query = keyset_filter(cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    projection = INPUT_SUMMARY_PROJECTION if view == "summary" else {"_id": 0}
+    shape = summarize_input if view == "summary" else (lambda doc: doc)
+    found = db.financial_inputs.find(query, projection).sort(INPUT_LIST_SORT)
+
+    if wants_ndjson(accept):
+        async def lines():
+            async for doc in found.batch_size(NDJSON_BATCH_SIZE):
+                yield encode_json(shape(doc)) + b"\n"
+        return StreamingResponse(lines(), media_type=NDJSON_MEDIA_TYPE)
+
+    limit = min(max(limit, 1), MAX_PAGE_SIZE)
+    docs = await found.limit(limit + 1).to_list(limit + 1)
+    next_cursor = encode_keyset_cursor(docs[limit - 1]) if len(docs) > limit else None
+    body = {"items": [shape(doc) for doc in docs[:limit]], "next_cursor": next_cursor}
+    return Response(content=encode_json(body), media_type="application/json")
 
 @api_router.get("/inputs/{input_id}", response_model=FinancialInputs)
 async def get_input(input_id: str):
@@ -1210,44 +3747,147 @@ async def get_input(input_id: str):
         raise HTTPException(status_code=404, detail="Input not found")
     return doc
 
+@api_router.get("/inputs/{input_id}/projections")
+async def get_input_projections(input_id: str):
+    """Stored projection for a saved plan, recomputed first if the inputs or engine changed since"""
+    if db is None:
+        raise HTTPException(status_code=503, detail="Database not configured")
+    saved = await db.financial_inputs.find_one({"id": input_id}, {"_id": 0, "input_hash": 1})
+    if saved is None:
+        raise HTTPException(status_code=404, detail="Input not found")
+    stored = await db.projections.find_one(
+        {"input_id": input_id}, {"_id": 0, "input_hash": 1, "engine_version": 1, "body": 1}
+    )
+    fresh = (
+        stored is not None and stored.get("engine_version") == ENGINE_VERSION and
+        saved.get("input_hash") is not None and stored.get("input_hash") == saved["input_hash"]
+    )
+    if fresh:
+        status, body = "HIT", stored["body"]
+    else:
+        doc = await db.financial_inputs.find_one({"id": input_id}, {"_id": 0})
+        inputs = FinancialInputs(**doc)
+        input_hash = inputs_fingerprint(inputs)
+        if saved.get("input_hash") != input_hash:
+            # Plans saved before hashes were stored get theirs backfilled
+            await db.financial_inputs.update_one({"id": input_id}, {"$set": {"input_hash": input_hash}})
+        status = "MISS" if stored is None else "STALE"
+        body = (await store_projection(db, inputs, input_hash))["body"]
+    return Response(content=body, media_type="application/json", headers={
+        "X-Cache": status, "X-Engine-Version": ENGINE_VERSION
+    })
+
 @api_router.post("/calculate")
-async def calculate_projections(inputs: FinancialInputs):
-    """Calculate all financial projections based on inputs"""
-    users = calculate_monthly_users(inputs)
-    revenue = calculate_revenue(inputs, users)
-    costs = calculate_costs(inputs, revenue)
-    pnl = calculate_pnl(revenue, costs, inputs)
-    cashflow = calculate_cashflow(pnl, inputs)
-    unit_economics = calculate_unit_economics(revenue, users, costs, inputs)
-    key_metrics = calculate_key_metrics(revenue, costs, pnl, inputs)
-    investor_summary = calculate_investor_summary(revenue, costs, pnl, cashflow, users, unit_economics, key_metrics, inputs)
-    scenarios = calculate_all_scenarios(inputs)
-    
-    return {
-        "users": users,
-        "revenue": revenue,
-        "costs": costs,
-        "pnl": pnl,
-        "cashflow": cashflow,
-        "unit_economics": unit_economics,
-        "key_metrics": key_metrics,
-        "investor_summary": investor_summary,
-        "scenarios": scenarios
-    }
+async def calculate_projections(
+    inputs: FinancialInputs,
+    fields: Optional[str] = None,
+    accept: Annotated[Optional[str], Header()] = None,
+):
+    """Calculate all financial projections based on inputs.
+
+    `fields` (e.g. "pnl.annual,cashflow.monthly.runway_months,investor_summary")
+    limits both the stages evaluated and the response to those fields. The
+    full-horizon monthly ledgers are only returned when named, e.g.
+    fields=cashflow.ledger. Accept: application/vnd.ck.columnar returns the columnar binary encoding.
+    """
+    columnar = wants_columnar(accept)
+    encode = (lambda content: encode_columnar([content], batched=False)) if columnar else encode_json
+    media_type = COLUMNAR_MEDIA_TYPE if columnar else "application/json"
+    key = f"{inputs_fingerprint(inputs)}|{media_type}"
+    selection = None
+    if fields is not None:
+        try:
+            selection = parse_field_selector(fields)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        key = f"{key}|{json.dumps(selection, sort_keys=True)}"
+    if selection is None:
+        compute = lambda: encode(public_projection(build_projections(inputs)))
+    else:
+        compute = lambda: encode(build_selected_projections(inputs, selection))
+    try:
+        payload, cache_status = await cached_calculation(key, compute)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return Response(content=payload, media_type=media_type, headers={"X-Cache": cache_status, "Vary": "Accept"})
+
+@api_router.post("/calculate/batch")
+async def calculate_projections_many(
+    plans: List[FinancialInputs],
+    accept: Annotated[Optional[str], Header()] = None,
+):
+    """Calculate projections for many input sets in one vectorized pass"""
+    if not plans:
+        raise HTTPException(status_code=400, detail="At least one plan is required")
+    if len(plans) > MAX_BATCH_PLANS:
+        raise HTTPException(status_code=413, detail=f"At most {MAX_BATCH_PLANS} plans per batch")
+    if wants_columnar(accept):
+        return Response(content=await offload(batch_job, plans, True), media_type=COLUMNAR_MEDIA_TYPE)
+    return Response(content=await offload(batch_job, plans), media_type="application/json")
+
+@api_router.post("/export")
+async def export_projections(request: ExportRequest):
+    """Stream monthly and annual projections for one or many plans as XLSX or CSV.
+
+    Plans come inline (`plans`), from the saved library (`input_ids`), or both;
+    they are written in the order given, inline plans first.
+    """
+    exporters = {"xlsx": XlsxExport, "csv": CsvExport}
+    if request.format not in exporters:
+        raise HTTPException(status_code=400, detail="format must be xlsx or csv")
+    if not request.plans and not request.input_ids:
+        raise HTTPException(status_code=400, detail="At least one plan is required")
+    if len(request.plans) > MAX_BATCH_PLANS:
+        raise HTTPException(status_code=413, detail=f"At most {MAX_BATCH_PLANS} inline plans per export")
+    if request.input_ids:
+        if db is None:
+            raise HTTPException(status_code=503, detail="Database not configured")
+        query = {"id": {"$in": request.input_ids}}
+        found = {doc["id"] async for doc in db.financial_inputs.find(query, {"_id": 0, "id": 1})}
+        missing = [input_id for input_id in request.input_ids if input_id not in found]
+        if missing:
+            raise HTTPException(status_code=404, detail=f"Inputs not found: {', '.join(missing[:20])}")
+
+    async def plan_batches():
+        for start in range(0, len(request.plans), EXPORT_BATCH_SIZE):
+            yield request.plans[start:start + EXPORT_BATCH_SIZE]
+        # Saved plans are fetched a batch of ids at a time and put back in the caller's order
+        for start in range(0, len(request.input_ids), EXPORT_BATCH_SIZE):
+            ids = request.input_ids[start:start + EXPORT_BATCH_SIZE]
+            docs = {doc["id"]: doc async for doc in db.financial_inputs.find({"id": {"$in": ids}}, {"_id": 0})}
+            batch = [FinancialInputs(**docs[input_id]) for input_id in ids if input_id in docs]
+            if batch:
+                yield batch
+
+    exporter = exporters[request.format]()
+
+    async def body():
+        async for plans in plan_batches():
+            projections = await offload(export_batch_job, plans)
+            for plan, projection in zip(plans, projections):
+                exporter.add_plan(plan, projection)
+                yield exporter.drain()
+        yield exporter.close()
+
+    return StreamingResponse(body(), media_type=exporter.media_type, headers={
+        "Content-Disposition": f'attachment; filename="projections.{request.format}"'
+    })
 
 @api_router.post("/calculate/revenue")
 async def calculate_revenue_only(inputs: FinancialInputs):
     """Calculate revenue projections"""
+    revenue_fn, _ = get_engine()
     users = calculate_monthly_users(inputs)
-    revenue = calculate_revenue(inputs, users)
+    revenue = revenue_fn(inputs, users)
     return {"users": users, "revenue": revenue}
 
 @api_router.post("/calculate/costs")
 async def calculate_costs_only(inputs: FinancialInputs):
     """Calculate cost projections"""
+    revenue_fn, costs_fn = get_engine()
     users = calculate_monthly_users(inputs)
-    revenue = calculate_revenue(inputs, users)
-    costs = calculate_costs(inputs, revenue)
+    revenue = revenue_fn(inputs, users)
+    costs = costs_fn(inputs, revenue)
     return {"costs": costs}
 
 @api_router.post("/calculate/scenarios")
@@ -1256,6 +3896,161 @@ async def calculate_scenarios_only(inputs: FinancialInputs):
     scenarios = calculate_all_scenarios(inputs)
     return {"scenarios": scenarios}
 
+@api_router.post("/analysis/monte-carlo")
+async def monte_carlo_simulation(request: MonteCarloRequest):
+    """Simulate uncertain inputs and return percentile bands for key outputs"""
+    try:
+        body = await offload(monte_carlo_job, request)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return Response(content=body, media_type="application/json")
+
+@api_router.post("/analysis/monte-carlo/stream")
+async def monte_carlo_stream(request: MonteCarloRequest):
+    """Monte Carlo as Server-Sent Events: a progress event with the running
+    percentile bands after each chunk, then a result event with the final
+    summary. Close the stream to cancel."""
+    return await stream_analysis(monte_carlo_progress, request)
+
+@api_router.post("/analysis/sensitivity")
+async def sensitivity_analysis(request: SensitivityRequest):
+    """Tornado analysis: rank inputs by their impact on selected outputs"""
+    try:
+        body = await offload(sensitivity_job, request)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return Response(content=body, media_type="application/json")
+
+@api_router.post("/analysis/goal-seek")
+async def goal_seek(request: GoalSeekRequest):
+    """Solve for the input value at which a metric reaches a target"""
+    try:
+        body = await offload(goal_seek_job, request)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return Response(content=body, media_type="application/json")
+
+@api_router.post("/analysis/optimize")
+async def optimize_budget(request: OptimizeRequest):
+    """Split a monthly spend budget across cost categories to optimize one metric"""
+    try:
+        body = await offload(optimizer_job, request)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return Response(content=body, media_type="application/json")
+
+@api_router.post("/analysis/optimize/stream")
+async def optimize_budget_stream(request: OptimizeRequest):
+    """Budget optimizer as Server-Sent Events: the best split so far after each
+    round, then a result event. Close the stream to cancel."""
+    return await stream_analysis(optimizer_progress, request)
+
+@api_router.websocket("/live")
+async def live_recalculation(websocket: WebSocket):
+    """Live recalculation channel.
+
+    Client messages: {"type": "inputs", "seq": ..., "inputs": {...}} to set the
+    whole plan, {"type": "patch", "seq": ..., "operations": [...]} to apply a
+    JSON patch (as PATCH /sessions/{id}). The server replies with
+    {"type": "projection", "seq": ..., "projections": {...}} for the latest
+    settled edit, or {"type": "error", "seq": ..., "detail": ...} for an edit
+    it rejected.
+    """
+    await websocket.accept()
+    editor = LiveEditor()
+    sending = asyncio.Lock()
+
+    async def send(payload: bytes):
+        async with sending:
+            await websocket.send_text(payload.decode("utf-8"))
+
+    async def recalculate():
+        while True:
+            edits, seq, inputs = await editor.settled()
+            try:
+                body = await projection_body(inputs)
+            except Exception as e:
+                if not isinstance(e, ValueError):
+                    logger.exception("Live recalculation failed")
+                if editor.edits == edits:
+                    detail = str(e) if isinstance(e, ValueError) else "Calculation failed"
+                    await send(encode_json({"type": "error", "seq": seq, "detail": detail}))
+                continue
+            if editor.edits != edits:
+                continue  # superseded; the newer edit is already waiting to settle
+            await send(b'{"type":"projection","seq":' + encode_json(seq) + b',"projections":' + body + b"}")
+
+    recalculating = asyncio.create_task(recalculate())
+    try:
+        while True:
+            message = {}
+            try:
+                message = json.loads(await websocket.receive_text())
+                if not isinstance(message, dict):
+                    message = {}
+                    raise ValueError("Messages must be JSON objects")
+                editor.apply(message)
+            except ValidationError as e:
+                await send(encode_json({"type": "error", "seq": message.get("seq"), "detail": describe_validation_error(e)}))
+            except ValueError as e:
+                await send(encode_json({"type": "error", "seq": message.get("seq"), "detail": str(e)}))
+    except WebSocketDisconnect:
+        pass
+    finally:
+        recalculating.cancel()
+
+@api_router.get("/admin/indexes")
+async def get_index_report(slow_limit: int = 20):
+    """Index usage per collection and the slowest profiled query shapes"""
+    if db is None:
+        raise HTTPException(status_code=503, detail="Database not configured")
+    return await index_report(db, min(max(slow_limit, 0), 100))
+
+@api_router.post("/sessions")
+async def create_session(inputs: FinancialInputs):
+    """Start a recalculation session and return the full projection once"""
+    projections = await asyncio.to_thread(build_projections, inputs)
+    session_id = session_store.create(inputs, projections)
+    return JSONResponse({
+        "session_id": session_id, "ttl_seconds": SESSION_TTL_SECONDS, "projections": public_projection(projections)
+    })
+
+@api_router.patch("/sessions/{session_id}")
+async def patch_session(session_id: str, operations: List[PatchOperation]):
+    """Apply a JSON patch to the session inputs and return only the changed output series"""
+    session = session_store.get(session_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail="Session not found or expired")
+    async with session["lock"]:
+        try:
+            inputs = apply_inputs_patch(session["inputs"], operations)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        projections = await asyncio.to_thread(build_projections, inputs)
+        changed = diff_projections(session["projections"], projections)
+        session["inputs"] = inputs
+        session["projections"] = projections
+    return JSONResponse({"session_id": session_id, "changed": changed})
+
+@api_router.get("/sessions/{session_id}")
+async def get_session(session_id: str):
+    """Current inputs and full projection of a session"""
+    session = session_store.get(session_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail="Session not found or expired")
+    return JSONResponse({
+        "session_id": session_id,
+        "inputs": session["inputs"].model_dump(),
+        "projections": public_projection(session["projections"])
+    })
+
+@api_router.delete("/sessions/{session_id}")
+async def delete_session(session_id: str):
+    """End a session"""
+    if not session_store.delete(session_id):
+        raise HTTPException(status_code=404, detail="Session not found or expired")
+    return {"status": "deleted"}
+
 # Include the router in the main app
 app.include_router(api_router)
 
@@ -1267,7 +4062,22 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.on_event("startup")
+async def provision_indexes():
+    if db is None:
+        return
+    try:
+        ensured = await ensure_indexes(db)
+        logger.info(f"Ensured indexes: {ensured}")
+    except Exception as e:
+        # Serve without them rather than refuse to start; GET /api/admin/indexes lists what is missing
+        logger.warning(f"Could not ensure indexes: {e}")
+
 @app.on_event("shutdown")
 async def shutdown_db_client():
     if client is not None:
         client.close()
+    if analysis_executor is not None:
+        analysis_executor.shutdown(cancel_futures=True)
+    if progress_manager is not None:
+        progress_manager.shutdown()
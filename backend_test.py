@@ -1,6 +1,15 @@
 import sys
 import json
 import os
+import asyncio
+import copy
+import time
+import threading
+import csv
+import io
+import zipfile
+import xml.etree.ElementTree as ET
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 
 os.environ.setdefault("SKIP_DB", "1")
@@ -10,13 +19,265 @@ from backend.server import (
     calculate_monthly_users,
     calculate_revenue,
     calculate_costs,
+    calculate_revenue_vectorized,
+    calculate_costs_vectorized,
+    TeamMember,
+    TravelItem,
+    OtherIncomeItem,
+    HardwareItem,
     calculate_pnl,
     calculate_cashflow,
     calculate_unit_economics,
     calculate_key_metrics,
     calculate_investor_summary,
     calculate_all_scenarios,
+    calculate_projections_batch,
+    calculate_projections_many,
+    FundingRound,
+    MonteCarloRequest,
+    run_monte_carlo,
+    monte_carlo_simulation,
+    SensitivityRequest,
+    run_sensitivity,
+    ResultCache,
+    inputs_fingerprint,
+    calculate_projections,
+    result_cache,
+    build_projections,
+    public_projection,
+    stage_cache,
+    stage_stats,
+    PatchOperation,
+    SessionStore,
+    create_session,
+    patch_session,
+    get_session,
+    health_check,
+    decode_columnar,
+    COLUMNAR_MEDIA_TYPE,
+    MAX_PROJECTION_YEARS,
+    sensitivity_analysis,
+    GoalSeekRequest,
+    run_goal_seek,
+    goal_seek,
+    OptimizeRequest,
+    BudgetAllocation,
+    optimize_budget,
+    SalaryRevision,
+    roster_salary_schedule,
+    get_all_inputs,
+    get_input,
+    get_index_report,
+    set_profiling,
+    INDEX_SPECS,
+    FinancialInputsCreate,
+    save_inputs,
+    get_input_projections,
+    import_inputs,
+    import_plans,
+    encode_json,
+    ExportRequest,
+    export_projections,
+    monte_carlo_stream,
+    optimize_budget_stream,
+    progress_job,
+    stream_analysis,
+    run_optimizer,
+    app,
+    calculation_flights,
+    cache_stats,
 )
+from fastapi import HTTPException
+from pydantic import ValidationError
+from pymongo.errors import DuplicateKeyError, BulkWriteError
+from starlette.requests import Request
+from starlette.testclient import TestClient
+import threading
+import backend.server as server_module
+
+
+class FakeCursor:
+    """In-memory stand-in for a Motor cursor: sort, limit, batch_size, to_list, async iteration"""
+
+    def __init__(self, docs, projection):
+        self.docs = docs
+        self.projection = projection
+        self.limit_to = None
+
+    def sort(self, keys, direction=None):
+        keys = [(keys, direction)] if isinstance(keys, str) else keys
+        for key, order in reversed(keys):
+            self.docs.sort(key=lambda doc: lookup(doc, key), reverse=order < 0)
+        return self
+
+    def limit(self, count):
+        self.limit_to = count
+        return self
+
+    def batch_size(self, size):
+        return self
+
+    def results(self):
+        docs = self.docs if self.limit_to is None else self.docs[:self.limit_to]
+        return [project(doc, self.projection) for doc in docs]
+
+    async def to_list(self, length=None):
+        docs = self.results()
+        return docs if length is None else docs[:length]
+
+    def __aiter__(self):
+        async def iterate():
+            for doc in self.results():
+                yield doc
+        return iterate()
+
+
+def lookup(doc, path):
+    for key in path.split("."):
+        doc = doc.get(key) if isinstance(doc, dict) else None
+    return doc
+
+
+def matches(doc, query):
+    for key, condition in query.items():
+        if key == "$or":
+            if not any(matches(doc, branch) for branch in condition):
+                return False
+            continue
+        value = lookup(doc, key)
+        if isinstance(condition, dict):
+            checks = {
+                "$lt": lambda v, c: v is not None and v < c,
+                "$lte": lambda v, c: v is not None and v <= c,
+                "$gt": lambda v, c: v is not None and v > c,
+                "$gte": lambda v, c: v is not None and v >= c,
+                "$in": lambda v, c: v in c,
+                "$ne": lambda v, c: v != c,
+            }
+            if not all(checks[op](value, operand) for op, operand in condition.items()):
+                return False
+        elif value != condition:
+            return False
+    return True
+
+
+def project(doc, projection):
+    doc = copy.deepcopy(doc)
+    if not projection:
+        return doc
+    included = [key for key, flag in projection.items() if flag and key != "_id"]
+    if not projection.get("_id", 1):
+        doc.pop("_id", None)
+    if not included:
+        return doc
+    result = {"_id": doc["_id"]} if "_id" in doc else {}
+    for path in included:
+        value = lookup(doc, path)
+        if value is None:
+            continue
+        target = result
+        keys = path.split(".")
+        for key in keys[:-1]:
+            target = target.setdefault(key, {})
+        target[keys[-1]] = value
+    return result
+
+
+class FakeCollection:
+    """Just enough of a Motor collection for the saved-inputs routes and index tooling"""
+
+    def __init__(self):
+        self.docs = []
+        self.next_id = 0
+        self.indexes = {"_id_": {"key": {"_id": 1}, "unique": True, "ops": 0}}
+
+    async def create_index(self, keys, name, unique=False):
+        self.indexes.setdefault(name, {"key": dict(keys), "unique": unique, "ops": 0})
+        return name
+
+    async def insert_one(self, doc):
+        for name, index in self.indexes.items():
+            if index["unique"] and name != "_id_":
+                fields = list(index["key"])
+                if any(all(lookup(other, f) == lookup(doc, f) for f in fields) for other in self.docs):
+                    raise DuplicateKeyError(f"E11000 duplicate key error index: {name}")
+        self.next_id += 1
+        doc["_id"] = self.next_id
+        self.docs.append(copy.deepcopy(doc))
+
+    async def insert_many(self, docs, ordered=True):
+        errors = []
+        for index, doc in enumerate(docs):
+            try:
+                await self.insert_one(doc)
+            except DuplicateKeyError as e:
+                errors.append({"index": index, "code": 11000, "errmsg": str(e)})
+                if ordered:
+                    break
+        if errors:
+            raise BulkWriteError({"writeErrors": errors, "nInserted": len(docs) - len(errors)})
+
+    async def replace_one(self, query, replacement, upsert=False):
+        for i, doc in enumerate(self.docs):
+            if matches(doc, query):
+                self.docs[i] = {"_id": doc["_id"], **copy.deepcopy(replacement)}
+                return
+        if upsert:
+            await self.insert_one(dict(replacement))
+
+    async def update_one(self, query, update):
+        for doc in self.docs:
+            if matches(doc, query):
+                for path, value in update["$set"].items():
+                    *parents, leaf = path.split(".")
+                    target = doc
+                    for key in parents:
+                        target = target.setdefault(key, {})
+                    target[leaf] = copy.deepcopy(value)
+                return
+
+    def find(self, query=None, projection=None):
+        query = query or {}
+        # Count a use of every index whose leading key the query filters on
+        for index in self.indexes.values():
+            if next(iter(index["key"])) in query:
+                index["ops"] += 1
+        return FakeCursor([doc for doc in self.docs if matches(doc, query)], projection)
+
+    async def find_one(self, query, projection=None):
+        docs = await self.find(query, projection).to_list(1)
+        return docs[0] if docs else None
+
+    def aggregate(self, pipeline):
+        if pipeline != [{"$indexStats": {}}]:
+            raise NotImplementedError(pipeline)
+        stats = [
+            {"name": name, "key": index["key"], "accesses": {"ops": index["ops"], "since": "2026-01-01T00:00:00"}}
+            for name, index in self.indexes.items()
+        ]
+        return FakeCursor(stats, None)
+
+
+class FakeDatabase:
+    name = "ck_test"
+
+    def __init__(self):
+        self.collections = {}
+        self.profile = {"was": 0, "slowms": 100}
+
+    def __getitem__(self, name):
+        return self.collections.setdefault(name, FakeCollection())
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return self[name]
+
+    async def command(self, command):
+        level = command["profile"]
+        if level != -1:
+            self.profile = {"was": level, "slowms": command.get("slowms", self.profile["slowms"])}
+        return dict(self.profile)
 
 class FinancialPlannerAPITester:
     def __init__(self):
@@ -619,6 +880,1304 @@ class FinancialPlannerAPITester:
         print("✅ Zeroed inputs behave correctly")
         return True
 
+    def test_vectorized_engine_parity(self):
+        """Vectorized revenue/cost engine must match the reference loops exactly"""
+        print("\n=== Vectorized Engine Parity ===")
+        inputs = FinancialInputs()
+        inputs.timeline.revenue_start_month = 4
+        inputs.team_costs.members.append(
+            TeamMember(name="Engineer", monthly_salary=82500, start_month=9, start_year=2)
+        )
+        inputs.travel_costs.items.append(
+            TravelItem(name="Conference", estimated_monthly=40000, start_month=3, start_year=1, is_recurring=False)
+        )
+        inputs.other_income.items.append(
+            OtherIncomeItem(name="Grant", amount=150000, start_month=5, start_year=2, is_recurring=False)
+        )
+
+        for scenario in ["conservative", "base", "aggressive"]:
+            inputs.timeline.scenario = scenario
+            users = calculate_monthly_users(inputs)
+            revenue = calculate_revenue(inputs, users)
+            vectorized_revenue = calculate_revenue_vectorized(inputs, users)
+            if revenue != vectorized_revenue:
+                raise AssertionError(f"Vectorized revenue differs from reference ({scenario})")
+            costs = calculate_costs(inputs, revenue)
+            if costs != calculate_costs_vectorized(inputs, vectorized_revenue):
+                raise AssertionError(f"Vectorized costs differ from reference ({scenario})")
+
+        print("✅ Vectorized engine matches reference calculations")
+        return True
+
+    def reference_projection(self, inputs):
+        """Full projection using the reference (loop-based) calculation functions"""
+        users = calculate_monthly_users(inputs)
+        revenue = calculate_revenue(inputs, users)
+        costs = calculate_costs(inputs, revenue)
+        pnl = calculate_pnl(revenue, costs, inputs)
+        cashflow = calculate_cashflow(pnl, inputs)
+        unit_economics = calculate_unit_economics(revenue, users, costs, inputs)
+        key_metrics = calculate_key_metrics(revenue, costs, pnl, inputs)
+        scenarios = {}
+        for scenario in ["conservative", "base", "aggressive"]:
+            scenario_inputs = inputs.model_copy(deep=True)
+            scenario_inputs.timeline.scenario = scenario
+            s_users = calculate_monthly_users(scenario_inputs)
+            s_revenue = calculate_revenue(scenario_inputs, s_users)
+            s_costs = calculate_costs(scenario_inputs, s_revenue)
+            s_pnl = calculate_pnl(s_revenue, s_costs, scenario_inputs)
+            s_cashflow = calculate_cashflow(s_pnl, scenario_inputs)
+            scenarios[scenario] = {
+                "revenue": s_revenue["annual"]["total"],
+                "costs": s_costs["annual"]["total"],
+                "ebitda": s_pnl["annual"]["ebitda"],
+                "cumulative_cash": s_cashflow["annual"]["cumulative_cash"],
+            }
+        return {
+            "users": users,
+            "revenue": revenue,
+            "costs": costs,
+            "pnl": pnl,
+            "cashflow": cashflow,
+            "unit_economics": unit_economics,
+            "key_metrics": key_metrics,
+            "investor_summary": calculate_investor_summary(
+                revenue, costs, pnl, cashflow, users, unit_economics, key_metrics, inputs
+            ),
+            "scenarios": scenarios,
+        }
+
+    def test_batch_calculation(self):
+        """Batch endpoint must reproduce single-plan projections for every plan"""
+        print("\n=== Batch Calculation ===")
+        funded = FinancialInputs()
+        funded.funding.rounds = [
+            FundingRound(name="Seed", amount=7500000, month=1, year=1),
+            FundingRound(name="Series A", amount=40000000, month=4, year=3),
+        ]
+        funded.hardware_costs.items.append(
+            HardwareItem(name="Server", unit_cost=250000, quantity=1, purchase_month=8, purchase_year=1)
+        )
+        funded.tax_inputs.corporate_tax_rate = 30
+        lean = FinancialInputs()
+        lean.timeline.scenario = "conservative"
+        lean.marketing_costs.paid = 0
+        lean.cd_monetization.churn_rate = 12
+        plans = [FinancialInputs(), funded, lean]
+
+        results = calculate_projections_batch(plans)
+        for i, (plan, result) in enumerate(zip(plans, results)):
+            if result != self.reference_projection(plan):
+                raise AssertionError(f"Batch projection {i} differs from single-plan calculation")
+
+        response = asyncio.run(calculate_projections_many(plans))
+        body = json.loads(response.body)
+        if len(body["results"]) != len(plans):
+            raise AssertionError("Batch endpoint returned the wrong number of results")
+
+        print(f"✅ Batch of {len(plans)} plans matches single-plan projections")
+        return True
+
+    def test_monte_carlo(self):
+        """Monte Carlo bands collapse to the point projection without spread"""
+        print("\n=== Monte Carlo Simulation ===")
+        inputs = FinancialInputs()
+        projection = self.reference_projection(inputs)
+
+        degenerate = run_monte_carlo(MonteCarloRequest(
+            inputs=inputs,
+            uncertain=[{"field": "artist_monetization.conversion_rate", "std": 0}],
+            draws=500,
+            seed=7,
+        ))
+        for band in ("p5", "p50", "p95"):
+            if degenerate["revenue"][band] != projection["revenue"]["annual"]["total"]:
+                raise AssertionError(f"Zero-spread revenue {band} differs from the point projection")
+            if degenerate["cumulative_cash"][band] != projection["cashflow"]["annual"]["cumulative_cash"]:
+                raise AssertionError(f"Zero-spread cumulative cash {band} differs from the point projection")
+
+        result = run_monte_carlo(MonteCarloRequest(
+            inputs=inputs,
+            uncertain=[
+                {"field": "artist_monetization.conversion_rate", "std": 1.5, "low": 0},
+                {"field": "artist_monetization.churn_rate", "distribution": "triangular", "low": 4, "high": 15},
+                {"field": "user_growth.artists_y5", "distribution": "lognormal", "std": 0.3},
+                {"field": "marketing_costs.paid", "distribution": "uniform", "low": 10000, "high": 40000},
+            ],
+            draws=12000,
+            seed=11,
+        ))
+        if result["draws"] != 12000:
+            raise AssertionError("Monte Carlo did not run the requested number of draws")
+        for metric in ("revenue", "ebitda", "cumulative_cash"):
+            for y in range(5):
+                if not result[metric]["p5"][y] <= result[metric]["p50"][y] <= result[metric]["p95"][y]:
+                    raise AssertionError(f"{metric} percentile bands out of order in Y{y+1}")
+        if result["revenue"]["p5"][4] == result["revenue"]["p95"][4]:
+            raise AssertionError("Uncertain inputs produced no spread in Y5 revenue")
+
+        for field in ("timeline.not_a_field", "funding.initial", "scenario.growth"):
+            try:
+                asyncio.run(monte_carlo_simulation(MonteCarloRequest(
+                    uncertain=[{"field": field, "std": 1}]
+                )))
+                raise AssertionError(f"Unknown uncertain field {field} was accepted")
+            except HTTPException as e:
+                if e.status_code != 400:
+                    raise AssertionError(f"Unknown field {field} returned {e.status_code}, expected 400")
+
+        listed = FinancialInputs()
+        listed.user_growth.artists_by_year = [5000, 30000, 90000, 200000, 400000]
+        try:
+            run_monte_carlo(MonteCarloRequest(inputs=listed, uncertain=[{"field": "user_growth.artists_y5", "std": 1}]))
+            raise AssertionError("A y1..y5 target replaced by artists_by_year was accepted")
+        except ValueError as e:
+            if "artists_by_year" not in str(e):
+                raise
+        run_monte_carlo(MonteCarloRequest(inputs=listed, uncertain=[{"field": "user_growth.cds_y5", "std": 1}], draws=10))
+
+        print("✅ Monte Carlo bands consistent")
+        return True
+
+    def test_sensitivity_analysis(self):
+        """Tornado bars must match full recalculations of the perturbed plans"""
+        print("\n=== Sensitivity Analysis ===")
+        inputs = FinancialInputs()
+        inputs.funding.rounds = [FundingRound(name="Seed", amount=5000000, month=1, year=1)]
+        checked = [
+            ("user_growth", "artists_y5"),
+            ("artist_monetization", "conversion_rate"),
+            ("marketing_costs", "paid"),
+            ("tax_inputs", "corporate_tax_rate"),
+        ]
+        result = run_sensitivity(SensitivityRequest(
+            inputs=inputs,
+            delta_pct=20,
+            outputs=["y5_revenue", "y5_ebitda", "runway_months"],
+        ))
+        if result["fields_evaluated"] < 60:
+            raise AssertionError("Sensitivity analysis skipped most numeric inputs")
+
+        bars = {bar["field"]: bar for bar in result["tornado"]["y5_ebitda"]}
+        for section, field in checked:
+            bar = bars[f"{section}.{field}"]
+            for side in ("low", "high"):
+                moved = inputs.model_copy(deep=True)
+                setattr(getattr(moved, section), field, bar[f"input_{side}"])
+                expected = self.reference_projection(moved)["pnl"]["annual"]["ebitda"][4]
+                if bar[side] != expected:
+                    raise AssertionError(f"{section}.{field} {side}: {bar[side]} != {expected}")
+
+        swings = [bar["swing"] for bar in result["tornado"]["y5_revenue"]]
+        if swings != sorted(swings, reverse=True):
+            raise AssertionError("Tornado bars are not ranked by swing")
+        if bars["tax_inputs.corporate_tax_rate"]["swing"] != 0:
+            raise AssertionError("Tax rate should not move EBITDA")
+
+        print(f"✅ Sensitivity of {result['fields_evaluated']} inputs consistent with full recalculation")
+        return True
+
+    def test_result_cache(self):
+        """Repeat calculations are served from the content-addressed cache"""
+        print("\n=== Result Cache ===")
+        inputs = FinancialInputs()
+        same_plan = FinancialInputs(**inputs.model_dump(exclude={"id", "created_at", "updated_at"}))
+        for member in same_plan.team_costs.members:
+            member.id = "regenerated"
+        if inputs_fingerprint(inputs) != inputs_fingerprint(same_plan):
+            raise AssertionError("Fingerprint depends on ids or timestamps")
+        changed = inputs.model_copy(deep=True)
+        changed.tax_inputs.corporate_tax_rate = 22
+        if inputs_fingerprint(inputs) == inputs_fingerprint(changed):
+            raise AssertionError("Fingerprint ignores a calculation input")
+
+        result_cache.clear()
+        hits, misses = result_cache.hits, result_cache.misses
+        first = asyncio.run(calculate_projections(inputs))
+        second = asyncio.run(calculate_projections(same_plan))
+        if first.headers["X-Cache"] != "MISS" or second.headers["X-Cache"] != "HIT":
+            raise AssertionError("Expected a cache miss followed by a hit")
+        if first.body != second.body or (result_cache.hits - hits, result_cache.misses - misses) != (1, 1):
+            raise AssertionError("Cached response or counters are wrong")
+        if json.loads(first.body) != public_projection(self.reference_projection(inputs)):
+            raise AssertionError("Cached response differs from the reference projection")
+
+        cache = ResultCache(max_bytes=10)
+        cache.put("a", b"12345")
+        cache.put("b", b"12345")
+        cache.get("a")
+        cache.put("c", b"1234")
+        if cache.get("b") is not None or cache.get("a") is None or cache.stats()["evictions"] != 1:
+            raise AssertionError("Cache did not evict the least recently used entry")
+
+        print("✅ Result cache serves repeat inputs")
+        return True
+
+    def test_stage_graph(self):
+        """Editing one section reruns only the stages downstream of it"""
+        print("\n=== Stage Graph ===")
+        stage_cache.clear()
+        inputs = FinancialInputs()
+        build_projections(inputs)
+
+        def rerun_stages(edited):
+            before = {name: stats["misses"] for name, stats in stage_stats.items()}
+            projection = build_projections(edited)
+            if projection != self.reference_projection(edited):
+                raise AssertionError("Stage graph projection differs from the reference")
+            return {name for name, stats in stage_stats.items() if stats["misses"] > before[name]}
+
+        taxed = inputs.model_copy(deep=True)
+        taxed.tax_inputs.corporate_tax_rate = 18
+        scenario_hits = stage_stats["scenarios"]["hits"]
+        rerun = rerun_stages(taxed)
+        if rerun != {"pnl", "cashflow", "key_metrics", "investor_summary"}:
+            raise AssertionError(f"Tax edit reran {sorted(rerun)}")
+        if stage_stats["scenarios"]["hits"] != scenario_hits + 1:
+            raise AssertionError("Tax edit did not reuse the cached scenarios")
+
+        funded = taxed.model_copy(deep=True)
+        funded.funding.rounds = [FundingRound(name="Seed", amount=3000000, month=1, year=1)]
+        rerun = rerun_stages(funded)
+        if rerun != {"cashflow", "key_metrics", "investor_summary", "scenarios"}:
+            raise AssertionError(f"Funding edit reran {sorted(rerun)}")
+
+        if rerun_stages(funded) != set():
+            raise AssertionError("Unchanged inputs reran stages")
+
+        stats = stage_cache.stats()
+        if stats["bytes"] < 1024 * stats["entries"] or stats["bytes"] > stats["max_bytes"]:
+            raise AssertionError(f"Stage cache is not sized by bytes: {stats}")
+
+        print("✅ Stage graph reuses unaffected stages")
+        return True
+
+    def test_sessions(self):
+        """Patching a session returns only the output series that changed"""
+        print("\n=== Delta Sessions ===")
+        inputs = FinancialInputs()
+        created = json.loads(asyncio.run(create_session(inputs)).body)
+        session_id = created["session_id"]
+
+        patch = [
+            PatchOperation(op="replace", path="/tax_inputs/corporate_tax_rate", value=18),
+            PatchOperation(op="add", path="/funding/rounds/-",
+                           value={"name": "Seed", "amount": 3000000, "month": 1, "year": 1}),
+        ]
+        delta = json.loads(asyncio.run(patch_session(session_id, patch)).body)["changed"]
+        edited = inputs.model_copy(deep=True)
+        edited.tax_inputs.corporate_tax_rate = 18
+        edited.funding.rounds.append(FundingRound(name="Seed", amount=3000000, month=1, year=1))
+        expected = self.reference_projection(edited)
+        if not delta or any(path.split(".")[0] in ("users", "revenue", "costs") for path in delta):
+            raise AssertionError(f"Delta includes unchanged stages: {sorted(delta)[:5]}")
+        for path, value in delta.items():
+            node = expected
+            for key in path.split("."):
+                node = node[key]
+            if node != value:
+                raise AssertionError(f"Delta value for {path} differs from the reference")
+        if "pnl.annual.taxes" not in delta or "cashflow.initial_funding" not in delta:
+            raise AssertionError("Delta is missing changed series")
+
+        try:
+            asyncio.run(patch_session(session_id, [PatchOperation(op="replace", path="/tax_inputs/missing", value=1)]))
+            raise AssertionError("Patching a missing field should be rejected")
+        except HTTPException as e:
+            if e.status_code != 400:
+                raise
+
+        async def concurrent_patches():
+            return await asyncio.gather(
+                patch_session(session_id, [PatchOperation(op="replace", path="/tax_inputs/gst_rate", value=5)]),
+                patch_session(session_id, [PatchOperation(op="replace", path="/tax_inputs/tds_rate", value=2)]),
+            )
+
+        loop_thread, compute_threads = threading.current_thread(), []
+        real_build = server_module.build_projections
+
+        def recording_build(inputs):
+            compute_threads.append(threading.current_thread())
+            return real_build(inputs)
+
+        server_module.build_projections = recording_build
+        try:
+            asyncio.run(concurrent_patches())
+        finally:
+            server_module.build_projections = real_build
+        patched = json.loads(asyncio.run(get_session(session_id)).body)["inputs"]["tax_inputs"]
+        if (patched["gst_rate"], patched["tds_rate"]) != (5, 2):
+            raise AssertionError("Concurrent patches to one session lost an edit")
+        if len(compute_threads) != 2 or loop_thread in compute_threads:
+            raise AssertionError("Session projections should be computed off the event loop")
+
+        store = SessionStore(max_sessions=2, ttl_seconds=0)
+        store.create(inputs, {})
+        if store.sessions and store.get(next(iter(store.sessions))) is not None:
+            raise AssertionError("Expired session was served")
+        store = SessionStore(max_sessions=2, ttl_seconds=60)
+        first = store.create(inputs, {})
+        store.create(inputs, {})
+        store.create(inputs, {})
+        if first in store.sessions or len(store.sessions) != 2:
+            raise AssertionError("Session store exceeded its bound")
+
+        print("✅ Sessions return only changed series")
+        return True
+
+    def test_worker_pool(self):
+        """Heavy routes run off the event loop and return the in-process result"""
+        print("\n=== Worker Pool ===")
+        request = SensitivityRequest(inputs=FinancialInputs(), fields=["user_growth.artists_y5", "tax_inputs.corporate_tax_rate"])
+
+        async def heavy_with_health():
+            job = asyncio.ensure_future(sensitivity_analysis(request))
+            answered = 0
+            while not job.done():
+                await health_check()
+                answered += 1
+                await asyncio.sleep(0.001)
+            return await job, answered
+
+        response, answered = asyncio.run(heavy_with_health())
+        if json.loads(response.body) != json.loads(json.dumps(run_sensitivity(request))):
+            raise AssertionError("Offloaded sensitivity differs from the in-process result")
+        if answered < 2:
+            raise AssertionError("Event loop was blocked while the heavy job ran")
+
+        print(f"✅ Event loop answered {answered} health checks during an offloaded job")
+        return True
+
+    def test_field_selection(self):
+        """fields= returns only the selected subtrees and skips unneeded stages"""
+        print("\n=== Field Selection ===")
+        inputs = FinancialInputs()
+        inputs.tax_inputs.corporate_tax_rate = 23
+        stage_cache.clear()
+        result_cache.clear()
+        before = {name: stats["misses"] for name, stats in stage_stats.items()}
+        response = asyncio.run(calculate_projections(
+            inputs, fields="pnl.annual,cashflow.monthly.runway_months,investor_summary,pnl.annual.ebitda"
+        ))
+        selected = json.loads(response.body)
+        reference = self.reference_projection(inputs)
+        expected = {
+            "pnl": {"annual": reference["pnl"]["annual"]},
+            "cashflow": {"monthly": {"runway_months": reference["cashflow"]["monthly"]["runway_months"]}},
+            "investor_summary": reference["investor_summary"],
+        }
+        if selected != expected:
+            raise AssertionError("Selected fields differ from the reference projection")
+        rerun = {name for name, stats in stage_stats.items() if stats["misses"] > before[name]}
+        if "scenarios" in rerun:
+            raise AssertionError("Unselected scenarios stage was evaluated")
+
+        full = json.loads(asyncio.run(calculate_projections(inputs)).body)
+        if any("ledger" in full[section] for section in ("revenue", "costs", "pnl", "cashflow")):
+            raise AssertionError("Monthly ledgers should only be returned when selected")
+        ledger = json.loads(asyncio.run(calculate_projections(inputs, fields="cashflow.ledger,pnl")).body)
+        if ledger["cashflow"] != {"ledger": reference["cashflow"]["ledger"]} or "ledger" in ledger["pnl"]:
+            raise AssertionError("fields=cashflow.ledger should return the ledger, and fields=pnl should not")
+
+        for bad in ("scenarios.nope", "not_a_stage", " , "):
+            try:
+                asyncio.run(calculate_projections(inputs, fields=bad))
+                raise AssertionError(f"fields={bad!r} should be rejected")
+            except HTTPException as e:
+                if e.status_code != 400:
+                    raise
+
+        print("✅ Field selection trims stages and payload")
+        return True
+
+    def test_columnar_encoding(self):
+        """Columnar responses decode to the same values as the JSON responses"""
+        print("\n=== Columnar Encoding ===")
+        inputs = FinancialInputs()
+        result_cache.clear()
+        as_json = asyncio.run(calculate_projections(inputs))
+        as_columns = asyncio.run(calculate_projections(inputs, accept=COLUMNAR_MEDIA_TYPE))
+        if as_columns.media_type != COLUMNAR_MEDIA_TYPE:
+            raise AssertionError("Accept header did not select the columnar encoding")
+        if decode_columnar(as_columns.body) != json.loads(as_json.body):
+            raise AssertionError("Columnar /calculate response does not round-trip")
+        if len(as_columns.body) >= len(as_json.body):
+            raise AssertionError("Columnar response is not smaller than JSON")
+
+        plans = [FinancialInputs(), inputs.model_copy(deep=True)]
+        plans[1].user_growth.artists_y5 = 900000
+        batch_json = json.loads(asyncio.run(calculate_projections_many(plans)).body)["results"]
+        batch_columns = asyncio.run(calculate_projections_many(plans, accept=COLUMNAR_MEDIA_TYPE)).body
+        if decode_columnar(batch_columns) != batch_json:
+            raise AssertionError("Columnar batch response does not round-trip")
+
+        print(f"✅ Columnar encoding round-trips ({len(as_columns.body)} vs {len(as_json.body)} bytes)")
+        return True
+
+    def test_projection_horizon(self):
+        """projection_years drives every series; per-year targets extend past Year 5"""
+        print("\n=== Projection Horizon ===")
+        ten_year = FinancialInputs()
+        ten_year.timeline.projection_years = 10
+        twenty_year = FinancialInputs()
+        twenty_year.timeline.projection_years = 20
+        twenty_year.user_growth.artists_by_year = [5000 * 2 ** y for y in range(12)]
+        plans = [FinancialInputs(), ten_year, twenty_year]
+
+        batch = calculate_projections_batch(plans)
+        for plan, projection in zip(plans, batch):
+            years = plan.timeline.projection_years
+            if projection != self.reference_projection(plan):
+                raise AssertionError(f"{years}-year batch projection differs from the reference")
+            if len(projection["pnl"]["annual"]["ebitda"]) != years or len(projection["users"]["artists_by_month"]) != years * 12:
+                raise AssertionError(f"{years}-year projection has the wrong series lengths")
+            if len(projection["scenarios"]["base"]["cumulative_cash"]) != years:
+                raise AssertionError(f"{years}-year scenarios have the wrong length")
+
+        if batch[1]["users"]["annual_artists"][5:] != [300000] * 5:
+            raise AssertionError("Years past the y5 target should hold it flat")
+        if batch[2]["users"]["annual_artists"][11:] != [5000 * 2 ** 11] * 9:
+            raise AssertionError("Years past the last per-year target should hold it flat")
+
+        result = run_monte_carlo(MonteCarloRequest(
+            inputs=ten_year,
+            uncertain=[{"field": "user_growth.artists_y5", "distribution": "lognormal", "std": 0.3}],
+            draws=500,
+            seed=3,
+        ))
+        if len(result["revenue"]["p50"]) != 10 or result["revenue"]["p5"][9] == result["revenue"]["p95"][9]:
+            raise AssertionError("Monte Carlo did not follow the horizon or the held y5 target")
+
+        try:
+            FinancialInputs(timeline={"projection_years": MAX_PROJECTION_YEARS + 1})
+            raise AssertionError("Horizon above the maximum was accepted")
+        except ValidationError:
+            pass
+
+        print("✅ Projection horizon of 5, 10 and 20 years matches the reference")
+        return True
+
+    def test_monthly_ledger(self):
+        """Annual figures, break-even and runway all come from the monthly ledger"""
+        print("\n=== Monthly Ledger ===")
+        inputs = FinancialInputs()
+        inputs.timeline.projection_years = 7
+        inputs.funding.rounds = [
+            FundingRound(amount=3000000, year=1, month=1),
+            FundingRound(amount=8000000, year=2, month=7),
+        ]
+        inputs.team_costs.members.append(TeamMember(monthly_salary=90000, start_month=5, start_year=3))
+        projection = calculate_projections_batch([inputs])[0]
+        if projection != self.reference_projection(inputs):
+            raise AssertionError("Ledger projection differs from the reference")
+
+        months = 7 * 12
+        for section in ("revenue", "costs", "pnl", "cashflow"):
+            for line, series in projection[section]["ledger"].items():
+                if len(series) != months:
+                    raise AssertionError(f"{section}.ledger.{line} does not cover the horizon")
+                if line in projection[section]["monthly"] and projection[section]["monthly"][line] != series[:12]:
+                    raise AssertionError(f"{section}.monthly.{line} is not the first year of the ledger")
+        for section in ("costs", "pnl"):
+            for line, series in projection[section]["ledger"].items():
+                annual = [sum(series[y * 12:(y + 1) * 12]) for y in range(7)]
+                if annual != projection[section]["annual"][line]:
+                    raise AssertionError(f"{section}.annual.{line} is not the sum of its ledger months")
+
+        costs = projection["costs"]["ledger"]
+        lines = [line for line in costs if line != "total"]
+        if any(sum(costs[line][m] for line in lines) != costs["total"][m] for m in range(months)):
+            raise AssertionError("Cost ledger lines do not add up to the monthly total")
+        if costs["team"][24] == costs["team"][23] or costs["team"][28] == costs["team"][27]:
+            raise AssertionError("Team ledger missed the Y3 inflation step or the May hire")
+
+        cash = projection["cashflow"]["ledger"]
+        if cash["funding_received"][18] != 8000000 or sum(cash["funding_received"]) != 11000000:
+            raise AssertionError("Funding did not land in its round's month")
+        if projection["cashflow"]["annual"]["cumulative_cash"] != cash["cumulative_cash"][11::12]:
+            raise AssertionError("Annual cumulative cash is not the year-end ledger balance")
+        cash_out = next((m + 1 for m, c in enumerate(cash["cumulative_cash"]) if c < 0), 0)
+        if projection["cashflow"]["cash_out_month"] != cash_out:
+            raise AssertionError("cash_out_month does not match the ledger")
+
+        cumulative, break_even = 0, 0
+        for m in range(months):
+            cumulative += projection["revenue"]["ledger"]["total"][m] - costs["total"][m]
+            if cumulative > 0:
+                break_even = m + 1
+                break
+        if projection["unit_economics"]["break_even_month"] != break_even:
+            raise AssertionError("Break-even month does not match the ledger")
+
+        # Default plan's annual P&L. From Y2 on depreciation and tax match the
+        # pre-ledger engine; Y1 opex includes the paid-marketing ramp, and costs
+        # differ by a few rupees because each ledger month is in whole rupees.
+        baseline_pnl = {
+            "revenue": [311649, 3367661, 10038188, 20734717, 41701529],
+            "gross_profit": [201999, 2541657, 7409520, 14886331, 29730595],
+            "operating_expenses": [1574098, 2288176, 2825388, 3718440, 5091972],
+            "ebitda": [-1372099, 253481, 4584132, 11167891, 24638623],
+            "depreciation": [236114, 343226, 423808, 557766, 763795],
+            "ebit": [-1608213, -89745, 4160324, 10610125, 23874828],
+            "taxes": [0, 0, 1040081, 2652531, 5968707],
+            "net_profit": [-1608213, -89745, 3120243, 7957594, 17906121],
+        }
+        for default_projection in (build_projections(FinancialInputs()), calculate_projections_batch([FinancialInputs()])[0]):
+            if default_projection["pnl"]["annual"] != baseline_pnl:
+                raise AssertionError(f"Default annual P&L changed: {default_projection['pnl']['annual']}")
+
+        # Rounds dated outside months 1-12 still count towards their year
+        odd = FinancialInputs()
+        odd.funding.rounds = [FundingRound(amount=1e6, month=0, year=1), FundingRound(amount=2e6, month=14, year=2)]
+        for odd_projection in (build_projections(odd), calculate_projections_batch([odd])[0]):
+            odd_cash = odd_projection["cashflow"]
+            if odd_cash["annual"]["funding_received"][:2] != [1e6, 2e6] or odd_cash["initial_funding"] != 1e6:
+                raise AssertionError(f"Out-of-range funding months were dropped: {odd_cash['annual']['funding_received']}")
+
+        print(f"✅ {months}-month ledger adds up; cash out in month {cash_out}, break-even in month {break_even}")
+        return True
+
+    def test_goal_seek(self):
+        """Goal seek lands on the edge where the target is met, checked against full projections"""
+        print("\n=== Goal Seek ===")
+        inputs = FinancialInputs()
+        inputs.funding.rounds = [FundingRound(amount=1000000, year=1, month=1)]
+
+        seed = json.loads(asyncio.run(goal_seek(GoalSeekRequest(
+            inputs=inputs, field="funding.rounds.0.amount", metric="min_monthly_cash",
+            target=0, goal="at_least", high=50000000,
+        ))).body)
+        if seed["status"] != "solved" or seed["evaluations"] > 100:
+            raise AssertionError(f"Seed amount solve failed: {seed}")
+        below, at = inputs.model_copy(deep=True), inputs.model_copy(deep=True)
+        below.funding.rounds[0].amount = seed["bracket"][0]
+        at.funding.rounds[0].amount = seed["value"]
+        cash_below, cash_at = [
+            min(p["cashflow"]["ledger"]["cumulative_cash"]) for p in calculate_projections_batch([below, at])
+        ]
+        if cash_at < 0 or cash_below >= 0:
+            raise AssertionError("Seed amount does not sit on the cash-positive edge")
+
+        conversion = run_goal_seek(GoalSeekRequest(
+            inputs=inputs, field="cd_monetization.conversion_rate", metric="break_even_month",
+            target=30, goal="at_most",
+        ))
+        plan = inputs.model_copy(deep=True)
+        plan.cd_monetization.conversion_rate = conversion["value"]
+        break_even = calculate_projections_batch([plan])[0]["unit_economics"]["break_even_month"]
+        if conversion["status"] != "solved" or not 0 < break_even <= 30 or conversion["value"] >= 15:
+            raise AssertionError(f"Conversion rate solve failed: {conversion}")
+
+        integer = run_goal_seek(GoalSeekRequest(
+            field="user_growth.artists_y5", metric="y5_revenue", target=50000000, goal="equal", tolerance=1,
+        ))
+        if integer["value"] != int(integer["value"]) or integer["bracket"][1] - integer["bracket"][0] != 1:
+            raise AssertionError(f"Integer field should converge to adjacent integers: {integer}")
+
+        unreachable = run_goal_seek(GoalSeekRequest(
+            field="tax_inputs.corporate_tax_rate", metric="y5_revenue", target=1e12, high=50,
+        ))
+        if unreachable["status"] != "unreachable":
+            raise AssertionError("A target no input value reaches should be reported as unreachable")
+
+        listed = FinancialInputs()
+        listed.user_growth.cds_by_year = [200, 900, 2500]
+        for bad in ({"field": "funding.rounds.3.amount"}, {"metric": "missing"}, {"field": "timeline.scenario"},
+                    {"field": "funding.initial"}, {"field": "scenario.growth"},
+                    {"field": "user_growth.cds_y2", "inputs": listed}):
+            try:
+                request = {"field": "cd_monetization.conversion_rate", "metric": "y5_revenue", "target": 1, **bad}
+                asyncio.run(goal_seek(GoalSeekRequest(**request)))
+                raise AssertionError(f"Bad goal seek request {bad} was accepted")
+            except HTTPException as e:
+                if e.status_code != 400:
+                    raise AssertionError(f"Bad goal seek request returned {e.status_code}, expected 400")
+
+        print(f"✅ Seed of ₹{seed['value']:,.0f} keeps cash positive; {conversion['value']:.2f}% CD conversion breaks even by month 30")
+        return True
+
+    def test_budget_optimizer(self):
+        """The optimizer's split spends the budget, meets its constraints and reproduces in a full run"""
+        print("\n=== Budget Optimizer ===")
+        inputs = FinancialInputs()
+        inputs.funding.rounds = [FundingRound(amount=3000000, year=1, month=1)]
+        request = OptimizeRequest(
+            inputs=inputs,
+            budget=90000,
+            allocations=[
+                BudgetAllocation(field="marketing_costs.paid", min=10000),
+                BudgetAllocation(field="marketing_costs.influencer", max=20000),
+                BudgetAllocation(field="team_costs.new_hires", min=20000),
+                BudgetAllocation(field="digital_infra.hosting", min=5000, max=30000),
+            ],
+            objective="y5_ebitda",
+            min_runway_months=6,
+            hire_start_year=2,
+            hire_start_month=4,
+            candidates=500,
+            rounds=3,
+            seed=11,
+        )
+        result = json.loads(asyncio.run(optimize_budget(request)).body)
+        allocation = result["allocation"]
+        if result["status"] != "optimal" or abs(sum(allocation.values()) - 90000) > 1e-6:
+            raise AssertionError(f"Optimizer did not spend the budget: {result}")
+        for bound in request.allocations:
+            if not bound.min - 1e-9 <= allocation[bound.field] <= (bound.max or 1e18) + 1e-9:
+                raise AssertionError(f"{bound.field} allocation is outside its bounds")
+        if result["min_runway_months"] < 6 or result["evaluations"] != 3 * 501:
+            raise AssertionError(f"Unexpected runway or evaluation count: {result}")
+
+        plan = inputs.model_copy(deep=True)
+        plan.marketing_costs.paid = allocation["marketing_costs.paid"]
+        plan.marketing_costs.influencer = allocation["marketing_costs.influencer"]
+        plan.digital_infra.hosting = allocation["digital_infra.hosting"]
+        plan.team_costs.members.append(TeamMember(
+            name="New hires", monthly_salary=allocation["team_costs.new_hires"], start_month=4, start_year=2
+        ))
+        projection = calculate_projections_batch([plan])[0]
+        if projection["pnl"]["annual"]["ebitda"][4] != result["objective_value"]:
+            raise AssertionError("Optimized split does not reproduce its Y5 EBITDA in a full projection")
+        if result["objective_value"] < result["current"]["objective_value"] - 1e6:
+            raise AssertionError("Optimizer result is far worse than the current plan")
+
+        for bad in ({"allocations": [{"field": "admin_costs.legal"}]}, {"budget": 1}, {"objective": "missing"}):
+            try:
+                asyncio.run(optimize_budget(OptimizeRequest(inputs=inputs, candidates=10, rounds=1, **{
+                    "allocations": [{"field": "marketing_costs.paid", "min": 1000}], **bad
+                })))
+                raise AssertionError(f"Bad optimizer request {bad} was accepted")
+            except HTTPException as e:
+                if e.status_code != 400:
+                    raise AssertionError(f"Bad optimizer request returned {e.status_code}, expected 400")
+        for unbounded in ({"rounds": 10**9}, {"rounds": 0}, {"candidates": 10**9}):
+            try:
+                OptimizeRequest(**unbounded)
+                raise AssertionError(f"Optimizer request {unbounded} should be rejected")
+            except ValidationError:
+                pass
+
+        print(f"✅ Split of ₹90,000/month reaches Y5 EBITDA ₹{result['objective_value']:,.0f} over {result['evaluations']} candidates")
+        return True
+
+    def test_headcount_roster(self):
+        """Role counts, end months and salary revisions compile to the same costs as one line per head"""
+        print("\n=== Headcount Roster ===")
+        roster = FinancialInputs()
+        roster.timeline.projection_years = 6
+        roster.team_costs.members = [
+            TeamMember(name="Founder", role="founder", monthly_salary=0),
+            TeamMember(name="Engineers", monthly_salary=120000, start_year=3, start_month=1, count=20,
+                       salary_revisions=[SalaryRevision(year=4, month=4, monthly_salary=135000)]),
+            TeamMember(name="Contractor", monthly_salary=60000, start_year=1, start_month=6, end_year=2, end_month=3),
+            TeamMember(name="Lead", monthly_salary=150000, start_year=2, start_month=7, salary_revisions=[
+                SalaryRevision(year=1, month=1, monthly_salary=140000),
+                SalaryRevision(year=5, month=1, monthly_salary=180000),
+            ]),
+        ]
+
+        # Naive expansion: one line per head per month
+        months = 6 * 12
+        expected = [0.0] * months
+        for member in roster.team_costs.members:
+            for m in range(months):
+                start = (member.start_year - 1) * 12 + member.start_month - 1
+                end = months if member.end_year is None else (member.end_year - 1) * 12 + member.end_month
+                if start <= m < end:
+                    salary = member.monthly_salary
+                    for revision in sorted(member.salary_revisions, key=lambda r: (r.year, r.month)):
+                        if (revision.year - 1) * 12 + revision.month - 1 <= m:
+                            salary = revision.monthly_salary
+                    expected[m] += salary * member.count
+        if roster_salary_schedule(roster.team_costs.members, months).tolist() != expected:
+            raise AssertionError("Compiled roster salaries differ from the per-head expansion")
+
+        projection = calculate_projections_batch([roster])[0]
+        if projection != self.reference_projection(roster):
+            raise AssertionError("Roster projection differs between the engines")
+        team = projection["costs"]["ledger"]["team"]
+        inflation = 1 + roster.timeline.inflation_rate / 100
+        if team[24] != int((20 * 120000 + 140000) * 1.1 * inflation ** 2) or team[4] != 0 or team[15] == team[14]:
+            raise AssertionError(f"Team ledger missed the Y3 hires or the contractor's end: {team[:30]}")
+
+        big = FinancialInputs()
+        big.team_costs.members = [TeamMember(monthly_salary=50000 + i, start_year=1 + i % 5) for i in range(500)]
+        counted = FinancialInputs()
+        counted.team_costs.members = [
+            TeamMember(monthly_salary=sum(50000 + i for i in range(y, 500, 5)) / 100, start_year=1 + y, count=100)
+            for y in range(5)
+        ]
+        big_team, counted_team = [
+            p["costs"]["annual"]["team"] for p in calculate_projections_batch([big, counted])
+        ]
+        if any(abs(a - b) > 60 for a, b in zip(big_team, counted_team)):
+            raise AssertionError("500 members and the same roster as role counts cost different amounts")
+
+        print(f"✅ Team costs ₹{team[24]:,}/month once 20 engineers join in Y3; 500-member roster matches its role-count form")
+        return True
+
+    def test_saved_inputs_listing(self):
+        """Keyset pages cover every saved plan exactly once; summary and NDJSON views"""
+        print("\n=== Saved Inputs Listing ===")
+        saved_db = server_module.db
+        server_module.db = FakeDatabase()
+        try:
+            ids = []
+            for i in range(23):
+                plan = FinancialInputs(name=f"Plan {i}")
+                # Several plans share a timestamp so the id tiebreak is exercised
+                plan.created_at = f"2026-01-{1 + i // 3:02d}T00:00:00+00:00"
+                doc = plan.model_dump()
+                asyncio.run(server_module.db.financial_inputs.insert_one(doc))
+                ids.append(plan.id)
+
+            seen, cursor, pages = [], None, 0
+            while True:
+                page = json.loads(asyncio.run(get_all_inputs(limit=5, cursor=cursor)).body)
+                seen.extend(item["id"] for item in page["items"])
+                pages += 1
+                cursor = page["next_cursor"]
+                if cursor is None:
+                    break
+            if sorted(seen) != sorted(ids) or len(seen) != len(set(seen)) or pages != 5:
+                raise AssertionError(f"Pagination returned {len(seen)} plans over {pages} pages")
+            keys = [(doc["created_at"], doc["id"]) for doc in server_module.db.financial_inputs.docs]
+            if seen != [key[1] for key in sorted(keys, reverse=True)]:
+                raise AssertionError("Pages are not in newest-first (created_at, id) order")
+            if "team_costs" not in page["items"][0] or "_id" in page["items"][0]:
+                raise AssertionError("Full view should return whole documents without _id")
+
+            summary = json.loads(asyncio.run(get_all_inputs(limit=3, view="summary")).body)
+            if set(summary["items"][0]) != {"id", "name", "scenario", "created_at", "updated_at"}:
+                raise AssertionError(f"Unexpected summary fields {sorted(summary['items'][0])}")
+
+            async def stream(cursor):
+                response = await get_all_inputs(cursor=cursor, accept="application/x-ndjson")
+                return response.media_type, b"".join([chunk async for chunk in response.body_iterator])
+            first_page = json.loads(asyncio.run(get_all_inputs(limit=4)).body)
+            media_type, body = asyncio.run(stream(first_page["next_cursor"]))
+            streamed = [json.loads(line)["id"] for line in body.decode().splitlines()]
+            if media_type != "application/x-ndjson" or streamed != seen[4:]:
+                raise AssertionError("NDJSON export did not stream the remaining plans in order")
+
+            for bad in ({"cursor": "not-a-cursor"}, {"view": "tiny"}):
+                try:
+                    asyncio.run(get_all_inputs(**bad))
+                    raise AssertionError(f"Bad listing request {bad} was accepted")
+                except HTTPException as e:
+                    if e.status_code != 400:
+                        raise AssertionError(f"Bad listing request returned {e.status_code}, expected 400")
+        finally:
+            server_module.db = saved_db
+
+        print(f"✅ {len(ids)} plans listed once each over {pages} keyset pages; NDJSON resumes from a cursor")
+        return True
+
+    def test_index_provisioning(self):
+        """Startup ensures the declared indexes; the report shows usage, gaps and slow query shapes"""
+        print("\n=== Index Provisioning ===")
+        saved_db = server_module.db
+        server_module.db = fake = FakeDatabase()
+        try:
+            asyncio.run(server_module.provision_indexes())
+            asyncio.run(server_module.provision_indexes())
+            inputs = fake.financial_inputs
+            declared = {spec["name"] for spec in INDEX_SPECS["financial_inputs"]}
+            if set(inputs.indexes) != declared | {"_id_"}:
+                raise AssertionError(f"Startup created {sorted(inputs.indexes)}")
+
+            plan = FinancialInputs().model_dump()
+            asyncio.run(inputs.insert_one(dict(plan)))
+            try:
+                asyncio.run(inputs.insert_one(dict(plan)))
+                raise AssertionError("A duplicate plan id was accepted despite the unique index")
+            except DuplicateKeyError:
+                pass
+            asyncio.run(get_input(plan["id"]))
+
+            profiler = asyncio.run(set_profiling(fake, 50))
+            if profiler != {"level": 1, "slowms": 50}:
+                raise AssertionError(f"Profiler not configured: {profiler}")
+            profile = fake["system.profile"]
+            for millis in (120, 340, 95):
+                asyncio.run(profile.insert_one({
+                    "ns": "ck_test.financial_inputs", "op": "query", "millis": millis, "ts": millis,
+                    "planSummary": "COLLSCAN", "docsExamined": 5000, "nreturned": 1,
+                }))
+            asyncio.run(profile.insert_one({
+                "ns": "ck_test.financial_inputs", "op": "query", "millis": 60, "ts": 1,
+                "planSummary": "IXSCAN { id: 1 }", "docsExamined": 1, "nreturned": 1,
+            }))
+
+            report = asyncio.run(get_index_report())
+            collection = report["collections"]["financial_inputs"]
+            usage = {index["name"]: index["ops"] for index in collection["indexes"]}
+            if collection["missing"] or usage["id_unique"] < 1 or "name" not in collection["unused"]:
+                raise AssertionError(f"Unexpected index usage report: {collection}")
+            slowest = report["slow_queries"][0]
+            if (slowest["count"], slowest["max_ms"], slowest["collection_scan"]) != (3, 340, True) or len(report["slow_queries"]) != 2:
+                raise AssertionError(f"Unexpected slow query report: {report['slow_queries']}")
+
+            inputs.indexes.pop("name")
+            if asyncio.run(get_index_report())["collections"]["financial_inputs"]["missing"] != ["name"]:
+                raise AssertionError("A dropped index should be reported as missing")
+        finally:
+            server_module.db = saved_db
+
+        print(f"✅ {len(declared)} indexes ensured; slowest shape {slowest['plan']} at {slowest['max_ms']} ms")
+        return True
+
+    def test_materialized_projections(self):
+        """Saving stores the projection; reads serve it until the inputs or engine version change"""
+        print("\n=== Materialized Projections ===")
+        saved_db, saved_version = server_module.db, server_module.ENGINE_VERSION
+        server_module.db = fake = FakeDatabase()
+        try:
+            result_cache.clear()
+            saved = asyncio.run(save_inputs(FinancialInputsCreate(name="Stored plan")))
+            stored = fake.projections.docs[0]
+            if stored["input_hash"] != inputs_fingerprint(saved) or stored["engine_version"] != server_module.ENGINE_VERSION:
+                raise AssertionError("Stored projection is not tagged with the input hash and engine version")
+            if stored["metrics"]["y5_revenue"] != build_projections(saved)["revenue"]["annual"]["total"][4]:
+                raise AssertionError("Stored metrics do not match the projection")
+            if asyncio.run(calculate_projections(saved)).headers["X-Cache"] != "HIT":
+                raise AssertionError("Saving should seed the /calculate result cache")
+
+            def read(input_id=saved.id):
+                response = asyncio.run(get_input_projections(input_id))
+                return response.headers["X-Cache"], json.loads(response.body)
+
+            status, body = read()
+            if status != "HIT" or body != json.loads(json.dumps(public_projection(build_projections(saved)))):
+                raise AssertionError(f"Fresh stored projection should be served as is (got {status})")
+
+            loop_thread, compute_threads = threading.current_thread(), []
+            real_build = server_module.build_projections
+
+            def recording_build(inputs):
+                compute_threads.append(threading.current_thread())
+                return real_build(inputs)
+
+            server_module.build_projections = recording_build
+            try:
+                asyncio.run(save_inputs(FinancialInputsCreate(name="Off the loop")))
+                server_module.ENGINE_VERSION = "next"
+                if read()[0] != "STALE" or read()[0] != "HIT" or fake.projections.docs[0]["engine_version"] != "next":
+                    raise AssertionError("A projection from an older engine version should be recomputed once")
+            finally:
+                server_module.build_projections = real_build
+            if len(compute_threads) != 2 or loop_thread in compute_threads:
+                raise AssertionError("Saving and recomputing a projection should run off the event loop")
+
+            edited = saved.model_copy(deep=True)
+            edited.tax_inputs.corporate_tax_rate = 30
+            asyncio.run(fake.financial_inputs.replace_one({"id": saved.id}, {
+                **edited.model_dump(), "input_hash": inputs_fingerprint(edited)
+            }))
+            status, body = read()
+            if status != "STALE" or body["pnl"]["annual"]["taxes"] != build_projections(edited)["pnl"]["annual"]["taxes"]:
+                raise AssertionError("Edited inputs should be recomputed on read")
+
+            legacy = FinancialInputs(name="Saved before hashes")
+            asyncio.run(fake.financial_inputs.insert_one(legacy.model_dump()))
+            if read(legacy.id)[0] != "MISS" or read(legacy.id)[0] != "HIT":
+                raise AssertionError("A plan without a stored projection should be computed once, then served")
+            if asyncio.run(fake.financial_inputs.find_one({"id": legacy.id}))["input_hash"] != inputs_fingerprint(legacy):
+                raise AssertionError("The input hash should be backfilled on first read")
+
+            try:
+                read("missing")
+                raise AssertionError("Unknown plan id was accepted")
+            except HTTPException as e:
+                if e.status_code != 404:
+                    raise AssertionError(f"Unknown plan id returned {e.status_code}, expected 404")
+        finally:
+            server_module.db, server_module.ENGINE_VERSION = saved_db, saved_version
+
+        print("✅ Stored projections served until the inputs or engine version change, then recomputed once")
+        return True
+
+    def test_bulk_import(self):
+        """NDJSON and JSON array uploads are imported in batches, skipping bad records"""
+        print("\n=== Bulk Import ===")
+
+        async def chunked(payload: bytes, size: int):
+            for start in range(0, len(payload), size):
+                yield payload[start:start + size]
+
+        def plan(name, **sections):
+            return {"name": name, **sections}
+
+        saved_db, saved_batch = server_module.db, server_module.IMPORT_BATCH_SIZE
+        saved_record_bytes = server_module.MAX_IMPORT_RECORD_BYTES
+        server_module.db = fake = FakeDatabase()
+        server_module.IMPORT_BATCH_SIZE = 2
+        try:
+            asyncio.run(fake.financial_inputs.create_index([("id", 1)], name="id_unique", unique=True))
+            lines = [
+                json.dumps(plan("Alpha", tax_inputs={"corporate_tax_rate": 30})),
+                "",
+                '{"name": "Broken",',
+                json.dumps(plan("Bad horizon", timeline={"projection_years": "ten"})),
+                json.dumps(plan("Beta", id="ignored-id")),
+                "42",
+                json.dumps(plan("Gamma")),
+            ]
+            report = asyncio.run(import_plans(fake, chunked("\n".join(lines).encode(), 7)))
+            if (report["received"], report["inserted"], report["failed"]) != (6, 3, 3):
+                raise AssertionError(f"Unexpected NDJSON import counts: {report}")
+            if [error["index"] for error in report["errors"]] != [1, 2, 4]:
+                raise AssertionError(f"Errors should point at the failing records: {report['errors']}")
+            if "timeline.projection_years" not in report["errors"][1]["error"]:
+                raise AssertionError("Validation errors should name the offending field")
+
+            docs = {doc["name"]: doc for doc in fake.financial_inputs.docs}
+            if sorted(docs) != ["Alpha", "Beta", "Gamma"] or docs["Beta"]["id"] == "ignored-id":
+                raise AssertionError("Imported plans should get new ids, like POST /inputs")
+            alpha = FinancialInputs(**docs["Alpha"])
+            stored = next(p for p in fake.projections.docs if p["input_id"] == alpha.id)
+            if docs["Alpha"]["input_hash"] != inputs_fingerprint(alpha) or stored["input_hash"] != inputs_fingerprint(alpha):
+                raise AssertionError("Imported plans should be stored with their input hash")
+            if json.loads(stored["body"]) != json.loads(encode_json(public_projection(build_projections(alpha)))):
+                raise AssertionError("Batch-materialized projection differs from the single-plan engine")
+            if asyncio.run(get_input_projections(alpha.id)).headers["X-Cache"] != "HIT":
+                raise AssertionError("Imported plans should be served from their stored projection")
+
+            records = [plan(f"Array {i}") for i in range(5)]
+            payload = json.dumps(records, indent=2).encode()
+            parts = iter([payload[i:i + 11] for i in range(0, len(payload), 11)] + [b""])
+
+            async def receive():
+                body = next(parts)
+                return {"type": "http.request", "body": body, "more_body": bool(body)}
+
+            request = Request({"type": "http", "method": "POST", "headers": []}, receive)
+            report = json.loads(asyncio.run(import_inputs(request)).body)
+            if (report["inserted"], report["failed"]) != (5, 0) or len(fake.projections.docs) != 8:
+                raise AssertionError(f"JSON array upload was not fully imported: {report}")
+
+            report = asyncio.run(import_plans(fake, chunked(b'[{"name": "Last good"}, {"name": ], {"name": "x"}]', 5)))
+            if (report["inserted"], report["failed"]) != (1, 1) or report["errors"][0]["index"] != 1:
+                raise AssertionError(f"A malformed array element should stop the import there: {report}")
+
+            original_uuid4 = server_module.uuid.uuid4
+            server_module.uuid.uuid4 = lambda: "fixed"
+            try:
+                report = asyncio.run(import_plans(fake, chunked(b'{"name": "One"}\n{"name": "Two"}\n', 64)))
+            finally:
+                server_module.uuid.uuid4 = original_uuid4
+            if (report["inserted"], report["failed"]) != (1, 1) or "duplicate key" not in report["errors"][0]["error"]:
+                raise AssertionError(f"Rejected inserts should be reported per record: {report}")
+            if sum(p["input_id"] == "fixed" for p in fake.projections.docs) != 1:
+                raise AssertionError("No projection should be stored for a rejected plan")
+
+            # An oversized line is skipped on its own; the records after it still import
+            server_module.MAX_IMPORT_RECORD_BYTES = 200
+            upload = "\n".join(json.dumps(plan(name)) for name in ("a", "x" * 500, "b", "c")).encode()
+            for size in (7, 4096):
+                report = asyncio.run(import_plans(fake, chunked(upload, size)))
+                if (report["received"], report["inserted"], report["failed"]) != (4, 3, 1) or report["errors"][0]["index"] != 1:
+                    raise AssertionError(f"Oversized record should fail alone ({size}-byte chunks): {report}")
+        finally:
+            server_module.db, server_module.IMPORT_BATCH_SIZE = saved_db, saved_batch
+            server_module.MAX_IMPORT_RECORD_BYTES = saved_record_bytes
+
+        print("✅ Uploads imported in batches with per-record errors")
+        return True
+
+    def test_streaming_export(self):
+        """Exports stream one plan at a time as CSV or XLSX, inline and saved plans alike"""
+        print("\n=== Streaming Export ===")
+
+        async def collect(response):
+            return [chunk async for chunk in response.body_iterator]
+
+        inline = FinancialInputs(name="Inline <A&B>")
+        inline.timeline.projection_years = 7
+        saved = FinancialInputs(name="Saved: plan [v2]")
+        saved.tax_inputs.corporate_tax_rate = 30
+        saved_db = server_module.db
+        server_module.db = fake = FakeDatabase()
+        try:
+            asyncio.run(fake.financial_inputs.insert_one(saved.model_dump()))
+            request = ExportRequest(plans=[inline], input_ids=[saved.id], format="csv")
+            chunks = asyncio.run(collect(asyncio.run(export_projections(request))))
+            if len(chunks) != 3:
+                raise AssertionError(f"Each plan should be flushed as it is written, got {len(chunks)} chunks")
+            rows = list(csv.DictReader(io.StringIO(b"".join(chunks).decode())))
+            for plan in (inline, saved):
+                projection = build_projections(plan)
+                mine = [row for row in rows if row["plan_id"] == plan.id]
+                series = [
+                    *(projection[section]["ledger"] for section in ("revenue", "costs", "pnl", "cashflow")),
+                    projection["revenue"]["usage"],
+                    *(projection[section]["annual"] for section in ("revenue", "costs", "pnl", "cashflow")),
+                ]
+                if len(mine) != sum(len(values) for lines in series for values in lines.values()):
+                    raise AssertionError(f"{plan.name}: every monthly and annual value should be exported once")
+                taxes = [float(row["value"]) for row in mine if row["period"] == "annual" and row["line"] == "taxes"]
+                if taxes != projection["pnl"]["annual"]["taxes"]:
+                    raise AssertionError(f"{plan.name}: exported annual taxes differ from /calculate")
+
+            request = ExportRequest(plans=[inline], input_ids=[saved.id], format="xlsx")
+            response = asyncio.run(export_projections(request))
+            if response.media_type != "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet":
+                raise AssertionError("XLSX export has the wrong media type")
+            workbook = zipfile.ZipFile(io.BytesIO(b"".join(asyncio.run(collect(response)))))
+            ns = {"m": "http://schemas.openxmlformats.org/spreadsheetml/2006/main"}
+            names = [sheet.get("name") for sheet in ET.fromstring(workbook.read("xl/workbook.xml")).iter(f"{{{ns['m']}}}sheet")]
+            if names != ["1 Inline <A&B>", "2 Saved  plan  v2"]:
+                raise AssertionError(f"Unexpected sheet names: {names}")
+            sheet = ET.fromstring(workbook.read("xl/worksheets/sheet1.xml"))
+            for row in sheet.iter(f"{{{ns['m']}}}row"):
+                cells = [cell.findtext("m:v", namespaces=ns) or cell.findtext("m:is/m:t", namespaces=ns) for cell in row]
+                if cells[:2] == ["revenue", "total"] and len(cells) == 2 + 7 * 12:
+                    expected = build_projections(inline)["revenue"]["ledger"]["total"]
+                    if [float(v) for v in cells[2:]] != expected:
+                        raise AssertionError("XLSX monthly revenue differs from /calculate")
+                    break
+            else:
+                raise AssertionError("XLSX sheet is missing the 84-month revenue row")
+
+            # Saved plans follow the order of input_ids, across fetch batches
+            ordered = [FinancialInputs(name=f"Ordered {i}", created_at=f"2026-01-0{i + 1}T00:00:00+00:00") for i in range(3)]
+            for plan in ordered:
+                asyncio.run(fake.financial_inputs.insert_one(plan.model_dump()))
+            wanted = [ordered[0].id, ordered[2].id, saved.id, ordered[1].id]
+            saved_export_batch, server_module.EXPORT_BATCH_SIZE = server_module.EXPORT_BATCH_SIZE, 2
+            try:
+                request = ExportRequest(input_ids=wanted, format="csv")
+                rows = csv.DictReader(io.StringIO(b"".join(asyncio.run(collect(asyncio.run(export_projections(request))))).decode()))
+                exported = list(dict.fromkeys(row["plan_id"] for row in rows))
+            finally:
+                server_module.EXPORT_BATCH_SIZE = saved_export_batch
+            if exported != wanted:
+                raise AssertionError(f"Saved plans should be exported in input_ids order: {exported}")
+
+            for bad, status in ((ExportRequest(plans=[inline], format="pdf"), 400),
+                                (ExportRequest(input_ids=["missing"]), 404),
+                                (ExportRequest(), 400)):
+                try:
+                    asyncio.run(export_projections(bad))
+                    raise AssertionError(f"Export request should fail with {status}")
+                except HTTPException as e:
+                    if e.status_code != status:
+                        raise AssertionError(f"Expected {status}, got {e.status_code}")
+        finally:
+            server_module.db = saved_db
+
+        print("✅ CSV and XLSX exports stream per plan and match /calculate")
+        return True
+
+    def test_progress_streams(self):
+        """SSE streams report progress and partial results, end with the blocking result, and stop on disconnect"""
+        print("\n=== Progress Streams ===")
+
+        def parse(chunks):
+            events = []
+            for block in b"".join(chunks).decode().strip().split("\n\n"):
+                name, data = block.split("\n")
+                events.append((name.removeprefix("event: "), json.loads(data.removeprefix("data: "))))
+            return events
+
+        async def collect(route, request):
+            response = await route(request)
+            if response.media_type != "text/event-stream":
+                raise AssertionError("Stream should be served as text/event-stream")
+            return [chunk async for chunk in response.body_iterator]
+
+        # Streamed analyses are dispatched to the worker pool like the blocking routes
+        dispatched, saved_offload = [], server_module.offload
+
+        async def recording_offload(job, *args):
+            dispatched.append((job, server_module.get_analysis_executor()))
+            return await saved_offload(job, *args)
+
+        server_module.offload = recording_offload
+        try:
+            request = OptimizeRequest(budget=60000, candidates=200, rounds=3, seed=5)
+            events = parse(asyncio.run(collect(optimize_budget_stream, request)))
+        finally:
+            server_module.offload = saved_offload
+        if [name for name, _ in events] != ["progress", "progress", "result"] or events[0][1]["percent"] != 33.3:
+            raise AssertionError(f"Optimizer should report each round: {events}")
+        if events[-1][1] != json.loads(encode_json(run_optimizer(request))):
+            raise AssertionError("Streamed optimizer result differs from the blocking route")
+        if [job for job, _ in dispatched] != [progress_job] or not isinstance(dispatched[0][1], ProcessPoolExecutor):
+            raise AssertionError(f"Streamed analysis did not run in the process pool: {dispatched}")
+
+        try:
+            asyncio.run(monte_carlo_stream(MonteCarloRequest(uncertain=[])))
+            raise AssertionError("Invalid request should be rejected before streaming")
+        except HTTPException as e:
+            if e.status_code != 400:
+                raise AssertionError(f"Invalid request returned {e.status_code}, expected 400")
+
+        # Without a pool the same job runs on a thread, where patched settings and local generators apply
+        saved_chunk, saved_workers = server_module.MC_CHUNK_SIZE, server_module.ANALYSIS_WORKERS
+        saved_executor = server_module.analysis_executor
+        server_module.MC_CHUNK_SIZE, server_module.ANALYSIS_WORKERS = 1000, 0
+        server_module.analysis_executor = None
+        try:
+            request = MonteCarloRequest(
+                uncertain=[{"field": "user_growth.artists_y5", "distribution": "lognormal", "std": 0.3}],
+                draws=2500, seed=11
+            )
+            events = parse(asyncio.run(collect(monte_carlo_stream, request)))
+            if [name for name, _ in events] != ["progress", "progress", "result"]:
+                raise AssertionError(f"Expected two progress events and a result, got {[n for n, _ in events]}")
+            if [data["percent"] for _, data in events[:2]] != [40.0, 80.0] or events[1][1]["partial"]["draws"] != 2000:
+                raise AssertionError("Progress should report the share of draws done and summarize them")
+            if events[-1][1] != json.loads(encode_json(run_monte_carlo(request))):
+                raise AssertionError("Streamed Monte Carlo result differs from the blocking route")
+
+            steps, closed = [], []
+
+            def slow_analysis(_):
+                try:
+                    for i in range(1000):
+                        steps.append(i)
+                        time.sleep(0.002)
+                        yield (i + 1) / 1000, {"step": i}
+                finally:
+                    closed.append(True)
+
+            async def disconnect_early():
+                stream = (await stream_analysis(slow_analysis, None)).body_iterator
+                received = [await stream.__anext__() for _ in range(3)]
+                await stream.aclose()
+                return received
+
+            received = asyncio.run(disconnect_early())
+            if len(received) != 3 or not closed or len(steps) >= 100:
+                raise AssertionError(f"Closing the stream should stop the analysis (ran {len(steps)} steps)")
+        finally:
+            server_module.MC_CHUNK_SIZE, server_module.ANALYSIS_WORKERS = saved_chunk, saved_workers
+            server_module.analysis_executor = saved_executor
+
+        print("✅ Progress streamed per step with partial results; closing the stream cancels the analysis")
+        return True
+
+    def test_live_recalculation(self):
+        """Bursts of edits over the live socket cost one computation, and superseded results are dropped"""
+        print("\n=== Live Recalculation ===")
+        saved_build, saved_settle = server_module.build_projections, server_module.LIVE_SETTLE_SECONDS
+        computed, started, delay = [], threading.Event(), [0.0]
+
+        def counting_build(inputs):
+            computed.append(inputs.tax_inputs.corporate_tax_rate)
+            started.set()
+            time.sleep(delay[0])
+            return saved_build(inputs)
+
+        server_module.build_projections = counting_build
+        server_module.LIVE_SETTLE_SECONDS = 0.2
+        result_cache.clear()
+        try:
+            with TestClient(app).websocket_connect("/api/live") as ws:
+                ws.send_json({"type": "patch", "seq": 0, "operations": []})
+                if ws.receive_json() != {"type": "error", "seq": 0, "detail": "Send inputs before patching them"}:
+                    raise AssertionError("Patching before sending inputs should be rejected")
+
+                ws.send_json({"type": "inputs", "seq": 1, "inputs": FinancialInputs().model_dump()})
+                for seq in range(2, 22):
+                    ws.send_json({"type": "patch", "seq": seq, "operations": [
+                        {"op": "replace", "path": "/tax_inputs/corporate_tax_rate", "value": seq}
+                    ]})
+                ws.send_json({"type": "patch", "seq": 22, "operations": [{"op": "replace", "path": "/nope", "value": 1}]})
+                ws.send_text("not json")
+                error, decode_error, message = ws.receive_json(), ws.receive_json(), ws.receive_json()
+                if error["type"] != "error" or error["seq"] != 22 or decode_error["type"] != "error":
+                    raise AssertionError(f"Invalid edits should be answered with errors: {error}, {decode_error}")
+                if message["type"] != "projection" or message["seq"] != 21 or computed != [21]:
+                    raise AssertionError(f"A burst should be computed once, for its last edit (computed {computed})")
+                expected = FinancialInputs()
+                expected.tax_inputs.corporate_tax_rate = 21
+                if message["projections"]["pnl"]["annual"]["taxes"] != saved_build(expected)["pnl"]["annual"]["taxes"]:
+                    raise AssertionError("Live projection does not reflect the latest edit")
+
+                started.clear()
+                delay[0] = 0.3
+                ws.send_json({"type": "patch", "seq": 23, "operations": [
+                    {"op": "replace", "path": "/tax_inputs/corporate_tax_rate", "value": 23}
+                ]})
+                if not started.wait(5):
+                    raise AssertionError("Settled edit was never computed")
+                ws.send_json({"type": "patch", "seq": 24, "operations": [
+                    {"op": "replace", "path": "/tax_inputs/corporate_tax_rate", "value": 24}
+                ]})
+                message = ws.receive_json()
+                if message["seq"] != 24 or computed[1:] != [23, 24]:
+                    raise AssertionError(f"A result superseded mid-computation should be dropped (got seq {message['seq']})")
+
+                delay[0] = 0.0
+                ws.send_text('{"type": "inputs", "seq": 25, "inputs": {"funding": {"rounds": [{"amount": NaN}]}}}')
+                message = ws.receive_json()
+                if message["type"] != "error" or message["seq"] != 25:
+                    raise AssertionError(f"A failing computation should be reported as an error: {message}")
+                ws.send_json({"type": "inputs", "seq": 26, "inputs": FinancialInputs().model_dump()})
+                message = ws.receive_json()
+                if message["type"] != "projection" or message["seq"] != 26:
+                    raise AssertionError(f"The channel should keep recalculating after a failed edit: {message}")
+        finally:
+            server_module.build_projections, server_module.LIVE_SETTLE_SECONDS = saved_build, saved_settle
+
+        print("✅ Edit bursts coalesced into one computation; only the latest projection is pushed")
+        return True
+
+    def test_single_flight(self):
+        """Concurrent identical calculations run once and share the result"""
+        print("\n=== Single-Flight Calculations ===")
+        saved_build = server_module.build_projections
+        computed = []
+
+        def slow_build(inputs):
+            computed.append(inputs.id)
+            time.sleep(0.2)
+            return saved_build(inputs)
+
+        async def herd(plans, **kwargs):
+            return await asyncio.gather(
+                *(calculate_projections(plan, **kwargs) for plan in plans), return_exceptions=True
+            )
+
+        server_module.build_projections = slow_build
+        result_cache.clear()
+        try:
+            # Same content, different ids and timestamps: one canonical input hash
+            plans = [FinancialInputs(name="Morning dashboard") for _ in range(6)]
+            runs, shared = calculation_flights.runs, calculation_flights.shared
+            responses = asyncio.run(herd(plans))
+            if len(computed) != 1 or len({response.body for response in responses}) != 1:
+                raise AssertionError(f"Identical concurrent requests should compute once (computed {len(computed)})")
+            statuses = sorted(response.headers["X-Cache"] for response in responses)
+            if statuses != ["MISS"] + ["SHARED"] * 5:
+                raise AssertionError(f"Waiters should be marked as sharing the run: {statuses}")
+            if (calculation_flights.runs - runs, calculation_flights.shared - shared) != (1, 5):
+                raise AssertionError("Single-flight counters did not record the shared run")
+            if calculation_flights.calls or asyncio.run(cache_stats())["single_flight"]["in_flight"]:
+                raise AssertionError("Finished runs should leave nothing in flight")
+            if asyncio.run(calculate_projections(plans[0])).headers["X-Cache"] != "HIT" or len(computed) != 1:
+                raise AssertionError("Later requests should be served from the result cache")
+
+            computed.clear()
+            other = FinancialInputs(name="Morning dashboard")
+            other.tax_inputs.corporate_tax_rate = 30
+            fresh = FinancialInputs(name="Morning dashboard")
+            fresh.timeline.inflation_rate += 1
+            asyncio.run(herd([other, fresh, other, fresh]))
+            if len(computed) != 2:
+                raise AssertionError(f"Different inputs must not share a run (computed {len(computed)})")
+
+            failures = asyncio.run(herd([plans[0]] * 3, fields="pnl.nonexistent"))
+            if any(not isinstance(e, HTTPException) or e.status_code != 400 for e in failures) or calculation_flights.calls:
+                raise AssertionError(f"A failed run should fail every waiter with 400 and be forgotten: {failures}")
+        finally:
+            server_module.build_projections = saved_build
+
+        print("✅ Concurrent identical calculations share one run; different inputs do not")
+        return True
+
 def main():
     print("🚀 Starting CK Financial Projection API Tests")
     print("=" * 60)
@@ -636,6 +2195,29 @@ def main():
         tester.test_scenario_variations()
         tester.test_sanity_checks()
         tester.test_zeroed_inputs()
+        tester.test_vectorized_engine_parity()
+        tester.test_batch_calculation()
+        tester.test_monte_carlo()
+        tester.test_sensitivity_analysis()
+        tester.test_result_cache()
+        tester.test_stage_graph()
+        tester.test_sessions()
+        tester.test_worker_pool()
+        tester.test_field_selection()
+        tester.test_columnar_encoding()
+        tester.test_projection_horizon()
+        tester.test_monthly_ledger()
+        tester.test_goal_seek()
+        tester.test_budget_optimizer()
+        tester.test_headcount_roster()
+        tester.test_saved_inputs_listing()
+        tester.test_index_provisioning()
+        tester.test_materialized_projections()
+        tester.test_bulk_import()
+        tester.test_streaming_export()
+        tester.test_progress_streams()
+        tester.test_live_recalculation()
+        tester.test_single_flight()
         
     except Exception as e:
         print(f"\n❌ Test suite failed with error: {str(e)}")